@@ -0,0 +1,141 @@
+import re
+import sys
+import argparse
+from rapidfuzz import fuzz, process
+
+class ATSScorer:
+    """
+    Keyword coverage scoring for resume entries and whole resumes.
+
+    A keyword counts as covered when it appears as a whole word (case-insensitive) or, for keywords of
+    at least `min_fuzzy_length` characters, when rapidfuzz's partial ratio against the text reaches
+    `fuzzy_threshold`. Short keywords such as "AWS" or "Go" are matched exactly only, since a fuzzy
+    match would hit any word containing them.
+    """
+
+    def __init__(self, keywords, fuzzy_threshold=88, min_fuzzy_length=5):
+        self.keywords = [keyword.strip() for keyword in keywords if keyword and keyword.strip()]
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_fuzzy_length = min_fuzzy_length
+        self._patterns = [
+            re.compile(r'(?<![a-z0-9])' + re.escape(keyword.lower()) + r'(?![a-z0-9])') for keyword in self.keywords
+        ]
+
+    def match_keywords(self, texts):
+        """
+        Return the keywords covered by any of `texts`.
+
+        Exact matches are checked first against the joined text. The remaining long keywords are then
+        scored against every text in one batched rapidfuzz call per keyword.
+        """
+        texts = [self._normalize(text) for text in texts if text]
+        joined = '\n'.join(texts)
+
+        matched = set()
+        fuzzy_candidates = []
+        for keyword, pattern in zip(self.keywords, self._patterns):
+            if pattern.search(joined):
+                matched.add(keyword)
+            elif len(keyword) >= self.min_fuzzy_length:
+                fuzzy_candidates.append(keyword)
+
+        if texts:
+            for keyword in fuzzy_candidates:
+                if process.extractOne(keyword.lower(), texts, scorer=fuzz.partial_ratio, score_cutoff=self.fuzzy_threshold):
+                    matched.add(keyword)
+
+        return matched
+
+    def score_texts(self, texts):
+        """Return the coverage of `texts` as a dict with the matched and missing keywords."""
+        matched = self.match_keywords(texts)
+        return {
+            'coverage': len(matched) / len(self.keywords) if self.keywords else 1.0,
+            'matched': [keyword for keyword in self.keywords if keyword in matched],
+            'missing': [keyword for keyword in self.keywords if keyword not in matched],
+        }
+
+    def score_entry(self, experience_entry):
+        """Score one experience entry (title and bullet points) from LatexResumeParser.experience."""
+        return self.score_texts([experience_entry.get('job_title', '')] + list(experience_entry.get('bullet_points', [])))
+
+    def score_technical_skills(self, technical_skills):
+        texts = []
+        for category, skills in (technical_skills or {}).items():
+            texts.append(f"{category}: {', '.join(skills)}")
+        return self.score_texts(texts)
+
+    def score_resume(self, experience, technical_skills, education=None):
+        """
+        Score every experience entry, the technical skills section and the resume as a whole.
+
+        Returns:
+        - dict: {'experience': [per-entry scores], 'technical_skills': score, 'overall': score}
+        """
+        texts = []
+        for entry in experience:
+            texts.append(entry.get('job_title', ''))
+            texts.extend(entry.get('bullet_points', []))
+        for category, skills in (technical_skills or {}).items():
+            texts.append(f"{category}: {', '.join(skills)}")
+        for entry in education or []:
+            texts.append(entry.get('major', ''))
+
+        return {
+            'experience': [self.score_entry(entry) for entry in experience],
+            'technical_skills': self.score_technical_skills(technical_skills),
+            'overall': self.score_texts(texts),
+        }
+
+    @staticmethod
+    def _normalize(text):
+        # Drop LaTeX markup (\textbf{...}, escapes) so it does not hide or fake matches
+        text = re.sub(r'\\[A-Za-z]+\*?', ' ', text)
+        return re.sub(r'[{}\\]', '', text).lower()
+
+
+def format_report(report, experience, label="Resume"):
+    lines = [f"{label}: overall keyword coverage {report['overall']['coverage']:.0%}"]
+    for entry, score in zip(experience, report['experience']):
+        lines.append(f"  {score['coverage']:>4.0%}  {entry.get('job_title', '')} @ {entry.get('company', '')}")
+    lines.append(f"  {report['technical_skills']['coverage']:>4.0%}  Technical Skills")
+    if report['overall']['missing']:
+        lines.append(f"  Missing: {', '.join(report['overall']['missing'])}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from resume_parser import LatexResumeParser
+
+    arg_parser = argparse.ArgumentParser(description="Report ATS keyword coverage for a LaTeX resume.")
+    arg_parser.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    arg_parser.add_argument('--job', help="Path to the job description (reads stdin when omitted)")
+    arg_parser.add_argument('--keywords', help="Comma-separated keywords to use instead of extracting them")
+    arg_parser.add_argument('--compare', help="A tailored .tex file to score against the same keywords")
+    args = arg_parser.parse_args(argv)
+
+    if args.keywords:
+        keywords = [keyword.strip() for keyword in args.keywords.split(',')]
+    else:
+        from keyword_extractor import KeywordExtractor
+        if args.job:
+            with open(args.job, 'r') as file:
+                job_description = file.read()
+        else:
+            job_description = sys.stdin.read()
+        keywords = KeywordExtractor().extract(job_description)
+
+    print(f"Keywords: {', '.join(keywords)}\n")
+    scorer = ATSScorer(keywords)
+    for label, path in (("Original", args.resume), ("Tailored", args.compare)):
+        if not path:
+            continue
+        parser = LatexResumeParser.load(path)
+        report = scorer.score_resume(parser.experience, parser.technical_skills, parser.education)
+        print(format_report(report, parser.experience, label=f"{label} ({path})"))
+        print()
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
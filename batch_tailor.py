@@ -0,0 +1,364 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+from openai import OpenAI, AsyncOpenAI
+from dotenv import load_dotenv
+from resume_parser import LatexResumeParser
+from latex_templates import TEMPLATES
+from resume_reshaper import ResumeReshaper
+from resume_repackager import LatexResumeRepackager
+from llm_cache import LLMResponseCache
+from request_scheduler import RequestScheduler
+from instrumentation import Tracer, NULL_TRACER
+from jd_compactor import JobDescriptionCompactor
+from posting_index import PostingIndex
+from model_router import load_router, format_router_stats
+from workday_crawler import PostingStore, is_posting_store
+
+JOB_DESCRIPTION_EXTENSIONS = ('.txt', '.md')
+
+def load_job_descriptions(source):
+    """
+    Load job descriptions from a directory of text files, a JSONL file, or a posting store.
+
+    Directory entries use the file name (without extension) as their id. JSONL lines must contain a
+    "job_description" (or "description") field and may contain an "id" field. From a posting store
+    filled by workday_crawler.py, only the postings that are new or changed since they were last
+    tailored are loaded.
+
+    Returns:
+    - list: (job_id, job_description) tuples in a stable order.
+    """
+    postings = []
+    if is_posting_store(source):
+        store = PostingStore(source)
+        postings = store.pending()
+        store.close()
+    elif os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            job_id, extension = os.path.splitext(name)
+            if extension.lower() not in JOB_DESCRIPTION_EXTENSIONS:
+                continue
+            with open(os.path.join(source, name), 'r') as file:
+                postings.append((job_id, file.read()))
+    else:
+        with open(source, 'r') as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                description = record.get('job_description') or record.get('description')
+                if not description:
+                    raise ValueError(f"Line {line_number} of {source} has no job description.")
+                postings.append((str(record.get('id', line_number)), description))
+    return postings
+
+
+class BatchTailor:
+    """
+    Tailor one resume against many job descriptions in a single process.
+
+    The resume is parsed once, and the OpenAI clients (and their connection pools) are shared by
+    every posting. Up to `max_parallel_postings` postings are reshaped at the same time, each with up
+    to `max_concurrency` requests in flight. A shared RequestScheduler, if given, paces the requests
+    of all postings together and retries rate-limited ones.
+    """
+
+    def __init__(self, client, async_client, parser, output_dir, max_parallel_postings=4, max_concurrency=5, cache=None,
+                 keyword_strategy='llm', coverage_threshold=None, single_call=False, structured_output=None,
+                 scheduler=None, tracer=None, compactor=None, posting_index=None, router=None, variants=1):
+        self.client = client
+        self.async_client = async_client
+        self.parser = parser
+        self.output_dir = output_dir
+        self.max_parallel_postings = max_parallel_postings
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.keyword_strategy = keyword_strategy
+        self.coverage_threshold = coverage_threshold
+        self.single_call = single_call
+        self.structured_output = structured_output
+        self.scheduler = scheduler
+        self.tracer = tracer or NULL_TRACER
+        # One JobDescriptionCompactor is shared, so boilerplate repeated across the batch's postings is learned
+        self.compactor = compactor
+        # Optional PostingIndex: near-duplicates of postings tailored in earlier runs reuse their results
+        self.posting_index = posting_index
+        # Optional ModelRouter shared by every posting, so all of them move off a slow or failing model together
+        self.router = router
+        self.variants = variants  # Rewrites requested per experience entry, ranked locally
+        self.keyword_extractor = None
+        if keyword_strategy == 'local' or posting_index is not None:
+            # One extractor (and its vocabulary/IDF tables) is shared by every posting; the posting
+            # index also uses it to compare the keywords of near-duplicate postings
+            from keyword_extractor import KeywordExtractor
+            self.keyword_extractor = KeywordExtractor()
+        self.results = []
+
+    def run(self, postings):
+        """Tailor the resume for every (job_id, job_description) pair and return the run summary."""
+        return asyncio.run(self.run_async(postings))
+
+    async def run_async(self, postings):
+        os.makedirs(self.output_dir, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.max_parallel_postings)
+
+        async def tailor(job_id, job_description, file_name):
+            async with semaphore:
+                return await self._tailor_posting(job_id, job_description, file_name)
+
+        file_names = self._output_filenames(postings)
+        started = time.perf_counter()
+        self.results = list(await asyncio.gather(
+            *(tailor(job_id, jd, file_name) for (job_id, jd), file_name in zip(postings, file_names))
+        ))
+        return self._summarize(time.perf_counter() - started)
+
+    async def _tailor_posting(self, job_id, job_description, file_name):
+        started = time.perf_counter()
+        output_path = os.path.join(self.output_dir, f"{file_name}.tex")
+        reshaper = None
+        try:
+            with self.tracer.span('posting', job_id=job_id):
+                reshaper = await self._reshape_and_save(job_id, job_description, output_path)
+            error = None
+        except Exception as e:
+            output_path = None
+            error = f"{type(e).__name__}: {e}"
+            print(f"Failed to tailor resume for job '{job_id}': {error}")
+
+        return {
+            'job_id': job_id,
+            'output_path': output_path,
+            'error': error,
+            'seconds': time.perf_counter() - started,
+            'job_description_tokens_saved': reshaper.compaction['tokens_saved'] if reshaper and reshaper.compaction else 0,
+            'reused_posting': reshaper.reused_posting['label'] if reshaper and reshaper.reused_posting else None,
+        }
+
+    async def _reshape_and_save(self, job_id, job_description, output_path):
+        reshaper = ResumeReshaper(
+            client=self.client,
+            parser=self.parser,
+            job_description=job_description,
+            async_client=self.async_client,
+            max_concurrency=self.max_concurrency,
+            cache=self.cache,
+            keyword_strategy=self.keyword_strategy,
+            keyword_extractor=self.keyword_extractor,
+            coverage_threshold=self.coverage_threshold,
+            structured_output=self.structured_output,
+            scheduler=self.scheduler,
+            tracer=self.tracer,
+            compactor=self.compactor,
+            posting_index=self.posting_index,
+            posting_label=job_id,
+            router=self.router,
+            variants=self.variants,
+        )
+        if self.single_call:
+            new_experience, new_technical_skills, new_education = await reshaper.reshape_all_single_call_async()
+        else:
+            new_experience, new_technical_skills, new_education = await reshaper.reshape_all_async()
+
+        with self.tracer.span('repackage', job_id=job_id) as span:
+            repackager = LatexResumeRepackager(self.parser)
+            repackager.replace_experience(new_experience)
+            repackager.replace_technical_skills(new_technical_skills)
+            repackager.replace_education(new_education)
+            repackager.save_to_file(output_path)
+            span.set(output_bytes=os.path.getsize(output_path))
+        reshaper.save_variants(output_path, new_technical_skills, new_education)
+        return reshaper
+
+    def _summarize(self, elapsed):
+        failures = [result for result in self.results if result['error']]
+        scheduler_stats = self.scheduler.stats() if self.scheduler else None
+        return {
+            'postings': len(self.results),
+            'succeeded': len(self.results) - len(failures),
+            'failed': len(failures),
+            'elapsed_seconds': elapsed,
+            'postings_per_minute': len(self.results) / elapsed * 60 if elapsed else 0.0,
+            'failures': [{'job_id': result['job_id'], 'error': result['error']} for result in failures],
+            'scheduler': scheduler_stats,
+            'job_description_tokens_saved': sum(result['job_description_tokens_saved'] for result in self.results),
+            'reused_postings': sum(1 for result in self.results if result['reused_posting']),
+        }
+
+    @staticmethod
+    def _safe_filename(job_id):
+        return re.sub(r'[^A-Za-z0-9._-]+', '_', job_id).strip('._') or 'job'
+
+    @classmethod
+    def _output_filenames(cls, postings):
+        """
+        Return one output file name (without extension) per posting. Ids that map to the same name, such
+        as 'a/b' and 'a_b' or a duplicated JSONL id, get a numbered suffix instead of overwriting each
+        other's output. Names are compared case-insensitively, as some file systems do.
+        """
+        file_names = []
+        taken = {}
+        for job_id, _ in postings:
+            file_name = base_name = cls._safe_filename(job_id)
+            number = 1
+            while file_name.lower() in taken:
+                number += 1
+                file_name = f"{base_name}-{number}"
+            if number > 1:
+                print(f"Job '{job_id}' would overwrite the output of job '{taken[base_name.lower()]}'; saving it as {file_name}.tex")
+            taken[file_name.lower()] = job_id
+            file_names.append(file_name)
+        return file_names
+
+
+def print_summary(summary):
+    print("\nBatch summary:")
+    print(f"  Postings:   {summary['postings']}")
+    print(f"  Succeeded:  {summary['succeeded']}")
+    print(f"  Failed:     {summary['failed']}")
+    print(f"  Elapsed:    {summary['elapsed_seconds']:.1f}s")
+    print(f"  Throughput: {summary['postings_per_minute']:.1f} postings/minute")
+    if summary.get('job_description_tokens_saved'):
+        print(f"  Job description tokens saved: {summary['job_description_tokens_saved']}")
+    if summary.get('reused_postings'):
+        print(f"  Near-duplicate postings (earlier keywords reused): {summary['reused_postings']}")
+    if summary.get('scheduler'):
+        scheduler = summary['scheduler']
+        print(f"  Requests:   {scheduler['completed']} completed, {scheduler['retries']} retried "
+              f"({scheduler['rate_limited']} rate-limited), {scheduler['failed']} failed")
+    for failure in summary['failures']:
+        print(f"  - {failure['job_id']}: {failure['error']}")
+
+
+def compile_pdfs(results, workers, tracer):
+    """Compile the successfully tailored resumes to PDF. Returns True if any compile failed."""
+    from pdf_compiler import PdfCompiler, summarize, print_report
+
+    tex_paths = [result['output_path'] for result in results if result['output_path']]
+    compiler = PdfCompiler(workers=workers)
+    if compiler.engine is None:
+        print("Error: No LaTeX engine found for --pdf. Install latexmk or pdflatex (TeX Live or MiKTeX).")
+        return True
+
+    print(f"\nCompiling {len(tex_paths)} PDF(s) with {compiler.engine} on {compiler.workers} worker(s)...")
+    with tracer.span('compile_pdf') as span:
+        started = time.perf_counter()
+        pdf_results = compiler.compile_many(tex_paths)
+        elapsed = time.perf_counter() - started
+        pdf_summary = summarize(pdf_results, elapsed)
+        span.set(documents=pdf_summary['documents'], compiled=pdf_summary['compiled'],
+                 unchanged=pdf_summary['cached'], failed=pdf_summary['failed'])
+    print_report(pdf_results, elapsed)
+    return pdf_summary['failed'] > 0
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Tailor one LaTeX resume against many job descriptions.")
+    arg_parser.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    arg_parser.add_argument('jobs', help="Directory of .txt/.md job descriptions, a JSONL file, or a posting store from workday_crawler.py")
+    arg_parser.add_argument('--output-dir', default='tailored_resumes', help="Directory for the tailored .tex files")
+    arg_parser.add_argument('--parallel', type=int, default=4, help="Number of postings tailored at the same time")
+    arg_parser.add_argument('--max-concurrency', type=int, default=5, help="In-flight LLM requests per posting")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Bypass the LLM response cache")
+    arg_parser.add_argument('--keywords', choices=('llm', 'local'), default='llm',
+                            help="Extract keywords with the LLM or with the offline extractor")
+    arg_parser.add_argument('--coverage-threshold', type=float, default=None,
+                            help="Keep experience entries whose keyword coverage is at least this fraction (0-1)")
+    arg_parser.add_argument('--single-call', action='store_true',
+                            help="Reshape all sections of a posting with one request instead of one per entry")
+    arg_parser.add_argument('--structured-output', choices=('json_object', 'json_schema'), default=None,
+                            help="Request JSON mode or a JSON schema from models that support structured output")
+    arg_parser.add_argument('--template', choices=sorted(TEMPLATES), default='resume',
+                            help="LaTeX layout of the resume: resume (\\resumeSubheading) or moderncv (\\cventry)")
+    arg_parser.add_argument('--rpm', type=int, default=500, help="Requests per minute allowed by the OpenAI account")
+    arg_parser.add_argument('--tpm', type=int, default=40000, help="Tokens per minute allowed by the OpenAI account")
+    arg_parser.add_argument('--jd-token-budget', type=int, default=600,
+                            help="Tokens of each job description kept after boilerplate is stripped")
+    arg_parser.add_argument('--no-compact', action='store_true', help="Send the job descriptions to the LLM unchanged")
+    arg_parser.add_argument('--reuse-threshold', type=float, default=0.85,
+                            help="Similarity (0-1) at which a posting reuses the result of an earlier near-duplicate")
+    arg_parser.add_argument('--no-reuse', action='store_true', help="Tailor every posting from scratch")
+    arg_parser.add_argument('--routes', default=None,
+                            help="JSON file of per-stage model routes and endpoints (defaults to the built-in routes)")
+    arg_parser.add_argument('--variants', type=int, default=1,
+                            help="Rewrites requested per experience entry in one call; the best is kept and all are saved")
+    arg_parser.add_argument('--pdf', action='store_true', help="Compile the tailored resumes to PDF on all CPU cores")
+    arg_parser.add_argument('--pdf-workers', type=int, default=None, help="PDF compile processes (defaults to the CPU count)")
+    arg_parser.add_argument('--trace', default=None, help="Write a JSON trace of every stage and LLM call to this file")
+    arg_parser.add_argument('--metrics', default=None, help="Write Prometheus text-format metrics to this file")
+    args = arg_parser.parse_args(argv)
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OpenAI API key not found in the environment. Make sure it is set in the .env file.")
+        return 1
+
+    try:
+        router = load_router(args.routes)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error: Could not load the model routes: {e}")
+        return 1
+
+    postings = load_job_descriptions(args.jobs)
+    if not postings and is_posting_store(args.jobs):
+        print(f"No new or changed postings in '{args.jobs}'.")
+        return 0
+    if not postings:
+        print(f"Error: No job descriptions found in '{args.jobs}'.")
+        return 1
+
+    tracer = Tracer()
+    print(f"Parsing resume: {args.resume}")
+    with tracer.span('parse') as span:
+        parser = LatexResumeParser.load(args.resume, template=args.template)
+        span.set(input_bytes=len(parser.content.encode('utf-8')))
+
+    batch = BatchTailor(
+        # The scheduler owns retries, so the clients' built-in retries are turned off
+        client=OpenAI(api_key=api_key, max_retries=0),
+        async_client=AsyncOpenAI(api_key=api_key, max_retries=0),
+        parser=parser,
+        output_dir=args.output_dir,
+        max_parallel_postings=args.parallel,
+        max_concurrency=args.max_concurrency,
+        cache=LLMResponseCache(bypass=args.no_cache),
+        keyword_strategy=args.keywords,
+        coverage_threshold=args.coverage_threshold,
+        single_call=args.single_call,
+        structured_output=args.structured_output,
+        scheduler=RequestScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm),
+        tracer=tracer,
+        compactor=None if args.no_compact else JobDescriptionCompactor(token_budget=args.jd_token_budget),
+        posting_index=None if args.no_reuse else PostingIndex(threshold=args.reuse_threshold),
+        router=router,
+        variants=args.variants,
+    )
+    summary = batch.run(postings)
+    if batch.compactor is not None:
+        batch.compactor.library.save()
+    if is_posting_store(args.jobs):
+        # The next run from the store picks up only postings that are new or changed by then
+        store = PostingStore(args.jobs)
+        store.mark_tailored([result['job_id'] for result in batch.results if not result['error']])
+        store.close()
+    print_summary(summary)
+    print(format_router_stats(router))
+    pdf_failed = False
+    if args.pdf:
+        pdf_failed = compile_pdfs(batch.results, args.pdf_workers, tracer)
+    tracer.print_summary()
+    if args.trace:
+        tracer.export_json(args.trace)
+    if args.metrics:
+        tracer.export_prometheus(args.metrics)
+    return 1 if summary['failed'] or pdf_failed else 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
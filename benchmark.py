@@ -0,0 +1,326 @@
+import io
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from resume_parser import LatexResumeParser
+from resume_repackager import LatexResumeRepackager
+from resume_reshaper import ResumeReshaper
+from fake_openai_server import FakeChatClient, AsyncFakeChatClient
+
+DEFAULT_SIZES = (1, 5, 10, 25, 50, 100, 200)
+DEFAULT_PIPELINE_SIZES = (1, 5, 20)
+DEFAULT_CONCURRENCY = (1, 5, 20)
+
+JOB_DESCRIPTION = """
+We are looking for a Senior Full-Stack Developer with expertise in Angular, AWS, Docker, and Python.
+The ideal candidate has built scalable web applications on cloud infrastructure with Kubernetes and PostgreSQL.
+Strong knowledge of CI/CD pipelines, REST APIs and Agile methodologies is required.
+"""
+
+_TITLES = ['Software Engineer', 'Senior Developer', 'Data Engineer', 'Backend Developer', 'Tech Lead']
+_COMPANIES = ['TechCorp', 'StartCo', 'Data \\& Analytics Inc.', 'Cloud\\_Works', 'Acme Labs']
+_CITIES = ['San Francisco, CA', 'Austin, TX', 'New York, NY', 'Remote', 'Seattle, WA']
+_BULLET_TEMPLATES = [
+    "Developed high-performance services using \\textbf{{{skill}}} and {other}, cutting latency by {number}\\%.",
+    "Led a team of {number} engineers delivering {other} features for {{\\em critical {{nested}} clients}}.",
+    "Reduced cloud spend by \\${number}K per year by migrating workloads to {skill}.",
+    "Built {skill} pipelines processing {number}M events/day with {{\\small {other}}} and issue \\#{number}.",
+    "Automated {other} deployments with {skill}, improving release frequency by {number}\\%.",
+]
+_SKILLS = ['Python', 'Java', 'Docker', 'Kubernetes', 'AWS', 'PostgreSQL', 'Angular', 'React', 'Terraform', 'Go']
+
+
+def generate_resume(experience_count, education_count=2, min_bullets=2, max_bullets=8, seed=0):
+    """
+    Generate a synthetic LaTeX resume in the template's format.
+
+    Bullet points vary in count and contain nested braces, inline commands and escaped special
+    characters, so the parser and repackager see the same constructs as in real resumes.
+
+    Params:
+    - experience_count (int): Number of experience entries.
+    - education_count (int): Number of education entries.
+    - min_bullets, max_bullets (int): Range of bullet points per experience entry.
+    - seed (int): Seed for the random choices, so the same arguments give the same document.
+
+    Returns:
+    - str: The LaTeX source.
+    """
+    rng = random.Random(seed)
+    lines = [
+        "\\documentclass[letterpaper,11pt]{article}",
+        "\\begin{document}",
+        "\\section{Education}",
+        "  \\resumeSubHeadingListStart",
+    ]
+    for index in range(education_count):
+        lines += [
+            "    \\resumeSubheading",
+            f"      {{State University {index + 1}}}{{Aug. {2010 - 4 * index} -- May {2014 - 4 * index}}}",
+            f"      {{Bachelor of Science in Computer Science \\& Mathematics}}{{{rng.choice(_CITIES)}}}",
+        ]
+    lines += ["  \\resumeSubHeadingListEnd", "", "\\section{Experience}", "  \\resumeSubHeadingListStart"]
+
+    for index in range(experience_count):
+        lines += [
+            "    \\resumeSubheading",
+            f"      {{{rng.choice(_TITLES)}}}{{Jan. {2024 - index} -- Dec. {2024 - index}}}",
+            f"      {{{rng.choice(_COMPANIES)}}}{{{rng.choice(_CITIES)}}}",
+            "      \\resumeItemListStart",
+        ]
+        for _ in range(rng.randint(min_bullets, max_bullets)):
+            bullet = rng.choice(_BULLET_TEMPLATES).format(
+                skill=rng.choice(_SKILLS), other=rng.choice(_SKILLS), number=rng.randint(2, 90)
+            )
+            lines.append(f"        \\resumeItem{{{bullet}}}")
+        lines.append("      \\resumeItemListEnd")
+    lines += ["  \\resumeSubHeadingListEnd", ""]
+
+    lines += [
+        "\\section{Technical Skills}",
+        " \\begin{itemize}[leftmargin=0.15in, label={}]",
+        "    \\small{\\item{",
+        "     \\textbf{Languages}{: Python, Java, SQL, Go} \\\\",
+        "     \\textbf{Developer Tools}{: Git, Docker, AWS, Kubernetes}",
+        "    }}",
+        " \\end{itemize}",
+        "",
+        "\\end{document}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def _time(function, repeat):
+    """Run `function` `repeat` times and return (median seconds, min seconds, last result)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations), min(durations), result
+
+
+def _fake_reshaped_sections(parser):
+    """Deterministic reshaped sections of the same shape and size as the parsed resume."""
+    experience = [
+        dict(entry, bullet_points=[f"Delivered Python & AWS improvements #{index} at 100% uptime" for index in range(len(entry['bullet_points']))])
+        for entry in parser.experience
+    ]
+    education = [{'institution': entry['institution'], 'major': f"{entry['major']} (Cloud & Data)", 'dates': entry['dates']}
+                 for entry in parser.education]
+    technical_skills = {'Languages': ['Python', 'Go', 'C#'], 'Cloud': ['AWS', 'Docker', 'Kubernetes']}
+    return experience, technical_skills, education
+
+
+def benchmark_parser(sizes, repeat, workdir):
+    results = []
+    for size in sizes:
+        path = os.path.join(workdir, f"resume_{size}.tex")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(generate_resume(size, seed=size))
+        median, best, parser = _time(lambda: LatexResumeParser(path), repeat)
+        # LatexResumeParser.load() with a warm cache, as in batch and service runs
+        cache_dir = os.path.join(workdir, 'parse_cache')
+        LatexResumeParser.load(path, cache_dir=cache_dir)
+        cached_median, _, _ = _time(lambda: LatexResumeParser.load(path, cache_dir=cache_dir), repeat)
+        results.append({
+            'experience_entries': size,
+            'bullet_points': sum(len(entry['bullet_points']) for entry in parser.experience),
+            'document_bytes': os.path.getsize(path),
+            'median_seconds': median,
+            'min_seconds': best,
+            'cached_load_median_seconds': cached_median,
+        })
+    return results
+
+
+def benchmark_repackager(sizes, repeat, workdir):
+    results = []
+    for size in sizes:
+        path = os.path.join(workdir, f"resume_{size}.tex")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(generate_resume(size, seed=size))
+        parser = LatexResumeParser(path)
+        experience, technical_skills, education = _fake_reshaped_sections(parser)
+        output_path = os.path.join(workdir, f"updated_{size}.tex")
+
+        def repackage():
+            repackager = LatexResumeRepackager(parser)
+            timings = {}
+            for name, replace in (
+                ('replace_experience', lambda: repackager.replace_experience(experience)),
+                ('replace_technical_skills', lambda: repackager.replace_technical_skills(technical_skills)),
+                ('replace_education', lambda: repackager.replace_education(education)),
+                ('save_to_file', lambda: repackager.save_to_file(output_path)),
+            ):
+                started = time.perf_counter()
+                replace()
+                timings[name] = time.perf_counter() - started
+            return timings
+
+        runs = [repackage() for _ in range(repeat)]
+        result = {'experience_entries': size, 'document_bytes': os.path.getsize(path)}
+        for name in runs[0]:
+            result[f"{name}_seconds"] = statistics.median(run[name] for run in runs)
+        result['median_seconds'] = statistics.median(sum(run.values()) for run in runs)
+        result['min_seconds'] = min(sum(run.values()) for run in runs)
+        results.append(result)
+    return results
+
+
+def benchmark_pipeline(sizes, concurrency_levels, latency, workdir):
+    """Time the full reshaping pipeline against the in-process fake client, sequential and concurrent."""
+    results = []
+    for size in sizes:
+        path = os.path.join(workdir, f"resume_{size}.tex")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(generate_resume(size, seed=size))
+        parser = LatexResumeParser(path)
+
+        def run_sequential():
+            client = FakeChatClient(latency)
+            reshaper = ResumeReshaper(client=client, parser=parser, job_description=JOB_DESCRIPTION)
+            reshaper.extract_keywords()
+            reshaped = (reshaper.reshape_experience(), reshaper.reshape_technical_skills(), reshaper.reshape_education())
+            return client.calls, reshaped
+
+        def run_concurrent(max_concurrency):
+            async_client = AsyncFakeChatClient(latency)
+            reshaper = ResumeReshaper(client=None, parser=parser, job_description=JOB_DESCRIPTION,
+                                      async_client=async_client, max_concurrency=max_concurrency)
+            reshaped = asyncio.run(reshaper.reshape_all_async())
+            return async_client.calls, reshaped
+
+        modes = [('sequential', None, run_sequential)]
+        modes += [('concurrent', level, lambda level=level: run_concurrent(level)) for level in concurrency_levels]
+        for mode, max_concurrency, run in modes:
+            with redirect_stdout(io.StringIO()):  # The reshaper prints every response
+                seconds, _, (calls, (experience, _, _)) = _time(run, 1)
+            results.append({
+                'experience_entries': size,
+                'mode': mode,
+                'max_concurrency': max_concurrency,
+                'llm_latency_seconds': latency,
+                'llm_calls': calls,
+                'reshaped_entries': sum(1 for entry in experience if entry),
+                'seconds': seconds,
+            })
+    return results
+
+
+def scaling_exponent(results, size_key='experience_entries', time_key='median_seconds'):
+    """
+    Estimate k in time ~ size^k with a least-squares fit on a log-log scale: about 1 means linear
+    scaling and about 2 quadratic. Only the larger half of the sizes is fitted, since fixed per-run
+    overhead dominates the smallest documents. Returns None with fewer than two sizes.
+    """
+    points = sorted((math.log(result[size_key]), math.log(result[time_key]))
+                    for result in results if result[size_key] > 0 and result[time_key] > 0)
+    points = points[len(points) // 2:] if len(points) >= 4 else points
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / variance, 3)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=5, pipeline_sizes=DEFAULT_PIPELINE_SIZES,
+                   concurrency_levels=DEFAULT_CONCURRENCY, latency=0.05, include_pipeline=True):
+    """
+    Run every benchmark and return the results as a JSON-serialisable dict.
+
+    Parser and repackager timings cover every size in `sizes` (median of `repeat` runs). The pipeline
+    is run once per size in `pipeline_sizes`: sequentially, and concurrently at each level in
+    `concurrency_levels`, with the fake client answering every call after `latency` seconds.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        parser_results = benchmark_parser(sizes, repeat, workdir)
+        repackager_results = benchmark_repackager(sizes, repeat, workdir)
+        pipeline_results = benchmark_pipeline(pipeline_sizes, concurrency_levels, latency, workdir) if include_pipeline else []
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'parser': parser_results,
+        'repackager': repackager_results,
+        'pipeline': pipeline_results,
+        'scaling': {
+            'parser_exponent': scaling_exponent(parser_results),
+            'repackager_exponent': scaling_exponent(repackager_results),
+        },
+    }
+
+
+def print_report(results):
+    print(f"{'Entries':>7} {'Bytes':>8} {'Parse ms':>9} {'Cached ms':>10} {'Repackage ms':>13}")
+    for parsed, repackaged in zip(results['parser'], results['repackager']):
+        print(f"{parsed['experience_entries']:>7} {parsed['document_bytes']:>8} "
+              f"{parsed['median_seconds'] * 1000:>9.2f} {parsed['cached_load_median_seconds'] * 1000:>10.2f} "
+              f"{repackaged['median_seconds'] * 1000:>13.2f}")
+    print(f"Scaling exponents (1 = linear, 2 = quadratic): parser {results['scaling']['parser_exponent']}, "
+          f"repackager {results['scaling']['repackager_exponent']}")
+
+    if results['pipeline']:
+        print(f"\n{'Entries':>7} {'Mode':<11} {'Concurrency':>11} {'Calls':>6} {'Seconds':>8}")
+        for result in results['pipeline']:
+            print(f"{result['experience_entries']:>7} {result['mode']:<11} {str(result['max_concurrency'] or '-'):>11} "
+                  f"{result['llm_calls']:>6} {result['seconds']:>8.2f}")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark parsing, repackaging and reshaping on synthetic resumes.")
+    arg_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                            help="Comma-separated experience entry counts for the parser/repackager benchmarks")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Runs per size (the median is reported)")
+    arg_parser.add_argument('--pipeline-sizes', default=','.join(map(str, DEFAULT_PIPELINE_SIZES)),
+                            help="Comma-separated experience entry counts for the pipeline benchmark")
+    arg_parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)),
+                            help="Comma-separated max_concurrency levels for the pipeline benchmark")
+    arg_parser.add_argument('--latency', type=float, default=0.05, help="Seconds the fake LLM takes per call")
+    arg_parser.add_argument('--skip-pipeline', action='store_true', help="Only benchmark the parser and repackager")
+    arg_parser.add_argument('--output', default='benchmark_results.json', help="Path of the JSON results file")
+    args = arg_parser.parse_args(argv)
+
+    def parse_list(text):
+        return [int(value) for value in text.split(',') if value.strip()]
+
+    results = run_benchmarks(
+        sizes=parse_list(args.sizes), repeat=args.repeat, pipeline_sizes=parse_list(args.pipeline_sizes),
+        concurrency_levels=parse_list(args.concurrency), latency=args.latency, include_pipeline=not args.skip_pipeline,
+    )
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print_report(results)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import os
+import sys
+import json
+import argparse
+from latex_templates import TEMPLATES
+
+# Heavy dependencies (openai, pydantic, rapidfuzz, requests, selenium) are imported inside the
+# subcommands that use them, so parse and render start in a few tens of milliseconds.
+
+SECTIONS = ('experience', 'education', 'technical_skills')
+
+
+def read_job_description(args):
+    """
+    Return the job description from --job-text, --job-url, --job (a file, or - for stdin) or piped stdin.
+    """
+    if args.job_text:
+        return args.job_text
+    if args.job_url:
+        from workday_scraper import WorkdayScraper
+        scraper = WorkdayScraper(args.job_url)
+        scraper.scrape_job_description()
+        if not scraper.get_job_description():
+            raise ValueError(f"Could not scrape a job description from {args.job_url}")
+        return scraper.get_job_description()
+    if args.job and args.job != '-':
+        with open(args.job, 'r') as file:
+            return file.read()
+    if args.job == '-' or not sys.stdin.isatty():
+        return sys.stdin.read()
+    raise ValueError("No job description given. Use --job FILE, --job -, --job-text TEXT or --job-url URL.")
+
+
+def write_output(text, output_path):
+    if output_path in (None, '-'):
+        sys.stdout.write(text)
+    else:
+        with open(output_path, 'w') as file:
+            file.write(text)
+
+
+def command_parse(args):
+    from resume_parser import LatexResumeParser
+
+    parser = LatexResumeParser.load(args.resume, template=args.template)
+    sections = {name: getattr(parser, name) for name in (args.section or SECTIONS)}
+    write_output(json.dumps(sections, indent=2) + '\n', args.output)
+    return 0
+
+
+def command_render(args):
+    from resume_parser import LatexResumeParser
+    from resume_repackager import LatexResumeRepackager
+
+    if args.sections == '-':
+        sections = json.load(sys.stdin)
+    else:
+        with open(args.sections, 'r') as file:
+            sections = json.load(file)
+
+    parser = LatexResumeParser.load(args.resume, template=args.template)
+    repackager = LatexResumeRepackager(parser)
+    # Sections from `cli.py parse` are LaTeX source already; --escape is for plain text (e.g. from an LLM)
+    raw_latex = not args.escape
+    if 'experience' in sections:
+        repackager.replace_experience([dict(entry, raw_latex=raw_latex) for entry in sections['experience']])
+    if 'education' in sections:
+        repackager.replace_education([dict(entry, raw_latex=raw_latex) for entry in sections['education']])
+    if 'technical_skills' in sections:
+        repackager.replace_technical_skills(sections['technical_skills'], raw_latex=raw_latex)
+
+    content = repackager.render()
+    if not content.strip().endswith("\\end{document}"):
+        content += "\n\\end{document}"
+    write_output(content, args.output)
+    return 0
+
+
+def command_score(args):
+    from resume_parser import LatexResumeParser
+    from ats_scorer import ATSScorer, format_report
+
+    if args.keywords:
+        keywords = [keyword.strip() for keyword in args.keywords.split(',')]
+    else:
+        from keyword_extractor import KeywordExtractor
+        keywords = KeywordExtractor().extract(read_job_description(args))
+
+    scorer = ATSScorer(keywords)
+    reports = {}
+    for label, path in (("Original", args.resume), ("Tailored", args.compare)):
+        if not path:
+            continue
+        parser = LatexResumeParser.load(path, template=args.template)
+        report = scorer.score_resume(parser.experience, parser.technical_skills, parser.education)
+        if args.json:
+            reports[path] = report
+        else:
+            print(format_report(report, parser.experience, label=f"{label} ({path})"))
+            print()
+    if args.json:
+        print(json.dumps({'keywords': keywords, 'reports': reports}, indent=2))
+    return 0
+
+
+def command_tailor(args):
+    from dotenv import load_dotenv
+    from main import tailor_resume
+
+    load_dotenv()
+    job_description = read_job_description(args)
+    return tailor_resume(
+        job_description, args.resume, output_file=args.output, template=args.template,
+        keyword_strategy=args.keywords, coverage_threshold=args.coverage_threshold,
+        structured_output=args.structured_output, reshape_mode='single' if args.single_call else 'stream',
+        bypass_cache=args.no_cache, requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+        trace_file=args.trace, metrics_file=args.metrics, compile_pdf=args.pdf,
+        jd_token_budget=None if args.no_compact else args.jd_token_budget,
+        reuse_threshold=None if args.no_reuse else args.reuse_threshold,
+        routes_file=args.routes,
+        variants=args.variants,
+    )
+
+
+def command_variants(args):
+    from resume_parser import LatexResumeParser
+    from variant_ranker import load_variants, format_variants, render_variants, parse_picks
+
+    variants = load_variants(args.variants)
+    if args.list:
+        print(format_variants(variants))
+        return 0
+    parser = LatexResumeParser.load(args.resume, template=args.template)
+    write_output(render_variants(parser, variants, parse_picks(args.pick)), args.output)
+    return 0
+
+
+def command_scrape(args):
+    from workday_scraper import scrape_job_descriptions
+
+    descriptions = scrape_job_descriptions(args.urls, fetch_mode=args.fetch_mode)
+    if args.jsonl:
+        # Ready to be passed to batch_tailor.py as its JSONL jobs file
+        lines = [json.dumps({'id': url, 'job_description': description})
+                 for url, description in zip(args.urls, descriptions) if description]
+        write_output(''.join(line + '\n' for line in lines), args.output)
+    else:
+        write_output('\n\n'.join(description for description in descriptions if description) + '\n', args.output)
+
+    for url, description in zip(args.urls, descriptions):
+        if not description:
+            print(f"Could not scrape a job description from {url}", file=sys.stderr)
+    return 0 if all(descriptions) else 1
+
+
+def command_crawl(args):
+    from workday_crawler import crawl_boards
+
+    return crawl_boards(
+        args.boards, store_path=args.store, workers=args.workers, api_base_url=args.api_base_url,
+        recheck_seconds=args.recheck_days * 86400 if args.recheck_days is not None else None,
+        full_refresh=args.full, search_text=args.search_text,
+    )
+
+
+def add_job_arguments(subparser):
+    subparser.add_argument('--job', help="Job description file, or - to read it from stdin (the default when piped)")
+    subparser.add_argument('--job-text', help="The job description itself")
+    subparser.add_argument('--job-url', help="A Workday posting URL to scrape the job description from")
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(prog='cli.py', description="Tailor LaTeX resumes to job descriptions.")
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+    template_help = "LaTeX layout of the resume: resume (\\resumeSubheading) or moderncv (\\cventry)"
+
+    parse = subparsers.add_parser('parse', help="Print the experience, education and skills of a resume as JSON")
+    parse.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    parse.add_argument('--section', action='append', choices=SECTIONS, help="Only print this section (repeatable)")
+    parse.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help=template_help)
+    parse.add_argument('-o', '--output', default=None, help="Write the JSON to this file instead of stdout")
+    parse.set_defaults(handler=command_parse)
+
+    render = subparsers.add_parser('render', help="Write a resume with sections replaced from a JSON file")
+    render.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    render.add_argument('sections', help="JSON with experience/education/technical_skills keys (as printed by parse), or - for stdin")
+    render.add_argument('--escape', action='store_true', help="Escape LaTeX special characters (for plain-text sections)")
+    render.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help=template_help)
+    render.add_argument('-o', '--output', default=None, help="Write the .tex file here instead of stdout")
+    render.set_defaults(handler=command_render)
+
+    score = subparsers.add_parser('score', help="Report ATS keyword coverage of a resume")
+    score.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    add_job_arguments(score)
+    score.add_argument('--keywords', help="Comma-separated keywords to use instead of extracting them")
+    score.add_argument('--compare', help="A tailored .tex file to score against the same keywords")
+    score.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help=template_help)
+    score.add_argument('--json', action='store_true', help="Print the reports as JSON")
+    score.set_defaults(handler=command_score)
+
+    tailor = subparsers.add_parser('tailor', help="Tailor a resume to a job description with the OpenAI API")
+    tailor.add_argument('resume', help="Path to the LaTeX resume (.tex file)")
+    add_job_arguments(tailor)
+    tailor.add_argument('-o', '--output', default='updated_resume.tex', help="Path of the tailored .tex file")
+    tailor.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help=template_help)
+    tailor.add_argument('--keywords', choices=('llm', 'local'), default='llm',
+                        help="Extract keywords with the LLM or with the offline extractor")
+    tailor.add_argument('--coverage-threshold', type=float, default=None,
+                        help="Keep experience entries whose keyword coverage is at least this fraction (0-1)")
+    tailor.add_argument('--structured-output', choices=('json_object', 'json_schema'), default=None,
+                        help="Request JSON mode or a JSON schema from models that support structured output")
+    tailor.add_argument('--single-call', action='store_true', help="Reshape all sections with one request")
+    tailor.add_argument('--no-cache', action='store_true', help="Bypass the LLM response cache")
+    tailor.add_argument('--rpm', type=int, default=500, help="Requests per minute allowed by the OpenAI account")
+    tailor.add_argument('--tpm', type=int, default=40000, help="Tokens per minute allowed by the OpenAI account")
+    tailor.add_argument('--trace', default=None, help="Write a JSON trace of every stage and LLM call to this file")
+    tailor.add_argument('--metrics', default=None, help="Write Prometheus text-format metrics to this file")
+    tailor.add_argument('--pdf', action='store_true', help="Compile the tailored resume to PDF")
+    tailor.add_argument('--jd-token-budget', type=int, default=600,
+                        help="Tokens of the job description kept after boilerplate is stripped")
+    tailor.add_argument('--no-compact', action='store_true', help="Send the job description to the LLM unchanged")
+    tailor.add_argument('--reuse-threshold', type=float, default=0.85,
+                        help="Similarity (0-1) at which the result of an earlier near-duplicate posting is reused")
+    tailor.add_argument('--no-reuse', action='store_true', help="Tailor from scratch even for a near-duplicate posting")
+    tailor.add_argument('--routes', default=None,
+                        help="JSON file of per-stage model routes and endpoints (defaults to the built-in routes)")
+    tailor.add_argument('--variants', type=int, default=1,
+                        help="Rewrites requested per experience entry in one call; the best is kept and all are saved")
+    tailor.set_defaults(handler=command_tailor)
+
+    variants = subparsers.add_parser('variants', help="List or render the experience variants saved by tailor --variants")
+    variants.add_argument('resume', help="Path to the original LaTeX resume (.tex file)")
+    variants.add_argument('variants', help="The .variants.json file written next to the tailored resume")
+    variants.add_argument('--pick', action='append', metavar='ENTRY=RANK',
+                          help="Use variant RANK for experience entry ENTRY, both counted from 1 (repeatable)")
+    variants.add_argument('--list', action='store_true', help="Print the ranked variants instead of rendering")
+    variants.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help=template_help)
+    variants.add_argument('-o', '--output', default=None, help="Write the .tex file here instead of stdout")
+    variants.set_defaults(handler=command_variants)
+
+    scrape = subparsers.add_parser('scrape', help="Print the job descriptions of Workday postings")
+    scrape.add_argument('urls', nargs='+', help="Workday posting URLs")
+    scrape.add_argument('--fetch-mode', choices=('auto', 'http', 'browser'), default='auto',
+                        help="Use the JSON API, a headless browser, or the API with a browser fallback")
+    scrape.add_argument('--jsonl', action='store_true', help="Print one JSON object per posting, ready for batch_tailor.py")
+    scrape.add_argument('-o', '--output', default=None, help="Write to this file instead of stdout")
+    scrape.set_defaults(handler=command_scrape)
+
+    crawl = subparsers.add_parser('crawl', help="Refresh the local posting store from Workday job boards")
+    crawl.add_argument('boards', nargs='+', help="Board roots, e.g. https://<tenant>.wd5.myworkdayjobs.com/en-US/<site>")
+    crawl.add_argument('--store', default=os.path.join('.resume_tailor_cache', 'postings.sqlite3'),
+                       help="Path of the posting store (pass it to batch_tailor.py to tailor new and changed postings)")
+    crawl.add_argument('--workers', type=int, default=8, help="Requests in flight at the same time")
+    crawl.add_argument('--recheck-days', type=float, default=None,
+                       help="Re-fetch unchanged postings whose details are older than this many days")
+    crawl.add_argument('--full', action='store_true', help="Re-fetch the details of every listed posting")
+    crawl.add_argument('--search-text', default='', help="Only crawl postings matching this search (removed postings are not recorded)")
+    crawl.add_argument('--api-base-url', default=None, help="Send requests to this host instead (e.g. a local stand-in)")
+    crawl.set_defaults(handler=command_crawl)
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
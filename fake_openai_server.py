@@ -0,0 +1,312 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import asyncio
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_keyword_extractor = None
+
+# Bullet point wordings of the choices of an n > 1 request (choice 0 uses the first)
+_BULLET_TEMPLATES = (
+    "Delivered {keyword} improvements that cut costs by {percent}%",
+    "Led a {keyword} migration across three teams, cutting release time by {percent}% and on-call load by half",
+    "Used {keyword}",
+)
+
+def fake_reply(messages, choice=0):
+    """
+    Build a deterministic, well-formed reply to one of ResumeReshaper's prompts.
+
+    The prompt is recognised from its system message, and the reply echoes the entry it was asked to
+    rewrite with the keywords worked into the bullet points, so the rest of the pipeline can run
+    end to end without a real model. Experience rewrites vary with `choice`, the index of the choice
+    in a request for several completions.
+    """
+    system = messages[0]['content']
+    prompt = messages[1]['content'] if len(messages) > 1 else ''
+    keywords_match = re.search(r'following keywords: (.*?)\.\n', prompt)
+    keywords = keywords_match.group(1).split(', ') if keywords_match else ['Python']
+
+    def field(name):
+        match = re.search(rf'^\s*{name}: (.*)$', prompt, re.MULTILINE)
+        return match.group(1).strip() if match else ''
+
+    def bullets(count, choice=0):
+        template = _BULLET_TEMPLATES[choice % len(_BULLET_TEMPLATES)]
+        return [template.format(keyword=keywords[(index + choice) % len(keywords)], percent=10 + index) for index in range(count)]
+
+    if 'identifies keywords' in system:
+        global _keyword_extractor
+        if _keyword_extractor is None:
+            from keyword_extractor import KeywordExtractor
+            _keyword_extractor = KeywordExtractor()
+        job_description = prompt.split('Job Description:', 1)[-1]
+        return ', '.join(_keyword_extractor.extract(job_description, top_k=10)) or 'Python'
+
+    if 'whole resumes' in system:
+        resume = json.loads(prompt[prompt.index('Resume: ') + len('Resume: '):].strip())
+        for entry in resume['experience']:
+            entry['bullet_points'] = bullets(6)
+        return json.dumps({
+            'experience': resume['experience'],
+            'education': resume['education'],
+            'technical_skills': {'Technical Skills': keywords},
+        })
+
+    if 'experience' in system:
+        count_match = re.search(r'exactly (\d+) bullet points', prompt)
+        return json.dumps({
+            'job_title': field('Job Title'),
+            'company': field('Company'),
+            'location': field('Location'),
+            'dates': field('Dates'),
+            'bullet_points': bullets(int(count_match.group(1)) if count_match else 6, choice),
+        })
+
+    if 'education' in system:
+        return json.dumps({'institution': field('Institution'), 'major': field('Major'), 'dates': field('Dates')})
+
+    if 'technical skills' in system:
+        return json.dumps({'technical_skills': {'Technical Skills': keywords}})
+
+    return 'OK'
+
+
+def fake_usage(messages, content):
+    """Approximate token counts (four characters per token) in the shape of an API `usage` object."""
+    prompt_tokens = sum(len(message.get('content') or '') for message in messages) // 4
+    completion_tokens = len(content) // 4
+    return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens}
+
+
+class FakeOpenAIServer:
+    """
+    A local OpenAI-compatible chat completions server for exercising the pipeline offline.
+
+    It answers POST /v1/chat/completions (streamed or not) with fake_reply(), after `latency` seconds.
+    Failures can be injected to test retry handling: every `rate_limit_every`-th request (and a random
+    `rate_limit_probability` share of them) gets a 429 with a Retry-After header, and a random
+    `server_error_probability` share gets a 500.
+
+    Point a client at it with OpenAI(base_url=server.base_url, api_key='fake'), or set OPENAI_BASE_URL.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rate_limit_every=0, rate_limit_probability=0.0,
+                 server_error_probability=0.0, retry_after=1.0, seed=0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.server_error_probability = server_error_probability
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep test output quiet
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def stats(self):
+        return {'requests': self.requests, 'rate_limited': self.rate_limited, 'server_errors': self.server_errors}
+
+    def _injected_failure(self):
+        with self._lock:
+            self.requests += 1
+            if (self.rate_limit_every and self.requests % self.rate_limit_every == 0) or \
+                    self._random.random() < self.rate_limit_probability:
+                self.rate_limited += 1
+                return 429
+            if self._random.random() < self.server_error_probability:
+                self.server_errors += 1
+                return 500
+        return None
+
+    def _handle(self, handler):
+        if not handler.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(handler, 404, {'error': {'message': f"Unknown path {handler.path}", 'type': 'invalid_request_error'}})
+            return
+        body = json.loads(handler.rfile.read(int(handler.headers.get('Content-Length', 0))) or b'{}')
+
+        status = self._injected_failure()
+        if status == 429:
+            self._send_json(handler, 429, {'error': {'message': 'Rate limit reached for requests', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                            headers={'retry-after': str(self.retry_after)})
+            return
+        if status == 500:
+            self._send_json(handler, 500, {'error': {'message': 'The server had an error processing your request.', 'type': 'server_error'}})
+            return
+
+        time.sleep(self.latency)
+        contents = [fake_reply(body.get('messages', []), choice) for choice in range(body.get('n') or 1)]
+        content = contents[0]
+        model = body.get('model', 'fake-model')
+        completion_id = f"chatcmpl-fake{self.requests}"
+        usage = fake_usage(body.get('messages', []), ''.join(contents))
+
+        if body.get('stream'):
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/event-stream')
+            handler.end_headers()
+            for start in range(0, len(content), 16):
+                chunk = {
+                    'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': content[start:start + 16]}, 'finish_reason': None}],
+                }
+                handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                handler.wfile.flush()
+            if (body.get('stream_options') or {}).get('include_usage'):
+                usage_chunk = {
+                    'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                    'choices': [],
+                    'usage': usage,
+                }
+                handler.wfile.write(f"data: {json.dumps(usage_chunk)}\n\n".encode('utf-8'))
+            handler.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        self._send_json(handler, 200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [
+                {'index': index, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}
+                for index, text in enumerate(contents)
+            ],
+            'usage': usage,
+        })
+
+    @staticmethod
+    def _send_json(handler, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+class FakeChatClient:
+    """
+    Deterministic in-process stand-in for OpenAI(): client.chat.completions.create() sleeps for
+    `latency` seconds and returns fake_reply() in the shape of a chat completion. Used by the
+    benchmarks, where an HTTP round trip would only add noise.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, n=1, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return _completion(model, messages, n)
+
+
+class AsyncFakeChatClient:
+    """In-process stand-in for AsyncOpenAI(), including streamed completions (stream=True)."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, stream=False, stream_options=None, n=1, **kwargs):
+        self.calls += 1
+        if stream:
+            return self._stream(model, messages, (stream_options or {}).get('include_usage', False))
+        await asyncio.sleep(self.latency)
+        return _completion(model, messages, n)
+
+    async def _stream(self, model, messages, include_usage):
+        content = fake_reply(messages)
+        chunk_size = 16
+        chunk_count = max(1, -(-len(content) // chunk_size))
+        for start in range(0, len(content), chunk_size):
+            # Spread the latency over the chunks, like tokens arriving from a real model
+            await asyncio.sleep(self.latency / chunk_count)
+            delta = SimpleNamespace(content=content[start:start + chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta)], usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=SimpleNamespace(**fake_usage(messages, content)))
+
+
+def _completion(model, messages, n=1):
+    contents = [fake_reply(messages, choice) for choice in range(n)]
+    return SimpleNamespace(
+        model=model,
+        choices=[
+            SimpleNamespace(index=index, message=SimpleNamespace(role='assistant', content=content), finish_reason='stop')
+            for index, content in enumerate(contents)
+        ],
+        usage=SimpleNamespace(**fake_usage(messages, ''.join(contents))),
+    )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run a local fake OpenAI-compatible chat completions server.")
+    arg_parser.add_argument('--port', type=int, default=8001)
+    arg_parser.add_argument('--latency', type=float, default=0.5, help="Seconds before each response")
+    arg_parser.add_argument('--rate-limit-every', type=int, default=0, help="Answer every Nth request with a 429")
+    arg_parser.add_argument('--rate-limit-probability', type=float, default=0.0, help="Share of requests answered with a 429")
+    arg_parser.add_argument('--server-error-probability', type=float, default=0.0, help="Share of requests answered with a 500")
+    arg_parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds sent with each 429")
+    args = arg_parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        port=args.port, latency=args.latency, rate_limit_every=args.rate_limit_every,
+        rate_limit_probability=args.rate_limit_probability,
+        server_error_probability=args.server_error_probability, retry_after=args.retry_after,
+    )
+    print(f"Fake OpenAI server listening on {server.base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
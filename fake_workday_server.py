@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import argparse
+import threading
+from urllib.parse import urlsplit, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RECORDING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'workday_board.json')
+
+
+def load_recording(path=DEFAULT_RECORDING_PATH):
+    """
+    Load a recorded job board: {"tenant", "site", "postings": [{"listing": ..., "detail": ...}]}, where
+    `listing` is the posting's entry in a listing response and `detail` the response to its job request.
+    """
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+class FakeWorkdayServer:
+    """
+    A local stand-in for a Workday job board's endpoints, serving recorded responses offline.
+
+    It answers POST /wday/cxs/<tenant>/<site>/jobs with pages of the recorded listing entries (honouring
+    limit, offset and searchText, matched against the titles) and GET /wday/cxs/<tenant>/<site>/job/<path>
+    with the recorded details of the posting at that path, or a 404. `postings` can be edited between
+    requests to simulate postings being added, changed or taken down.
+
+    Point a scraper or crawler at it with api_base_url=server.base_url.
+    """
+
+    def __init__(self, recording=None, host='127.0.0.1', port=0):
+        recording = recording if recording is not None else load_recording()
+        self.tenant = recording['tenant']
+        self.site = recording['site']
+        self.postings = list(recording['postings'])
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.listing_requests = 0
+        self.detail_requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep test output quiet
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def board_url(self):
+        """A board URL for the recorded tenant and site; pass base_url as api_base_url to reach this server."""
+        return f"https://{self.tenant}.wd5.myworkdayjobs.com/en-US/{self.site}"
+
+    def posting_url(self, index=0):
+        """The public URL of the `index`-th recorded posting, as a WorkdayScraper takes it."""
+        return f"{self.board_url}{self.postings[index]['listing']['externalPath']}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def stats(self):
+        return {'requests': self.requests, 'listing_requests': self.listing_requests, 'detail_requests': self.detail_requests}
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+        prefix = f"/wday/cxs/{self.tenant}/{self.site}"
+        path = unquote(urlsplit(handler.path).path).rstrip('/')
+
+        if handler.command == 'POST' and path == f"{prefix}/jobs":
+            body = json.loads(handler.rfile.read(int(handler.headers.get('Content-Length', 0))) or b'{}')
+            with self._lock:
+                self.listing_requests += 1
+            self._send_json(handler, 200, self._listing_page(body))
+            return
+
+        if handler.command == 'GET' and path.startswith(f"{prefix}/job/"):
+            with self._lock:
+                self.detail_requests += 1
+            external_path = path[len(prefix):]
+            for posting in self.postings:
+                if posting['listing']['externalPath'] == external_path:
+                    self._send_json(handler, 200, posting['detail'])
+                    return
+
+        self._send_json(handler, 404, {'errorCode': 'HTTP_404', 'httpStatus': 404, 'message': f"Unknown path {handler.path}"})
+
+    def _listing_page(self, body):
+        words = (body.get('searchText') or '').lower().split()
+        matching = [posting['listing'] for posting in self.postings
+                    if all(word in posting['listing']['title'].lower() for word in words)]
+        offset = body.get('offset') or 0
+        limit = body.get('limit') or 20
+        return {'total': len(matching), 'jobPostings': matching[offset:offset + limit], 'facets': []}
+
+    @staticmethod
+    def _send_json(handler, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve a recorded Workday job board locally.")
+    arg_parser.add_argument('--port', type=int, default=8002)
+    arg_parser.add_argument('--recording', default=DEFAULT_RECORDING_PATH, help="Recorded board to serve (JSON)")
+    args = arg_parser.parse_args(argv)
+
+    server = FakeWorkdayServer(load_recording(args.recording), port=args.port)
+    print(f"Fake Workday board {server.board_url} served on {server.base_url} (pass it as --api-base-url)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import json
+
+class _Container:
+    __slots__ = ('kind', 'path', 'start', 'key', 'index', 'expecting')
+
+    def __init__(self, kind, path, start):
+        self.kind = kind  # 'object' or 'array'
+        self.path = path
+        self.start = start
+        self.key = None
+        self.index = -1
+        self.expecting = 'key' if kind == 'object' else 'value'
+
+
+class IncrementalJSONParser:
+    """
+    Incremental JSON parser for streamed completions.
+
+    Text is fed in arbitrary chunks. Every value whose parent path is listed in `watch_paths` is decoded
+    and passed to `on_value(path, value)` as soon as its closing character arrives, so list items and
+    object members can be surfaced before the rest of the document has been generated. Paths are
+    tuples of object keys and array indexes: with watch_paths={('bullet_points',)} each bullet is
+    reported as ('bullet_points', 0), ('bullet_points', 1), ... The default watch path () reports every
+    top-level member of the document.
+
+    Anything before the first '{' or '[' (prose, a Markdown fence) is ignored.
+    """
+
+    def __init__(self, on_value, watch_paths=((),)):
+        self.on_value = on_value
+        self.watch_paths = set(watch_paths)
+        self._text = ''
+        self._position = 0
+        self._stack = []
+        self._root = None  # (start, end) of the top-level value once it is complete
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._scalar_start = None
+
+    @property
+    def done(self):
+        return self._root is not None
+
+    def feed(self, chunk):
+        """Consume the next chunk of text, firing on_value for every watched value it completes."""
+        if self.done or not chunk:
+            return
+        self._text += chunk
+        text = self._text
+        position = self._position
+
+        while position < len(text) and not self.done:
+            char = text[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(self._string_start, position + 1)
+                position += 1
+                continue
+
+            if self._scalar_start is not None:
+                if char in ',]}' or char.isspace():
+                    self._complete_value(self._scalar_start, position)
+                    self._scalar_start = None
+                else:
+                    position += 1
+                    continue
+
+            if not self._stack:
+                if char in '{[':
+                    self._open(char, position)
+                position += 1
+                continue
+
+            top = self._stack[-1]
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+                if top.expecting == 'value':
+                    self._start_value()
+            elif char in '{[':
+                self._start_value()
+                self._open(char, position)
+            elif char in '}]':
+                container = self._stack.pop()
+                self._complete_value(container.start, position + 1)
+            elif char == ':':
+                top.expecting = 'value'
+            elif char == ',':
+                top.expecting = 'key' if top.kind == 'object' else 'value'
+            elif not char.isspace():
+                self._start_value()
+                self._scalar_start = position
+            position += 1
+
+        self._position = position
+
+    def result(self):
+        """Decode and return the complete top-level value, or raise ValueError if it is incomplete."""
+        if not self.done:
+            raise ValueError("JSON document is incomplete.")
+        start, end = self._root
+        return json.loads(self._text[start:end])
+
+    def _open(self, char, position):
+        path = self._child_path() if self._stack else ()
+        self._stack.append(_Container('object' if char == '{' else 'array', path, position))
+
+    def _start_value(self):
+        top = self._stack[-1]
+        if top.kind == 'array':
+            top.index += 1
+        top.expecting = 'done'
+
+    def _child_path(self):
+        top = self._stack[-1]
+        return top.path + ((top.key,) if top.kind == 'object' else (top.index,))
+
+    def _close_string(self, start, end):
+        top = self._stack[-1]
+        if top.kind == 'object' and top.expecting == 'key':
+            top.key = json.loads(self._text[start:end])
+            top.expecting = 'colon'
+        else:
+            self._complete_value(start, end)
+
+    def _complete_value(self, start, end):
+        if not self._stack:
+            self._root = (start, end)
+            return
+
+        top = self._stack[-1]
+        if top.path in self.watch_paths:
+            self.on_value(self._child_path(), json.loads(self._text[start:end]))
+
+
+# Example usage
+if __name__ == "__main__":
+    document = '```json\n{"job_title": "Developer", "bullet_points": ["Built \\"fast\\" APIs", "Led {3} teams"], "n": 2}\n```'
+    parser = IncrementalJSONParser(lambda path, value: print(path, value), watch_paths={(), ('bullet_points',)})
+    for index in range(0, len(document), 7):
+        parser.feed(document[index:index + 7])
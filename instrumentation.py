@@ -0,0 +1,243 @@
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# USD per 1K (prompt, completion) tokens, used for the cost estimate. Unknown models are costed at 0.
+MODEL_PRICING = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation. Attributes hold whatever the caller records (tokens, sizes, cache hits...)."""
+
+    def __init__(self, span_id, name, kind, parent_id, attributes):
+        self.span_id = span_id
+        self.name = name
+        self.kind = kind
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def increment(self, name, amount=1):
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self):
+        return {
+            'id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_time': self.start_time,
+            'duration_seconds': self.duration,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Records nested spans for pipeline stages and LLM calls.
+
+    Spans opened inside another span (including inside tasks started from it) become its children.
+    At the end of a run the spans can be printed as a summary table, written to a JSON trace file, or
+    exported in Prometheus text format. A disabled tracer records nothing, so instrumented code can
+    always call span().
+    """
+
+    def __init__(self, enabled=True, pricing=None):
+        self.enabled = enabled
+        self.pricing = MODEL_PRICING if pricing is None else pricing
+        self.spans = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, kind='stage', **attributes):
+        """Time the enclosed block as a span. Yields the Span so attributes can be added to it."""
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        parent = _current_span.get()
+        span = Span(span_id, name, kind, parent.span_id if parent else None, attributes)
+        if not self.enabled:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def record_usage(self, span, usage, model):
+        """Copy token counts from an OpenAI `response.usage` object onto `span` and estimate the cost."""
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        prompt_price, completion_price = self.pricing.get(model, (0.0, 0.0))
+        span.set(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=(prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000,
+        )
+
+    def summary(self):
+        """
+        Aggregate the recorded spans by kind and name.
+
+        Returns:
+        - list: One dict per (kind, name) with count, total/mean/p95/max seconds, token counts, cost,
+          cache hits, retries and errors, ordered by total time.
+        """
+        groups = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            groups.setdefault((span.kind, span.name), []).append(span)
+
+        rows = []
+        for (kind, name), group in groups.items():
+            durations = sorted(span.duration for span in group)
+            rows.append({
+                'kind': kind,
+                'name': name,
+                'count': len(group),
+                'total_seconds': sum(durations),
+                'mean_seconds': sum(durations) / len(durations),
+                'p95_seconds': durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+                'max_seconds': durations[-1],
+                'prompt_tokens': sum(span.attributes.get('prompt_tokens', 0) for span in group),
+                'completion_tokens': sum(span.attributes.get('completion_tokens', 0) for span in group),
+                'cost_usd': sum(span.attributes.get('cost_usd', 0.0) for span in group),
+                'cache_hits': sum(1 for span in group if span.attributes.get('cache_hit')),
+                'retries': sum(span.attributes.get('retries', 0) for span in group),
+                'errors': sum(1 for span in group if 'error' in span.attributes),
+            })
+        rows.sort(key=lambda row: row['total_seconds'], reverse=True)
+        return rows
+
+    def slowest(self, kind='llm', count=5):
+        """Return the `count` slowest spans of the given kind, e.g. to find the slowest entries."""
+        with self._lock:
+            spans = [span for span in self.spans if span.kind == kind]
+        return sorted(spans, key=lambda span: span.duration, reverse=True)[:count]
+
+    def format_summary(self):
+        rows = self.summary()
+        lines = [f"{'Kind':<6} {'Name':<28} {'Count':>5} {'Total s':>8} {'Mean s':>7} {'p95 s':>7} {'Max s':>7} "
+                 f"{'Prompt':>7} {'Compl.':>7} {'Cost $':>7} {'Cache':>5} {'Retry':>5} {'Err':>3}"]
+        for row in rows:
+            lines.append(
+                f"{row['kind']:<6} {row['name'][:28]:<28} {row['count']:>5} {row['total_seconds']:>8.2f} "
+                f"{row['mean_seconds']:>7.2f} {row['p95_seconds']:>7.2f} {row['max_seconds']:>7.2f} "
+                f"{row['prompt_tokens']:>7} {row['completion_tokens']:>7} {row['cost_usd']:>7.3f} "
+                f"{row['cache_hits']:>5} {row['retries']:>5} {row['errors']:>3}"
+            )
+
+        slowest = [span for span in self.slowest() if not span.attributes.get('cache_hit')]
+        if slowest:
+            lines.append("\nSlowest LLM calls:")
+            for span in slowest:
+                lines.append(f"  {span.duration:6.2f}s  {span.attributes.get('label', span.name)}")
+        return '\n'.join(lines)
+
+    def print_summary(self):
+        print("\nRun summary:")
+        print(self.format_summary())
+
+    def export_json(self, path):
+        """Write every span and the summary to a JSON trace file."""
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'spans': spans, 'summary': self.summary()}, file, indent=2)
+
+    def prometheus_text(self, prefix='resume_tailor'):
+        """Render the aggregated spans in the Prometheus text exposition format."""
+        rows = self.summary()
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape_label(str(label))}"' for key, label in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+        def per_row(field, only_llm=False):
+            return [({'kind': row['kind'], 'name': row['name']}, row[field])
+                    for row in rows if not only_llm or row['kind'] == 'llm']
+
+        lines.append(f"# HELP {prefix}_span_duration_seconds Time spent in each stage and LLM call type.")
+        lines.append(f"# TYPE {prefix}_span_duration_seconds summary")
+        for row in rows:
+            label_text = f'kind="{row["kind"]}",name="{_escape_label(row["name"])}"'
+            lines.append(f'{prefix}_span_duration_seconds{{{label_text},quantile="0.95"}} {row["p95_seconds"]}')
+            lines.append(f"{prefix}_span_duration_seconds_sum{{{label_text}}} {row['total_seconds']}")
+            lines.append(f"{prefix}_span_duration_seconds_count{{{label_text}}} {row['count']}")
+        metric('span_duration_seconds_max', 'gauge', "Slowest span per stage and LLM call type.", per_row('max_seconds'))
+        metric('llm_prompt_tokens_total', 'counter', "Prompt tokens reported by the API.", per_row('prompt_tokens', True))
+        metric('llm_completion_tokens_total', 'counter', "Completion tokens reported by the API.", per_row('completion_tokens', True))
+        metric('llm_cost_usd_total', 'counter', "Estimated cost of the LLM calls in USD.", per_row('cost_usd', True))
+        metric('llm_cache_hits_total', 'counter', "LLM calls answered from the response cache.", per_row('cache_hits', True))
+        metric('llm_retries_total', 'counter', "Retried LLM requests.", per_row('retries', True))
+        metric('span_errors_total', 'counter', "Spans that ended with an exception.", per_row('errors'))
+
+        # One sample per label set: a batch records a size per job, and the latest one is exported
+        sizes = {}
+        with self._lock:
+            for span in self.spans:
+                for key, value in span.attributes.items():
+                    if key.endswith('_bytes'):
+                        sizes[(span.name, key)] = value
+        size_samples = [({'name': name, 'field': key}, value) for (name, key), value in sizes.items()]
+        metric('document_bytes', 'gauge', "Size of the most recently parsed or written document.", size_samples)
+        return '\n'.join(lines) + '\n'
+
+    def export_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus_text())
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared no-op tracer for code that is run without instrumentation
+NULL_TRACER = Tracer(enabled=False)
+
+
+# Example usage
+if __name__ == "__main__":
+    tracer = Tracer()
+    with tracer.span('parse', input_bytes=5120):
+        time.sleep(0.01)
+    with tracer.span('reshape'):
+        with tracer.span('experience', kind='llm', label='experience for Developer at TechCorp', model='gpt-4') as span:
+            time.sleep(0.02)
+            tracer.record_usage(span, type('Usage', (), {'prompt_tokens': 420, 'completion_tokens': 180})(), 'gpt-4')
+    tracer.print_summary()
+    print(tracer.prometheus_text())
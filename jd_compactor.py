@@ -0,0 +1,316 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+DEFAULT_BOILERPLATE_LIBRARY_PATH = os.path.join('.resume_tailor_cache', 'boilerplate_library.json')
+
+# Phrases that mark a line as boilerplate wherever it appears (lowercase). Extend this list when a
+# new kind of legal or marketing text keeps slipping through.
+BOILERPLATE_PHRASES = (
+    'equal opportunity employer', 'equal employment opportunity', 'without regard to', 'regardless of race',
+    'race, color', 'sexual orientation', 'gender identity', 'protected veteran', 'veteran status',
+    'national origin', 'genetic information', 'reasonable accommodation', 'e-verify', 'pay transparency',
+    'affirmative action', 'background check', 'drug-free workplace', 'privacy notice', 'privacy policy',
+    'applicant privacy', 'recruitment agencies', 'unsolicited resumes', 'fraudulent job', 'recruiting scam',
+    'base pay range', 'salary range', 'compensation range', 'pay range', 'annual bonus', 'equity package',
+    'medical, dental', 'dental, vision', '401(k)', '401k', 'paid time off', 'parental leave', 'tuition reimbursement',
+    'wellness program', 'employee assistance', 'commuter benefits', 'free lunch', 'stock options',
+    'our mission is', 'our vision is', 'we are proud to', 'founded in', 'headquartered in', 'fortune 500',
+    'best places to work', 'great place to work', 'join our talent community', 'apply now', 'click apply',
+    'follow us on', 'learn more about', 'life at ',
+)
+
+# Section headings and whether their content is kept. A heading matches when it starts with one of these (whole words,
+# lowercase); a boilerplate heading without a colon must match exactly.
+REQUIREMENT_HEADINGS = (
+    'requirements', 'minimum requirements', 'qualifications', 'basic qualifications', 'minimum qualifications',
+    'preferred qualifications', 'required qualifications', 'responsibilities', 'key responsibilities',
+    'job responsibilities', 'duties', 'what you will do', "what you'll do", 'what you will bring',
+    "what you'll bring", 'what you bring', 'what we are looking for', "what we're looking for",
+    'what we look for', 'who you are', 'about you', 'you have', 'you will', 'skills', 'required skills',
+    'technical skills', 'experience', 'must have', 'nice to have', 'bonus points', 'the role', 'about the role',
+    'role overview', 'position summary', 'job description', 'in this role',
+)
+BOILERPLATE_HEADINGS = (
+    'about us', 'about the company', 'about the team', 'who we are', 'our company', 'company overview',
+    'our culture', 'why join', 'why work', 'life at', 'benefits', 'perks', 'what we offer', 'we offer',
+    'compensation', 'pay', 'salary', 'total rewards', 'equal opportunity', 'eeo', 'diversity', 'inclusion',
+    'accommodation', 'privacy', 'how to apply', 'application process', 'disclaimer', 'additional information',
+    'legal', 'notice',
+)
+
+# Lines outside a known section that still read like a requirement or responsibility
+_REQUIREMENT_CUE_PATTERN = re.compile(
+    r"\b(experience (with|in)|proficien|knowledge of|familiar|understanding of|ability to|degree in|years of|"
+    r"you will|you'll|responsible for|must|should|required|preferred|hands-on|expertise|skilled|build|design|"
+    r"develop|maintain|own|lead|collaborate)\b",
+    re.IGNORECASE,
+)
+_BULLET_PATTERN = re.compile(r'^\s*(?:[-*•▪●–]|\d+[.)])\s*')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NORMALIZE_PATTERN = re.compile(r'[^a-z0-9+#]+')
+
+# Line kinds, in the order they are kept when the token budget runs out
+_REQUIREMENT, _CUE, _OTHER = 0, 1, 2
+
+
+def estimate_tokens(text):
+    """About four characters per token, the same estimate RequestScheduler uses."""
+    return len(text) // 4
+
+
+def line_hash(text):
+    """Hash of a line with case, punctuation and bullet markers removed, so reformatted copies match."""
+    normalized = _NORMALIZE_PATTERN.sub(' ', _BULLET_PATTERN.sub('', text).lower()).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def posting_hash(job_description):
+    """Hash of a whole posting, normalised like line_hash(), so a re-read copy of the same posting matches."""
+    normalized = _NORMALIZE_PATTERN.sub(' ', job_description.lower()).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class BoilerplateLibrary:
+    """
+    Hashes of lines known to be boilerplate, persisted between runs.
+
+    Lines that neither sit in a requirement section nor read like a requirement are counted per
+    posting by observe(). A line that turns up in `learn_threshold` different postings (a company's
+    "About us" blurb or EEO statement repeated across its listings) is added to the library, so it is
+    dropped even where no phrase or heading gives it away. Postings are identified by their hash, so
+    compacting the same posting again does not count its lines again.
+    """
+
+    def __init__(self, path=DEFAULT_BOILERPLATE_LIBRARY_PATH, learn_threshold=3, max_tracked=50000):
+        self.path = path
+        self.learn_threshold = learn_threshold
+        self.max_tracked = max_tracked
+        self.hashes = set()
+        self.counts = {}  # line hash -> number of postings it was seen in
+        self.postings = {}  # hashes of the postings already counted (a dict keeps them in insertion order)
+        self._dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                self.hashes = set(data.get('hashes', []))
+                self.counts = dict(data.get('counts', {}))
+                self.postings = dict.fromkeys(data.get('postings', []))
+            except (OSError, ValueError) as e:
+                print(f"Could not read the boilerplate library {path}: {e}")
+
+    def __contains__(self, digest):
+        return digest in self.hashes
+
+    def observe(self, digests, posting=None):
+        """
+        Count one posting's candidate lines, learning those seen in enough postings. `posting` is the
+        posting's hash (see posting_hash()); a posting already counted is skipped.
+        """
+        if posting is not None:
+            if posting in self.postings:
+                return
+            self.postings[posting] = None
+            self._dirty = True
+            if len(self.postings) > self.max_tracked:
+                # Forget the oldest postings
+                self.postings = dict.fromkeys(list(self.postings)[-(self.max_tracked // 2):])
+
+        for digest in set(digests):
+            if digest in self.hashes:
+                continue
+            count = self.counts.get(digest, 0) + 1
+            if count >= self.learn_threshold:
+                self.hashes.add(digest)
+                self.counts.pop(digest, None)
+            else:
+                self.counts[digest] = count
+            self._dirty = True
+
+        if len(self.counts) > self.max_tracked:
+            # Forget the lines seen least often
+            kept = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.max_tracked // 2]
+            self.counts = dict(kept)
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump({'hashes': sorted(self.hashes), 'counts': self.counts, 'postings': list(self.postings)}, file)
+            os.replace(temporary_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Could not save the boilerplate library: {e}")
+
+
+class JobDescriptionCompactor:
+    """
+    Shrink a job description to the content that matters for tailoring before it reaches the LLM.
+
+    The posting is split into lines and grouped under the headings it uses. Lines are dropped when
+    they sit under a boilerplate heading (benefits, "About us", EEO...), contain a boilerplate
+    phrase, match the boilerplate hash library, or repeat an earlier line. Of the rest, lines under
+    requirement/responsibility headings are kept first, then lines that read like requirements, then
+    anything else, until `token_budget` is reached. Kept lines stay in their original order.
+    """
+
+    def __init__(self, token_budget=600, library=None, phrases=BOILERPLATE_PHRASES):
+        """
+        Params:
+        - token_budget (int): Estimated tokens the compacted description may use. None keeps every
+          line that is not boilerplate or a duplicate.
+        - library (BoilerplateLibrary): Learned boilerplate hashes. Defaults to the persisted library.
+        - phrases (tuple): Lowercase phrases marking a line as boilerplate.
+        """
+        self.token_budget = token_budget
+        self.library = library if library is not None else BoilerplateLibrary()
+        self.phrases = tuple(phrases)
+
+    def compact(self, job_description):
+        """
+        Compact one job description, counting its lines towards the boilerplate library.
+
+        Returns:
+        - dict: text, original_tokens, compacted_tokens, tokens_saved and the number of lines dropped
+          as boilerplate, duplicate or over budget.
+        """
+        lines = self._classify(job_description)
+        # Requirement-looking lines are never learned, even when several postings share them
+        self.library.observe((digest for _, _, digest, kind in lines if kind == _OTHER), posting_hash(job_description))
+
+        kept, dropped = [], {'boilerplate': 0, 'duplicate': 0, 'budget': 0}
+        seen = set()
+        for index, (text, is_boilerplate, digest, kind) in enumerate(lines):
+            # Only lines that could have been learned are looked up, so a library learned before
+            # requirement-looking lines were excluded cannot drop them
+            if is_boilerplate or (kind == _OTHER and digest in self.library):
+                dropped['boilerplate'] += 1
+            elif digest in seen:
+                dropped['duplicate'] += 1
+            else:
+                seen.add(digest)
+                kept.append((kind, index, text))
+
+        if self.token_budget is not None:
+            selected, used = [], 0
+            for kind, index, text in sorted(kept):
+                cost = estimate_tokens(text) + 1
+                if used + cost > self.token_budget:
+                    dropped['budget'] += 1
+                    continue
+                selected.append((index, text))
+                used += cost
+            kept = [(None, index, text) for index, text in sorted(selected)]
+
+        text = '\n'.join(text for _, _, text in kept)
+        if not text.strip():
+            # Nothing recognisable survived; the original is better than an empty prompt
+            text = job_description
+        original_tokens = estimate_tokens(job_description)
+        compacted_tokens = estimate_tokens(text)
+        return {
+            'text': text,
+            'original_tokens': original_tokens,
+            'compacted_tokens': compacted_tokens,
+            'tokens_saved': original_tokens - compacted_tokens,
+            'dropped_lines': dropped,
+        }
+
+    def _classify(self, job_description):
+        """Return (text, is_boilerplate, hash, kind) for every non-empty line, tracking the current heading."""
+        lines = []
+        section = None  # 'requirement', 'boilerplate' or None outside a known section
+        for raw_line in job_description.splitlines():
+            text = _WHITESPACE_PATTERN.sub(' ', raw_line).strip()
+            if not text:
+                continue
+
+            heading = self._heading_kind(text)
+            if heading is not None:
+                section = heading if heading != 'other' else None
+                # Requirement headings are kept to give the model structure, boilerplate ones are dropped
+                kind = _REQUIREMENT if heading == 'requirement' else _OTHER
+                lines.append((text, heading == 'boilerplate', line_hash(text), kind))
+                continue
+
+            lowered = text.lower()
+            # Phrases are not applied under a requirement heading, where "salary range analytics" or
+            # "privacy policy enforcement" describe the job rather than the employer
+            is_boilerplate = section == 'boilerplate' or (
+                section != 'requirement' and any(phrase in lowered for phrase in self.phrases)
+            )
+            if section == 'requirement':
+                kind = _REQUIREMENT
+            elif _REQUIREMENT_CUE_PATTERN.search(text):
+                kind = _CUE
+            else:
+                kind = _OTHER
+            lines.append((text, is_boilerplate, line_hash(text), kind))
+        return lines
+
+    @staticmethod
+    def _heading_kind(text):
+        """
+        Classify a section heading as 'requirement', 'boilerplate' or 'other'. Returns None for lines
+        that are not headings: bullets, sentences, and anything long.
+        """
+        if len(text) > 60 or _BULLET_PATTERN.match(text) or text.endswith(('.', ',', ';', '!', '?')):
+            return None
+        heading = text.lower().rstrip(':').strip()
+        words = heading.split()
+        # A heading ends with a colon or is a short Title Case line such as "About Pixar"
+        if not (text.endswith(':') and len(words) <= 7) and not (len(words) <= 5 and text.istitle()) \
+                and not _matches_heading(heading, REQUIREMENT_HEADINGS + BOILERPLATE_HEADINGS):
+            return None
+        if _matches_heading(heading, REQUIREMENT_HEADINGS):
+            return 'requirement'
+        # Without a colon only an exact match counts, so job titles such as "Privacy Engineer" or
+        # "Legal Counsel" are not taken for a "Privacy" or "Legal" heading
+        if _matches_heading(heading, BOILERPLATE_HEADINGS, prefix=text.endswith(':')) or heading.startswith('about '):
+            return 'boilerplate'
+        return 'other'
+
+
+def _matches_heading(heading, known_headings, prefix=True):
+    """True if `heading` is one of `known_headings` or, with `prefix`, starts with one followed by more words."""
+    return any(heading == known or (prefix and heading.startswith(known + ' ')) for known in known_headings)
+
+
+def format_compaction(result):
+    dropped = result['dropped_lines']
+    return (f"Job description compacted: {result['original_tokens']} -> {result['compacted_tokens']} tokens "
+            f"({result['tokens_saved']} saved; dropped {dropped['boilerplate']} boilerplate, "
+            f"{dropped['duplicate']} duplicate and {dropped['budget']} over-budget lines)")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Strip boilerplate from a job description and fit it to a token budget.")
+    arg_parser.add_argument('job', nargs='?', help="Path to the job description (reads stdin when omitted)")
+    arg_parser.add_argument('--token-budget', type=int, default=600, help="Estimated tokens to keep")
+    args = arg_parser.parse_args(argv)
+
+    if args.job:
+        with open(args.job, 'r') as file:
+            job_description = file.read()
+    else:
+        job_description = sys.stdin.read()
+
+    compactor = JobDescriptionCompactor(token_budget=args.token_budget)
+    result = compactor.compact(job_description)
+    compactor.library.save()
+    print(result['text'])
+    print(format_compaction(result), file=sys.stderr)
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
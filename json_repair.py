@@ -0,0 +1,126 @@
+import re
+import json
+
+_FENCE_PATTERN = re.compile(r'```(?:json|JSON)?\s*(.*?)(?:```|$)', re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r',(\s*[}\]])')
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"'})
+
+
+def repair_json(text):
+    """
+    Parse JSON from a model response, repairing the usual ways it comes back malformed.
+
+    In order, this strips Markdown fences and surrounding prose, normalises smart quotes, removes
+    trailing commas, and closes strings, arrays and objects left open by a truncated response.
+
+    Returns:
+    - The decoded value.
+
+    Raises:
+    - ValueError: If the text cannot be repaired into valid JSON.
+    """
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        pass
+
+    candidate = text or ''
+    fence = _FENCE_PATTERN.search(candidate)
+    if fence:
+        candidate = fence.group(1)
+
+    # Drop any prose before the first opening bracket
+    starts = [index for index in (candidate.find('{'), candidate.find('[')) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object or array found in the response.")
+    candidate = candidate[min(starts):].translate(_SMART_QUOTES)
+
+    last_error = None
+    for attempt in _balanced_candidates(candidate):
+        try:
+            return json.loads(_TRAILING_COMMA_PATTERN.sub(r'\1', attempt))
+        except json.JSONDecodeError as e:
+            last_error = e
+    raise ValueError(f"Could not repair JSON: {last_error}")
+
+
+def _close_containers(text):
+    """Append the closing brackets for every container still open at the end of `text`."""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    return text + ''.join(reversed(stack))
+
+
+def _balanced_candidates(text):
+    """
+    Yield repair candidates, most faithful first.
+
+    A complete top-level value is cut off from any trailing prose. A truncated one is closed as-is
+    (with a dangling key or colon dropped), then closed after its last complete member.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    last_safe = 0  # Just after the last opening bracket or before the last comma, i.e. where no member is in progress
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+            last_safe = index + 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                yield text[:index + 1]  # Ignore trailing prose after the complete value
+                return
+        elif char == ',':
+            last_safe = index
+
+    if depth <= 0:
+        yield text
+        return
+
+    closed = _close_containers(text)
+    stripped = closed.rstrip()
+    if not re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?\s*[}\]]*$', stripped):
+        yield closed
+    yield _close_containers(text[:last_safe].rstrip().rstrip(','))
+
+
+# Example usage
+if __name__ == "__main__":
+    samples = [
+        'Here is the JSON:\n```json\n{"job_title": "Developer", "bullet_points": ["Built APIs",]}\n```',
+        '{"job_title": "Developer", "bullet_points": ["Built APIs", "Led a tea',
+        '{"technical_skills": {"Languages": ["Python", "Go"], "Tools": ',
+    ]
+    for sample in samples:
+        print(repair_json(sample))
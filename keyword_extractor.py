@@ -0,0 +1,229 @@
+import re
+import math
+from collections import Counter
+from rapidfuzz import fuzz, process
+
+# Curated technical skills: canonical name -> aliases (lowercase). Canonical names are what end up in self.keywords.
+# Skills named by an ordinary English word ("C", "node", "containers", "security") are only matched in a phrase
+# that disambiguates them; an alias listed under two skills (e.g. "c/c++") matches both.
+TECH_VOCABULARY = {
+    'Python': ['python', 'python3'],
+    'Java': ['java'],
+    'JavaScript': ['javascript', 'js', 'ecmascript'],
+    'TypeScript': ['typescript', 'ts'],
+    'Go': ['golang'],
+    'Rust': ['rust'],
+    'C': ['c/c++', 'c language', 'c programming', 'embedded c', 'ansi c'],
+    'C++': ['c++', 'cpp', 'c/c++'],
+    'C#': ['c#', 'csharp'],
+    'Ruby': ['ruby'],
+    'PHP': ['php'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['swift'],
+    'Scala': ['scala'],
+    'SQL': ['sql'],
+    'Bash': ['bash', 'shell scripting'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3', 'sass', 'scss'],
+    'React': ['react', 'react.js', 'reactjs'],
+    'Angular': ['angular', 'angularjs'],
+    'Vue.js': ['vue', 'vue.js', 'vuejs'],
+    'Node.js': ['node.js', 'nodejs'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Spring Boot': ['spring boot', 'spring framework'],
+    '.NET': ['.net', 'dotnet', 'asp.net'],
+    'GraphQL': ['graphql'],
+    'REST APIs': ['rest api', 'rest apis', 'restful', 'restful apis'],
+    'gRPC': ['grpc'],
+    'Microservices': ['microservices', 'microservice', 'microservice architecture'],
+    'PostgreSQL': ['postgresql', 'postgres'],
+    'MySQL': ['mysql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'Elasticsearch': ['elasticsearch', 'elastic search'],
+    'Cassandra': ['cassandra'],
+    'DynamoDB': ['dynamodb'],
+    'Kafka': ['kafka', 'apache kafka'],
+    'RabbitMQ': ['rabbitmq'],
+    'Spark': ['spark', 'apache spark', 'pyspark'],
+    'Hadoop': ['hadoop'],
+    'Airflow': ['airflow', 'apache airflow'],
+    'Snowflake': ['snowflake'],
+    'AWS': ['aws', 'amazon web services'],
+    'Azure': ['azure', 'microsoft azure'],
+    'GCP': ['gcp', 'google cloud', 'google cloud platform'],
+    'Docker': ['docker', 'containerization', 'docker containers'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'Terraform': ['terraform'],
+    'Ansible': ['ansible'],
+    'Jenkins': ['jenkins'],
+    'GitHub Actions': ['github actions'],
+    'CI/CD': ['ci/cd', 'ci cd', 'continuous integration', 'continuous delivery', 'continuous deployment'],
+    'Git': ['git', 'github', 'gitlab'],
+    'Linux': ['linux', 'unix'],
+    'Prometheus': ['prometheus'],
+    'Grafana': ['grafana'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning'],
+    'NLP': ['nlp', 'natural language processing'],
+    'LLMs': ['llm', 'llms', 'large language models'],
+    'PyTorch': ['pytorch'],
+    'TensorFlow': ['tensorflow'],
+    'scikit-learn': ['scikit-learn', 'sklearn'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'Data Pipelines': ['data pipelines', 'data pipeline', 'etl'],
+    'Distributed Systems': ['distributed systems'],
+    'System Design': ['system design'],
+    'Cloud Infrastructure': ['cloud infrastructure', 'cloud computing'],
+    'DevOps': ['devops'],
+    'Agile': ['agile', 'agile methodologies', 'scrum', 'kanban'],
+    'Unit Testing': ['unit testing', 'unit tests', 'test automation', 'tdd'],
+    'Security': ['application security', 'security engineering', 'information security', 'network security',
+                 'cybersecurity'],
+    'Performance Optimization': ['performance optimization', 'performance tuning'],
+    'CUDA': ['cuda'],
+    'GPU': ['gpu', 'gpus'],
+    'OpenGL': ['opengl'],
+    'Vulkan': ['vulkan'],
+}
+
+# Generic job-posting text used as the IDF background: phrases common to every posting score low.
+BACKGROUND_CORPUS = (
+    "We are looking for a motivated team player to join our growing company and help our customers succeed.",
+    "The ideal candidate has strong communication skills and the ability to work in a fast-paced environment.",
+    "You will collaborate with cross-functional teams to deliver high quality results on time.",
+    "Bachelor's degree or equivalent experience required. Competitive salary and benefits package.",
+    "We offer health insurance, paid time off, a 401k plan and flexible work arrangements.",
+    "We are an equal opportunity employer and value diversity at our company.",
+    "Responsibilities include working with stakeholders, solving problems and supporting the team.",
+    "Excellent written and verbal communication skills and strong attention to detail.",
+    "You will work closely with product managers, designers and other engineers.",
+    "Years of professional experience in a similar role. Ability to learn quickly and work independently.",
+    "Join a passionate team building products that millions of people use every day.",
+    "Strong problem solving skills and a passion for learning new technologies.",
+    "This role reports to the engineering manager and is based in our office or remote.",
+    "Qualifications: experience working in a team, self-starter, excellent organizational skills.",
+    "About us: we are a leading company with a mission to make the world a better place.",
+    "Develop, test and maintain software and participate in code reviews and design discussions.",
+    "Preferred qualifications include experience in a startup environment and a track record of success.",
+    "Apply now to be part of an innovative team that values ownership, impact and growth.",
+)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+each either etc for from had has have having how if in including into is it its itself just like may
+more most must no nor not of on or other our ours out over own per plus so some such than that the
+their them then there these they this those through to too under up us very was we well were what
+when where which while who whom why will with within without would you your yours
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]|\.net")
+
+
+def tokenize(text):
+    """Lowercase and split text into tokens, keeping skill spellings such as c++, c#, node.js and ci/cd intact."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def ngrams(tokens, max_n):
+    """Yield 1..max_n word n-grams that neither start nor end with a stopword."""
+    for n in range(1, max_n + 1):
+        for index in range(len(tokens) - n + 1):
+            gram = tokens[index:index + n]
+            if gram[0] in STOPWORDS or gram[-1] in STOPWORDS:
+                continue
+            yield ' '.join(gram)
+
+
+class KeywordExtractor:
+    """
+    Deterministic, offline keyword extraction for job descriptions.
+
+    Candidate phrases are 1-3 word n-grams weighted by TF-IDF against a background corpus of generic
+    job-posting text. Phrases that match the curated tech vocabulary (exactly, or fuzzily through
+    rapidfuzz) are normalised to their canonical name and boosted, so "k8s", "Kubernetes" and
+    "kubernetes" all become "Kubernetes".
+    """
+
+    def __init__(self, vocabulary=None, background_corpus=BACKGROUND_CORPUS, max_ngram=3,
+                 vocabulary_boost=3.0, fuzzy_threshold=92):
+        self.vocabulary = vocabulary if vocabulary is not None else TECH_VOCABULARY
+        self.max_ngram = max_ngram
+        self.vocabulary_boost = vocabulary_boost
+        self.fuzzy_threshold = fuzzy_threshold
+
+        # Only the listed aliases are matched, so ambiguous words (e.g. "go") can be left out
+        self._aliases = {}
+        for canonical, aliases in self.vocabulary.items():
+            for alias in aliases:
+                self._aliases.setdefault(alias, []).append(canonical)
+        self._alias_choices = list(self._aliases)
+
+        self._document_count = len(background_corpus)
+        self._document_frequency = Counter()
+        for document in background_corpus:
+            self._document_frequency.update(set(ngrams(tokenize(document), max_ngram)))
+
+    def extract(self, job_description, top_k=25):
+        """Return up to `top_k` keywords, vocabulary matches first, ordered by descending score."""
+        term_frequency = Counter(ngrams(tokenize(job_description), self.max_ngram))
+
+        vocabulary_scores = Counter()
+        phrase_scores = {}
+        for phrase, count in term_frequency.items():
+            score = count * self._idf(phrase)
+            canonicals = self._normalize(phrase)
+            if canonicals:
+                for canonical in canonicals:
+                    vocabulary_scores[canonical] += score * self.vocabulary_boost
+            elif ' ' in phrase and count > 1:
+                # Free-form phrases only count when repeated, otherwise every word pair would qualify
+                phrase_scores[phrase] = score
+
+        ranked = sorted(vocabulary_scores.items(), key=lambda item: (-item[1], item[0]))
+        keywords = [canonical for canonical, _ in ranked]
+
+        for phrase, _ in sorted(phrase_scores.items(), key=lambda item: (-item[1], item[0])):
+            if len(keywords) >= top_k:
+                break
+            if any(fuzz.token_set_ratio(phrase, keyword.lower()) >= 90 for keyword in keywords):
+                continue
+            keywords.append(phrase.title())
+
+        return keywords[:top_k]
+
+    def _idf(self, phrase):
+        return math.log((self._document_count + 1) / (self._document_frequency[phrase] + 1)) + 1
+
+    def _normalize(self, phrase):
+        """Map a phrase to its canonical vocabulary entries, or None if it is not a known skill."""
+        canonicals = self._aliases.get(phrase)
+        if canonicals is not None:
+            return canonicals
+
+        # Fuzzy matching catches spelling variants (e.g. "postgre sql", "kubernetes.") but is skipped for
+        # short phrases, where a one-letter difference is a different word
+        if len(phrase) < 5:
+            return None
+        match = process.extractOne(phrase, self._alias_choices, scorer=fuzz.ratio, score_cutoff=self.fuzzy_threshold)
+        return self._aliases[match[0]] if match else None
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    job_description = sys.stdin.read() if not sys.stdin.isatty() else ''
+    job_description = job_description.strip() or """
+    We are looking for a Senior Full-Stack Developer with expertise in Angular, AWS, Docker, and Python.
+    The ideal candidate should have a track record of building scalable web applications and experience with cloud infrastructure.
+    Strong knowledge of CI/CD pipelines and familiarity with Agile methodologies are also required.
+    """
+    extractor = KeywordExtractor()
+    started = time.perf_counter()
+    keywords = extractor.extract(job_description)
+    print(f"Keywords ({(time.perf_counter() - started) * 1000:.1f} ms):", keywords)
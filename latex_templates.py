@@ -0,0 +1,290 @@
+import re
+import string
+from latex_tokenizer import LatexTokenizer, DEFAULT_COMMAND_ARITY, DEFAULT_OPTIONAL_TRAILING_ARGUMENT
+
+# LaTeX special characters and their escaped forms. Escaping is a single pass of one precompiled
+# pattern, so the braces a replacement introduces (e.g. \textbackslash{}) are never escaped again.
+LATEX_SPECIAL_CHARS = {
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '&': r'\&',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+    '\\': r'\textbackslash{}',
+}
+_LATEX_SPECIAL_PATTERN = re.compile('[' + re.escape(''.join(LATEX_SPECIAL_CHARS)) + ']')
+_ITEM_PATTERN = re.compile(r'\\item\b\s*')
+_ITEMIZE_PATTERN = re.compile(r'\\(?:begin|end)\{itemize\}(?:\[[^\]]*\])?')
+
+
+def escape_latex(text):
+    """Escape LaTeX special characters so reshaped text cannot break the document."""
+    return _LATEX_SPECIAL_PATTERN.sub(_escape_match, text)
+
+
+def _escape_match(match):
+    return LATEX_SPECIAL_CHARS[match.group()]
+
+
+def _keep_latex(text):
+    return text
+
+
+class CompiledTemplate:
+    """
+    A str.format template whose fields are checked once, when it is compiled.
+
+    Rendering appends to a list of parts instead of building intermediate strings, so a whole
+    section is assembled with a single join (or written straight to a file).
+    """
+
+    __slots__ = ('source', 'fields', '_format')
+
+    def __init__(self, source):
+        self.source = source
+        self.fields = []
+        for _, field, spec, conversion in string.Formatter().parse(source):
+            if field is None:
+                continue
+            if not field or spec or conversion:
+                raise ValueError(f"Template fields must be plain names: {source!r}")
+            self.fields.append(field)
+        self._format = source.format_map
+
+    def render_into(self, parts, fields):
+        parts.append(self._format(fields))
+
+    def render(self, **fields):
+        return self._format(fields)
+
+
+class ResumeTemplate:
+    """
+    Macro layout of a resume class: how entries are read from the tokenized document and how
+    reshaped sections are rendered back.
+
+    The default layout is the \\resumeSubheading/\\resumeItem template. Another resume class is
+    supported by subclassing and overriding the class attributes (macro names, field order and
+    output templates) and, where its structure differs, the parse_* hooks. Templates are compiled
+    once per instance; get_template() returns shared, already-compiled instances.
+    """
+
+    name = 'resume'
+
+    # Tokenizer configuration
+    command_arity = DEFAULT_COMMAND_ARITY
+    optional_trailing_argument = DEFAULT_OPTIONAL_TRAILING_ARGUMENT
+    entry_command = 'resumeSubheading'
+    item_command = 'resumeItem'
+
+    # Order of the entry command's arguments
+    experience_fields = ('job_title', 'dates', 'company', 'location')
+    education_fields = ('institution', 'dates', 'major', 'location')
+
+    # Output templates (str.format syntax; literal braces are doubled)
+    entry_list_start = "\\resumeSubHeadingListStart\n"
+    entry_list_end = "\\resumeSubHeadingListEnd\n"
+    experience_entry_start = "\\resumeSubheading{{{job_title}}}{{{dates}}}{{{company}}}{{{location}}}\n\\resumeItemListStart\n"
+    bullet = "\\resumeItem{{{text}}}\n"
+    experience_entry_end = "\\resumeItemListEnd\n"
+    education_entry = "\\resumeSubheading{{{institution}}}{{{dates}}}{{{major}}}{{{location}}}\n"
+    skills_start = "\\begin{{itemize}}[leftmargin=0.15in, label={{}}]\n    \\small{{\\item{{\n"
+    skills_line = "    \\textbf{{{category}}}{{: {skills}}} \\\\\n"
+    skills_end = "    }}}}\n\\end{{itemize}}\n"
+    skills_separator = ', '
+
+    _TEMPLATE_ATTRIBUTES = (
+        'entry_list_start', 'entry_list_end', 'experience_entry_start', 'bullet', 'experience_entry_end',
+        'education_entry', 'skills_start', 'skills_line', 'skills_end',
+    )
+
+    def __init__(self):
+        self.compiled = {attribute: CompiledTemplate(getattr(self, attribute)) for attribute in self._TEMPLATE_ATTRIBUTES}
+
+    # Parsing
+
+    def tokenizer(self):
+        return LatexTokenizer(self.command_arity, self.optional_trailing_argument, self.entry_command, self.item_command)
+
+    def parse_experience_entry(self, entry):
+        """Map a LatexEntry to an experience dict, or None if its heading is incomplete."""
+        args = entry.heading.arg_texts()
+        if len(args) < len(self.experience_fields):
+            return None
+        fields = dict(zip(self.experience_fields, (arg.strip() for arg in args)))
+        return {
+            'job_title': fields.get('job_title', ''),
+            'company': fields.get('company', ''),
+            'location': fields.get('location', ''),
+            'dates': fields.get('dates', ''),
+            'bullet_points': self.parse_bullets(entry),
+        }
+
+    def parse_bullets(self, entry):
+        return [item.args[0].text.strip() for item in entry.items if item.args]
+
+    def parse_education_entry(self, entry):
+        """Map a LatexEntry to an education dict, or None if its heading is incomplete."""
+        args = entry.heading.arg_texts()
+        if len(args) < len(self.education_fields):
+            return None
+        fields = dict(zip(self.education_fields, (arg.strip() for arg in args)))
+        return {
+            'institution': fields.get('institution', ''),
+            'major': fields.get('major', ''),
+            'dates': fields.get('dates', ''),
+            'location': fields.get('location', ''),
+        }
+
+    def parse_technical_skills(self, section):
+        """Skill categories are written as \\textbf{Category}{: skill, skill, ...}"""
+        skills = {}
+        for command in section.find_commands('textbf'):
+            if len(command.args) < 2 or not command.args[1].text.startswith(': '):
+                continue
+            label, skill_text = command.args[0].text, command.args[1].text[2:]
+            skills[label.strip()] = [skill.strip() for skill in skill_text.split(',')]
+        return skills
+
+    def technical_skills_span(self, section):
+        """
+        Return the (start, end) span replaced by the new skills: from the end of the section title
+        through the section's first \\end{itemize}, retaining whatever follows the itemize block.
+        """
+        itemize_ends = section.find_commands('end', 'itemize')
+        if not itemize_ends:
+            raise ValueError("Couldn't find the end of the Technical Skills section.")
+        return section.start, itemize_ends[0].end
+
+    # Rendering
+
+    def render_experience(self, experience, parts):
+        parts.append(self.entry_list_start)
+        for entry in experience:
+            self.render_experience_entry(entry, parts)
+        parts.append(self.entry_list_end)
+
+    def render_experience_entry(self, entry, parts):
+        # Entries kept unchanged from the parser (raw_latex) are already valid LaTeX
+        escape = _keep_latex if entry.get('raw_latex') else escape_latex
+        self.compiled['experience_entry_start'].render_into(parts, {
+            'job_title': escape(entry.get('job_title', '')),
+            'company': escape(entry.get('company', '')),
+            'location': escape(entry.get('location', '')),
+            'dates': escape(entry.get('dates', '')),
+        })
+        bullet = self.compiled['bullet']
+        for text in entry.get('bullet_points', []):
+            bullet.render_into(parts, {'text': escape(text)})
+        parts.append(self.compiled['experience_entry_end'].render())
+
+    def render_education(self, education, original_education, parts):
+        parts.append(self.entry_list_start)
+        education_entry = self.compiled['education_entry']
+        for index, entry in enumerate(education):
+            # The reshaped entries carry no location, so keep the one from the original resume
+            original_entry = original_education[index] if index < len(original_education) else {}
+            escape = _keep_latex if entry.get('raw_latex') else escape_latex
+            education_entry.render_into(parts, {
+                'institution': escape(entry.get('institution', '')),
+                'dates': escape(entry.get('dates', '')),
+                'major': escape(entry.get('major', '')),
+                # The original location is LaTeX source already, so only a reshaped location is escaped
+                'location': escape(entry['location']) if 'location' in entry else original_entry.get('location', ''),
+            })
+        parts.append(self.entry_list_end)
+
+    def render_technical_skills(self, skills, parts, raw_latex=False):
+        parts.append(self.compiled['skills_start'].render())
+        skills_line = self.compiled['skills_line']
+        separator = self.skills_separator
+        escape = _keep_latex if raw_latex else escape_latex
+        for category, skill_list in skills.items():
+            skills_line.render_into(parts, {
+                'category': escape(category),
+                'skills': separator.join([escape(skill) for skill in skill_list]),
+            })
+        parts.append(self.compiled['skills_end'].render())
+
+
+class ModernCVTemplate(ResumeTemplate):
+    """
+    The moderncv class: \\cventry{dates}{title}{employer}{city}{grade}{description} entries with
+    their bullets in an itemize inside the description, and \\cvitem{category}{skills} skill lines.
+    """
+
+    name = 'moderncv'
+
+    command_arity = {'section': 1, 'section*': 1, 'cventry': 6, 'cvitem': 2, 'begin': 1, 'end': 1}
+    optional_trailing_argument = set()
+    entry_command = 'cventry'
+    item_command = 'item'  # Never tokenized: bullets live inside the description argument
+
+    experience_fields = ('dates', 'job_title', 'company', 'location')
+    education_fields = ('dates', 'major', 'institution', 'location')
+
+    entry_list_start = "\n"
+    entry_list_end = "\n"
+    experience_entry_start = "\\cventry{{{dates}}}{{{job_title}}}{{{company}}}{{{location}}}{{}}{{\n\\begin{{itemize}}\n"
+    bullet = "\\item {text}\n"
+    experience_entry_end = "\\end{{itemize}}}}\n"
+    education_entry = "\\cventry{{{dates}}}{{{major}}}{{{institution}}}{{{location}}}{{}}{{}}\n"
+    skills_start = "\n"
+    skills_line = "\\cvitem{{{category}}}{{{skills}}}\n"
+    skills_end = ""
+
+    def parse_bullets(self, entry):
+        if len(entry.heading.args) < 6:
+            return []
+        description = _ITEMIZE_PATTERN.sub('', entry.heading.args[5].text)
+        return [bullet.strip() for bullet in _ITEM_PATTERN.split(description)[1:] if bullet.strip()]
+
+    def parse_technical_skills(self, section):
+        return {
+            command.args[0].text.strip(): [skill.strip() for skill in command.args[1].text.split(',')]
+            for command in section.find_commands('cvitem') if len(command.args) == 2
+        }
+
+    def technical_skills_span(self, section):
+        skill_lines = section.find_commands('cvitem')
+        if not skill_lines:
+            raise ValueError("Couldn't find any \\cvitem lines in the Technical Skills section.")
+        return section.start, skill_lines[-1].end
+
+
+TEMPLATES = {template.name: template for template in (ResumeTemplate(), ModernCVTemplate())}
+
+
+def get_template(template=None):
+    """
+    Return a compiled template.
+
+    Params:
+    - template (str, ResumeTemplate or None): A registered template name, a template instance, or
+      None for the default \\resumeSubheading layout.
+    """
+    if template is None:
+        return TEMPLATES['resume']
+    if isinstance(template, ResumeTemplate):
+        return template
+    try:
+        return TEMPLATES[template]
+    except KeyError:
+        raise ValueError(f"Unknown resume template '{template}'. Available: {', '.join(sorted(TEMPLATES))}") from None
+
+
+# Example usage
+if __name__ == "__main__":
+    experience = [{
+        'job_title': 'Developer', 'company': 'R&D Labs', 'location': 'Remote', 'dates': '2020 -- 2024',
+        'bullet_points': ['Cut costs by 30% with C# and AWS', 'Shipped ~20 features'],
+    }]
+    for template in TEMPLATES.values():
+        parts = []
+        template.render_experience(experience, parts)
+        template.render_technical_skills({'Languages': ['Python', 'C#']}, parts)
+        print(f"% {template.name}\n{''.join(parts)}")
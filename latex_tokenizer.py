@@ -0,0 +1,291 @@
+import re
+
+# Commands the tokenizer records, mapped to the number of brace-delimited arguments they take
+DEFAULT_COMMAND_ARITY = {
+    'section': 1,
+    'section*': 1,
+    'resumeSubheading': 4,
+    'resumeItem': 1,
+    'textbf': 1,
+    'begin': 1,
+    'end': 1,
+}
+
+# Commands whose trailing argument is only read when it directly follows, e.g. \textbf{Languages}{: Python, Java}
+DEFAULT_OPTIONAL_TRAILING_ARGUMENT = {'textbf'}
+
+_SPECIAL_PATTERN = re.compile(r'[\\%]')
+_BRACE_PATTERN = re.compile(r'[\\{}]')
+_COMMAND_NAME_PATTERN = re.compile(r'[A-Za-z@]+\*?')
+_WHITESPACE_PATTERN = re.compile(r'\s*')
+
+
+class LatexArgument:
+    """A balanced-brace argument. `start` and `end` span the text between the braces."""
+
+    __slots__ = ('text', 'start', 'end')
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"LatexArgument({self.text!r}, {self.start}, {self.end})"
+
+
+class LatexCommand:
+    """A recognised command. `start` is the backslash and `end` is just past its last argument."""
+
+    __slots__ = ('name', 'start', 'end', 'args')
+
+    def __init__(self, name, start, end, args):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.args = args
+
+    def arg_texts(self):
+        return [arg.text for arg in self.args]
+
+    def __repr__(self):
+        return f"LatexCommand({self.name!r}, {self.start}, {self.end}, {self.arg_texts()!r})"
+
+
+class LatexEntry:
+    """A heading command (e.g. \\resumeSubheading) together with the \\resumeItem bullets that follow it."""
+
+    __slots__ = ('heading', 'items')
+
+    def __init__(self, heading):
+        self.heading = heading
+        self.items = []
+
+    @property
+    def start(self):
+        return self.heading.start
+
+    @property
+    def end(self):
+        return self.items[-1].end if self.items else self.heading.end
+
+
+class LatexSection:
+    """
+    A \\section and its body.
+
+    `heading_start` is the position of the \\section command, `start` is just past its title argument
+    and `end` is the start of the next \\section (or the end of the document).
+    """
+
+    __slots__ = ('title', 'heading_start', 'start', 'end', 'commands', 'entries')
+
+    def __init__(self, title, heading_start, start):
+        self.title = title
+        self.heading_start = heading_start
+        self.start = start
+        self.end = None
+        self.commands = []
+        self.entries = []
+
+    def find_commands(self, name, first_arg=None):
+        return [
+            command for command in self.commands
+            if command.name == name and (first_arg is None or (command.args and command.args[0].text == first_arg))
+        ]
+
+    def __repr__(self):
+        return f"LatexSection({self.title!r}, {self.start}, {self.end}, entries={len(self.entries)})"
+
+
+class LatexDocument:
+    """The section/entry tree built by a single pass of LatexTokenizer."""
+
+    def __init__(self, content, preamble_commands, sections):
+        self.content = content
+        self.preamble_commands = preamble_commands
+        self.sections = sections
+        self._sections_by_title = {}
+        for section in sections:
+            # Keep the first section with a given title, as the regex-based parser did
+            self._sections_by_title.setdefault(section.title, section)
+
+    def section(self, title):
+        """Return the first section with the given title, or None."""
+        return self._sections_by_title.get(title)
+
+    def to_dict(self):
+        """
+        Serialize the tree to JSON-compatible data. Argument text is not stored, since it is always
+        content[start:end]; entries refer to their commands by index within the section.
+        """
+        def command_data(command):
+            return [command.name, command.start, command.end, [[arg.start, arg.end] for arg in command.args]]
+
+        sections = []
+        for section in self.sections:
+            command_indexes = {id(command): index for index, command in enumerate(section.commands)}
+            sections.append({
+                'title': section.title,
+                'heading_start': section.heading_start,
+                'start': section.start,
+                'end': section.end,
+                'commands': [command_data(command) for command in section.commands],
+                'entries': [
+                    [command_indexes[id(entry.heading)], [command_indexes[id(item)] for item in entry.items]]
+                    for entry in section.entries
+                ],
+            })
+        return {'preamble_commands': [command_data(command) for command in self.preamble_commands], 'sections': sections}
+
+    @classmethod
+    def from_dict(cls, data, content):
+        """Rebuild a document serialized with to_dict() over the same `content`."""
+        def command_from(command_data):
+            name, start, end, spans = command_data
+            return LatexCommand(name, start, end, [LatexArgument(content[arg_start:arg_end], arg_start, arg_end)
+                                                   for arg_start, arg_end in spans])
+
+        sections = []
+        for section_data in data['sections']:
+            section = LatexSection(section_data['title'], section_data['heading_start'], section_data['start'])
+            section.end = section_data['end']
+            section.commands = [command_from(command_data) for command_data in section_data['commands']]
+            for heading_index, item_indexes in section_data['entries']:
+                entry = LatexEntry(section.commands[heading_index])
+                entry.items = [section.commands[index] for index in item_indexes]
+                section.entries.append(entry)
+            sections.append(section)
+        return cls(content, [command_from(command_data) for command_data in data['preamble_commands']], sections)
+
+
+class LatexTokenizer:
+    """
+    Single-pass, brace-aware LaTeX tokenizer.
+
+    The document is walked once from left to right. Comments and escaped characters are skipped,
+    recognised commands have their balanced-brace arguments read with exact character spans, and the
+    commands are grouped into sections and entries as they are found. Arguments are consumed as a
+    whole, so commands nested inside them (e.g. \\textbf inside \\resumeItem) stay part of the argument text.
+    """
+
+    def __init__(self, command_arity=None, optional_trailing_argument=None,
+                 entry_command='resumeSubheading', item_command='resumeItem'):
+        self.command_arity = command_arity if command_arity is not None else DEFAULT_COMMAND_ARITY
+        self.optional_trailing_argument = (
+            optional_trailing_argument if optional_trailing_argument is not None else DEFAULT_OPTIONAL_TRAILING_ARGUMENT
+        )
+        self.entry_command = entry_command
+        self.item_command = item_command
+
+    def tokenize(self, content):
+        """Walk `content` once and return its LatexDocument tree."""
+        preamble_commands = []
+        sections = []
+        current_section = None
+        current_entry = None
+
+        position = 0
+        length = len(content)
+        while position < length:
+            match = _SPECIAL_PATTERN.search(content, position)
+            if not match:
+                break
+            position = match.start()
+
+            if content[position] == '%':
+                newline = content.find('\n', position)
+                position = length if newline == -1 else newline + 1
+                continue
+
+            name_match = _COMMAND_NAME_PATTERN.match(content, position + 1)
+            if not name_match:
+                # Escaped character such as \% or \\ - skip both characters
+                position += 2
+                continue
+
+            name = name_match.group()
+            position = name_match.end()
+            arity = self.command_arity.get(name)
+            if arity is None:
+                continue
+
+            command, position = self._read_command(content, name, arity, name_match.start() - 1, position)
+
+            if name.startswith('section') and command.args:
+                if current_section is not None:
+                    current_section.end = command.start
+                current_section = LatexSection(command.args[0].text, command.start, command.end)
+                sections.append(current_section)
+                current_entry = None
+                continue
+
+            if current_section is None:
+                preamble_commands.append(command)
+                continue
+
+            current_section.commands.append(command)
+            if name == self.entry_command:
+                current_entry = LatexEntry(command)
+                current_section.entries.append(current_entry)
+            elif name == self.item_command and current_entry is not None:
+                current_entry.items.append(command)
+
+        if current_section is not None:
+            current_section.end = length
+
+        return LatexDocument(content, preamble_commands, sections)
+
+    def _read_command(self, content, name, arity, start, position):
+        args = []
+        for _ in range(arity):
+            argument, next_position = self._read_argument(content, position, allow_whitespace=True)
+            if argument is None:
+                break
+            args.append(argument)
+            position = next_position
+
+        if name in self.optional_trailing_argument and len(args) == arity:
+            argument, next_position = self._read_argument(content, position, allow_whitespace=False)
+            if argument is not None:
+                args.append(argument)
+                position = next_position
+
+        return LatexCommand(name, start, position, args), position
+
+    def _read_argument(self, content, position, allow_whitespace):
+        """Read one balanced {...} group at `position`. Returns (None, position) when there is none."""
+        open_position = _WHITESPACE_PATTERN.match(content, position).end() if allow_whitespace else position
+        if open_position >= len(content) or content[open_position] != '{':
+            return None, position
+
+        depth = 0
+        scan = open_position
+        while True:
+            match = _BRACE_PATTERN.search(content, scan)
+            if not match:
+                return None, position  # Unbalanced braces - leave the text to the main walk
+            scan = match.start()
+            char = content[scan]
+            if char == '\\':
+                scan += 2
+                continue
+            if char == '{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    text_start = open_position + 1
+                    return LatexArgument(content[text_start:scan], text_start, scan), scan + 1
+            scan += 1
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    with open(sys.argv[1] if len(sys.argv) > 1 else 'resume.tex', 'r') as file:
+        document = LatexTokenizer().tokenize(file.read())
+    for section in document.sections:
+        print(section)
+        for entry in section.entries:
+            print("   ", entry.heading.arg_texts(), f"{len(entry.items)} items")
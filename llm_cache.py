@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_CACHE_PATH = os.path.join('.resume_tailor_cache', 'llm_responses.sqlite3')
+
+class LLMResponseCache:
+    """
+    Persistent, content-addressed cache for chat completion responses.
+
+    Entries are keyed by a SHA-256 of the model, messages, temperature, max_tokens and (when set) the
+    number of choices and response_format, and stored in a SQLite database. The cache is trimmed with LRU eviction whenever it grows past `max_bytes`, and
+    entries older than `max_age_seconds` are treated as misses and removed.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=50 * 1024 * 1024, max_age_seconds=30 * 24 * 3600, bypass=False):
+        """
+        Params:
+        - path (str): Location of the SQLite database file.
+        - max_bytes (int): Total size of cached responses to keep before evicting least recently used entries.
+        - max_age_seconds (float): Entries older than this are discarded. None keeps entries forever.
+        - bypass (bool): Skip lookups and always call the API. Fresh responses still refresh the cache.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(model, messages, temperature, max_tokens, n=1, response_format=None):
+        """Return the content hash identifying a chat completion request (of `n` choices, in `response_format`)."""
+        request = {'model': model, 'messages': messages, 'temperature': temperature, 'max_tokens': max_tokens}
+        # Only multi-choice and structured requests carry n and response_format, so the keys of existing
+        # free-form entries are unchanged
+        if n != 1:
+            request['n'] = n
+        if response_format:
+            request['response_format'] = response_format
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for `key`, or None on a miss."""
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.max_age_seconds is not None and now - created_at > self.max_age_seconds:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store `value` under `key` and evict old entries if the cache is over its limits."""
+        now = time.time()
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now):
+        # Age-based eviction first, then drop least recently used entries until under the size limit
+        if self.max_age_seconds is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.max_age_seconds,)
+            )
+            self.evictions += cursor.rowcount
+
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        stale_keys = []
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total_size -= size
+
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            entries, total_size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': total_size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    cache = LLMResponseCache()
+    print("LLM response cache:", cache.stats())
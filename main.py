@@ -1,9 +1,17 @@
 import os
-from openai import OpenAI
+import sys
+import asyncio
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 from resume_parser import LatexResumeParser
 from resume_reshaper import ResumeReshaper
 from resume_repackager import LatexResumeRepackager
+from llm_cache import LLMResponseCache
+from request_scheduler import RequestScheduler
+from instrumentation import Tracer
+from jd_compactor import JobDescriptionCompactor
+from posting_index import PostingIndex
+from model_router import load_router, format_router_stats
 
 def get_user_input():
     """
@@ -22,60 +30,217 @@ def get_user_input():
     
     return job_description, resume_path
 
-def main():
+async def tailor_streaming(reshaper, repackager, output_file):
     """
-    Main function to handle user inputs and process the resume.
+    Reshape the resume with streamed completions and write it progressively.
+
+    A near-duplicate of an already tailored posting is written straight from the posting index.
+    Otherwise keywords are extracted first. The experience requests are then started, and their
+    bullet points are printed as they stream in while the technical skills and education are reshaped
+    alongside. Those two sections are applied before the document is written, since they are short
+    and finish long before the experience entries do.
     """
-    # Load the environment variables (including OpenAI API key) from .env file
-    load_dotenv()
+    tracer = reshaper.tracer
+    reused = reshaper.lookup_similar_posting()
+    if reused is not None:
+        new_experience, new_technical_skills, new_education = reused
+        repackager.replace_experience(new_experience)
+        repackager.replace_technical_skills(new_technical_skills)
+        repackager.replace_education(new_education)
+        repackager.save_to_file(output_file)
+        return
+    await reshaper.extract_keywords_async()
+
+    def print_bullet(entry_index, bullet_index, bullet):
+        print(f"  [{entry_index + 1}.{bullet_index + 1}] {bullet}", flush=True)
+
+    experience_stream = reshaper.stream_experience_async(on_bullet=print_bullet)
+    try:
+        with tracer.span('reshape_skills_and_education'):
+            new_technical_skills, new_education = await asyncio.gather(
+                reshaper.reshape_technical_skills_async(),
+                reshaper.reshape_education_async(),
+            )
+    except BaseException:
+        # Nothing will read the experience stream now, so stop its requests
+        await experience_stream.aclose()
+        raise
 
-    # Fetch the OpenAI API key from the environment
-    api_key = os.getenv("OPENAI_API_KEY")
+    print("Updating the resume with new experience, skills, and education...")
+    repackager.replace_technical_skills(new_technical_skills)
+    repackager.replace_education(new_education)
+    # Includes waiting for the experience entries still streaming in
+    with tracer.span('reshape_experience_and_save') as span:
+        new_experience = await repackager.save_to_file_streaming(output_file, experience_stream)
+        span.set(output_bytes=os.path.getsize(output_file))
+    reshaper.record_posting(new_experience, new_technical_skills, new_education)
+    reshaper.save_variants(output_file, new_technical_skills, new_education)
+
+def tailor_resume(job_description, resume_path, output_file='updated_resume.tex', api_key=None, template=None,
+                  keyword_strategy='llm', coverage_threshold=None, structured_output=None, reshape_mode='stream',
+                  bypass_cache=False, requests_per_minute=500, tokens_per_minute=40000, trace_file=None,
+                  metrics_file=None, compile_pdf=False, jd_token_budget=600, reuse_threshold=0.85,
+                  routes_file=None, variants=1):
+    """
+    Tailor a LaTeX resume to a job description and save it as `output_file`.
+
+    Params:
+    - job_description (str): The job description text.
+    - resume_path (str): Path to the .tex resume.
+    - output_file (str): Path of the tailored .tex file.
+    - api_key (str): OpenAI API key. Defaults to OPENAI_API_KEY.
+    - template (str): Resume class layout, see latex_templates.py.
+    - keyword_strategy (str): 'llm', or 'local' to extract keywords offline.
+    - coverage_threshold (float): Keep experience entries that already cover this share of the keywords.
+    - structured_output (str): 'json_object' or 'json_schema' for models that support structured output.
+    - reshape_mode (str): 'stream' to write entries as they are reshaped, or 'single' for one request.
+    - bypass_cache (bool): Ignore cached LLM responses.
+    - requests_per_minute, tokens_per_minute (int): The account's rate limits.
+    - trace_file, metrics_file (str): Export the run's spans as a JSON trace / Prometheus metrics.
+    - compile_pdf (bool): Compile the tailored resume to PDF.
+    - jd_token_budget (int): Tokens of the job description kept after boilerplate is stripped, or
+      None to send the job description unchanged.
+    - reuse_threshold (float): Similarity at which the result of an earlier near-duplicate posting is
+      reused (see posting_index.py), or None to always tailor from scratch.
+    - routes_file (str): JSON file of per-stage model routes and endpoints (see model_router.py).
+      Defaults to the built-in routes.
+    - variants (int): Rewrites requested per experience entry in one call. The best is kept and all
+      of them are saved next to `output_file` (see variant_ranker.py). Not used by reshape_mode 'single'.
+
+    Returns:
+    - int: Exit status, 0 on success.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
     if not api_key:
         print("Error: OpenAI API key not found in the environment. Make sure it is set in the .env file.")
-        exit(1)
-
-    # Initialize the OpenAI client
-    client = OpenAI(api_key=api_key)
-
-    # Step 1: Get job description and resume path from the user
-    job_description, resume_path = get_user_input()
-
-    # Step 2: Parse the user's LaTeX resume
+        return 1
+    try:
+        router = load_router(routes_file)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error: Could not load the model routes: {e}")
+        return 1
+
+    # Initialize the OpenAI clients (the async client lets all sections be reshaped concurrently).
+    # Retries are left to the RequestScheduler, which paces requests to the account's rate limits
+    # and backs off on 429/5xx responses.
+    client = OpenAI(api_key=api_key, max_retries=0)
+    async_client = AsyncOpenAI(api_key=api_key, max_retries=0)
+    scheduler = RequestScheduler(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+
+    # Record a span per stage and LLM call
+    tracer = Tracer()
+
+    # Parse the user's LaTeX resume
     print(f"Parsing resume: {resume_path}")
-    parser = LatexResumeParser(resume_path)
+    with tracer.span('parse') as span:
+        parser = LatexResumeParser.load(resume_path, template=template)
+        span.set(input_bytes=len(parser.content.encode('utf-8')), experience_entries=len(parser.experience),
+                 education_entries=len(parser.education))
 
-    # Step 3: Reshape the resume experience, education, and skills based on the job description
+    # Reshape the resume experience, education, and skills based on the job description
     print("Reshaping resume to align with the job description...")
 
-    # Instantiate the ResumeReshaper
-    reshaper = ResumeReshaper(client=client, parser=parser, job_description=job_description)
-
-    # Extract keywords from the job description
-    reshaper.extract_keywords()
-
-    # Reshape the experience section
-    new_experience = reshaper.reshape_experience()
+    # Reuse responses for unchanged prompts across runs
+    cache = LLMResponseCache(bypass=bypass_cache)
+    compactor = JobDescriptionCompactor(token_budget=jd_token_budget) if jd_token_budget else None
+    posting_index = PostingIndex(threshold=reuse_threshold) if reuse_threshold else None
+    reshaper = ResumeReshaper(
+        client=client, parser=parser, job_description=job_description, async_client=async_client, cache=cache,
+        scheduler=scheduler, tracer=tracer, keyword_strategy=keyword_strategy,
+        coverage_threshold=coverage_threshold, structured_output=structured_output, compactor=compactor,
+        posting_index=posting_index, router=router, variants=variants
+    )
+    if compactor is not None:
+        compactor.library.save()
+
+    # Update the resume and save it
+    repackager = LatexResumeRepackager(parser)
+    with tracer.span('run'):
+        if reshape_mode == "single":
+            # Reshape every section with one request (plus keyword extraction) instead of one per entry
+            with tracer.span('reshape'):
+                new_experience, new_technical_skills, new_education = asyncio.run(reshaper.reshape_all_single_call_async())
+            print("Updating the resume with new experience, skills, and education...")
+            with tracer.span('repackage') as span:
+                repackager.replace_experience(new_experience)
+                repackager.replace_technical_skills(new_technical_skills)
+                repackager.replace_education(new_education)
+                repackager.save_to_file(output_file)
+                span.set(output_bytes=os.path.getsize(output_file))
+            if variants > 1:
+                print("Variants are not generated for single-call reshaping.")
+        else:
+            # Write each experience entry as soon as it is reshaped
+            asyncio.run(tailor_streaming(reshaper, repackager, output_file))
 
-    # Reshape the technical skills section
-    new_technical_skills = reshaper.reshape_technical_skills()
+    print(f"Resume updated and saved as {output_file}")
+    pdf_failed = False
+    if compile_pdf:
+        from pdf_compiler import PdfCompiler
+        with tracer.span('compile_pdf'):
+            result = PdfCompiler().compile(output_file)
+        pdf_failed = result['error'] is not None
+        if pdf_failed:
+            print(f"PDF compilation failed: {result['error']}")
+        else:
+            print(f"PDF saved as {result['pdf_path']} ({result['status']} in {result['seconds']:.1f}s)")
+    print(f"LLM cache: {cache.stats()}")
+    print(f"Request scheduler: {scheduler.stats()}")
+    print(format_router_stats(router))
+
+    tracer.print_summary()
+    if trace_file:
+        tracer.export_json(trace_file)
+        print(f"Trace written to {trace_file}")
+    if metrics_file:
+        tracer.export_prometheus(metrics_file)
+        print(f"Metrics written to {metrics_file}")
+    return 1 if pdf_failed else 0
 
-    # Optionally, reshape education if needed
-    new_education = reshaper.reshape_education()
+def main():
+    """
+    Main function to handle user inputs and process the resume.
 
-    # Step 4: Update the resume with the new information
-    print("Updating the resume with new experience, skills, and education...")
-    repackager = LatexResumeRepackager(parser)
+    Settings come from environment variables: RESUME_TEMPLATE, KEYWORD_STRATEGY=local to extract
+    keywords offline, COVERAGE_THRESHOLD=0.6 to keep experience entries that already cover 60% of the
+    keywords, STRUCTURED_OUTPUT=json_object or json_schema, RESHAPE_MODE=single, LLM_CACHE_BYPASS=1,
+    OPENAI_RPM/OPENAI_TPM, TRACE_FILE/METRICS_FILE, COMPILE_PDF=1, JD_TOKEN_BUDGET (0 sends the job
+    description without compaction), REUSE_THRESHOLD (0 never reuses the result of a near-duplicate
+    posting), MODEL_ROUTES (a JSON file of per-stage model routes) and VARIANTS (rewrites requested per
+    experience entry, ranked locally). For scripting, use cli.py instead.
+    """
+    # Load the environment variables (including OpenAI API key) from .env file
+    load_dotenv()
 
-    repackager.replace_experience(new_experience)
-    repackager.replace_technical_skills(new_technical_skills)
+    # Fetch the OpenAI API key from the environment
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OpenAI API key not found in the environment. Make sure it is set in the .env file.")
+        return 1
 
-    # Step 5: Save the updated resume to a new file
-    output_file = 'updated_resume.tex'
-    repackager.save_to_file(output_file)
+    # Get job description and resume path from the user
+    job_description, resume_path = get_user_input()
 
-    print(f"Resume updated and saved as {output_file}")
+    coverage_threshold = os.getenv("COVERAGE_THRESHOLD")
+    return tailor_resume(
+        job_description, resume_path, api_key=api_key,
+        template=os.getenv("RESUME_TEMPLATE") or None,
+        keyword_strategy=os.getenv("KEYWORD_STRATEGY", "llm"),
+        coverage_threshold=float(coverage_threshold) if coverage_threshold else None,
+        structured_output=os.getenv("STRUCTURED_OUTPUT") or None,
+        reshape_mode=os.getenv("RESHAPE_MODE", "stream"),
+        bypass_cache=os.getenv("LLM_CACHE_BYPASS") == "1",
+        requests_per_minute=int(os.getenv("OPENAI_RPM", "500")),
+        tokens_per_minute=int(os.getenv("OPENAI_TPM", "40000")),
+        trace_file=os.getenv("TRACE_FILE") or None,
+        metrics_file=os.getenv("METRICS_FILE") or None,
+        compile_pdf=os.getenv("COMPILE_PDF") == "1",
+        jd_token_budget=int(os.getenv("JD_TOKEN_BUDGET", "600")),
+        reuse_threshold=float(os.getenv("REUSE_THRESHOLD", "0.85")),
+        routes_file=os.getenv("MODEL_ROUTES") or None,
+        variants=int(os.getenv("VARIANTS", "1")),
+    )
 
 # Entry point of the script
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from request_scheduler import RETRYABLE_ERROR_NAMES
+
+# Stage names are the span names ResumeReshaper gives its LLM calls. Every stage keeps gpt-4, the model
+# the reshaper has always used, with a faster fallback; keyword extraction gets a tighter timeout and p95.
+# 'max_tokens': null keeps the reshaper's own budget (the whole-resume budget depends on the resume).
+DEFAULT_ROUTES = {
+    'keywords': {'models': ['gpt-4', 'gpt-4o'], 'max_tokens': 150, 'timeout': 20, 'max_p95': 8},
+    'experience': {'models': ['gpt-4', 'gpt-4o'], 'max_tokens': 500, 'timeout': 60, 'max_p95': 30},
+    'education': {'models': ['gpt-4', 'gpt-4o'], 'max_tokens': 300, 'timeout': 45, 'max_p95': 20},
+    'technical_skills': {'models': ['gpt-4', 'gpt-4o'], 'max_tokens': 300, 'timeout': 45, 'max_p95': 20},
+    'whole_resume': {'models': ['gpt-4', 'gpt-4o'], 'max_tokens': None, 'timeout': 180, 'max_p95': 120},
+}
+
+
+def is_model_failure(error):
+    """
+    True for errors a different model or endpoint might not hit: server errors (5xx), timeouts and
+    connection failures. Rate limits (429) are left to the RequestScheduler, and other client errors
+    (400, 401, ...) would fail the same way on every model.
+    """
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code >= 500
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+class ModelStats:
+    """Latency and outcome of one model's recent requests, over a rolling time window."""
+
+    def __init__(self, window_seconds=300, max_samples=500):
+        self.window_seconds = window_seconds
+        self.samples = deque(maxlen=max_samples)  # (monotonic time, seconds, succeeded)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, seconds, succeeded, now=None):
+        self.samples.append((now or time.monotonic(), seconds, succeeded))
+        self.requests += 1
+        if not succeeded:
+            self.errors += 1
+
+    def recent(self, now=None):
+        cutoff = (now or time.monotonic()) - self.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return self.samples
+
+    def summary(self, now=None):
+        """Return the window's sample count, p50/p95 latency (failed requests included) and error rate."""
+        samples = self.recent(now)
+        if not samples:
+            return {'samples': 0, 'p50': None, 'p95': None, 'error_rate': 0.0}
+        latencies = sorted(seconds for _, seconds, _ in samples)
+        return {
+            'samples': len(samples),
+            'p50': latencies[(len(latencies) - 1) // 2],
+            'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'error_rate': sum(1 for _, _, succeeded in samples if not succeeded) / len(samples),
+        }
+
+
+class Route:
+    """The models, output budget and timeout used for one stage, from a DEFAULT_ROUTES-style entry."""
+
+    def __init__(self, stage, models, max_tokens=None, timeout=None, temperature=0.7, max_p95=None):
+        """
+        Params:
+        - stage (str): The reshaper stage (span name) this route serves.
+        - models (list): Model names in order of preference. 'endpoint:model' sends the request to a
+          configured endpoint instead of the default client.
+        - max_tokens (int): Completion budget, or None to keep the reshaper's.
+        - timeout (float): Seconds before a request is abandoned and the next model is tried.
+        - temperature (float): Sampling temperature.
+        - max_p95 (float): p95 latency in seconds above which a model counts as slow. Defaults to
+          half the timeout.
+        """
+        if not models:
+            raise ValueError(f"Route '{stage}' has no models.")
+        self.stage = stage
+        self.models = list(models)
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.temperature = temperature
+        self.max_p95 = max_p95 if max_p95 is not None else (timeout / 2 if timeout else None)
+
+
+class ModelRouter:
+    """
+    Choose the model for each LLM call by stage, and move traffic off models that are slow or failing.
+
+    Every model's latency and errors are tracked over a rolling window. A model whose error rate or
+    p95 latency exceeds its route's limits (after `min_samples` requests) is moved behind the other
+    models of the route until those samples age out of the window, and a request that fails or times
+    out on one model is retried on the next. One router is meant to be shared by every reshaper of a
+    run, so they all learn from each other's requests.
+    """
+
+    def __init__(self, routes=None, endpoints=None, window_seconds=300, min_samples=5, max_error_rate=0.25,
+                 retries_before_fallback=1):
+        """
+        Params:
+        - routes (dict): Stage name -> Route keyword arguments. Defaults to DEFAULT_ROUTES. A 'default'
+          route, if given, serves stages without their own.
+        - endpoints (dict): Endpoint name -> {'base_url': ..., 'api_key': ... or 'api_key_env': ...}
+          for OpenAI-compatible servers (e.g. a local model or fake_openai_server.py).
+        - window_seconds (float): How long latency and error samples count.
+        - min_samples (int): Requests in the window before a model can be judged slow or failing.
+        - max_error_rate (float): Error share above which a model counts as failing.
+        - retries_before_fallback (int): Scheduler retries on one model before the next is tried.
+        """
+        routes = DEFAULT_ROUTES if routes is None else routes
+        self.routes = {stage: Route(stage, **settings) for stage, settings in routes.items()}
+        self.endpoints = dict(endpoints or {})
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.retries_before_fallback = retries_before_fallback
+        self.fallbacks = 0
+        self._stats = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load {"routes": {...}, "endpoints": {...}} from a JSON file. Stages it leaves out keep DEFAULT_ROUTES."""
+        with open(path, 'r') as file:
+            config = json.load(file)
+        routes = dict(DEFAULT_ROUTES)
+        routes.update(config.get('routes', {}))
+        return cls(routes=routes, endpoints=config.get('endpoints'), **kwargs)
+
+    def targets(self, stage, max_tokens=None, temperature=0.7):
+        """
+        The models to try for one request of `stage`, best first.
+
+        Returns:
+        - list: dicts with model (the name sent to the API), spec (as configured), endpoint (None for
+          the default client), max_tokens, timeout and temperature.
+        """
+        route = self.routes.get(stage) or self.routes.get('default')
+        if route is None:
+            return [{'model': 'gpt-4', 'spec': 'gpt-4', 'endpoint': None, 'max_tokens': max_tokens,
+                     'timeout': None, 'temperature': temperature}]
+
+        healthy, degraded = [], []
+        now = time.monotonic()
+        with self._lock:
+            for spec in route.models:
+                (degraded if self._is_degraded(spec, route, now) else healthy).append(spec)
+
+        targets = []
+        for spec in healthy + degraded:
+            endpoint, model = self.split_spec(spec)
+            targets.append({
+                'model': model,
+                'spec': spec,
+                'endpoint': endpoint,
+                'max_tokens': route.max_tokens if route.max_tokens is not None else max_tokens,
+                'timeout': route.timeout,
+                'temperature': route.temperature,
+            })
+        return targets
+
+    def split_spec(self, spec):
+        """Split 'endpoint:model' into (endpoint, model) when the prefix is a configured endpoint."""
+        endpoint, separator, model = spec.partition(':')
+        if separator and endpoint in self.endpoints:
+            return endpoint, model
+        return None, spec
+
+    def record(self, spec, seconds, succeeded):
+        with self._lock:
+            stats = self._stats.get(spec)
+            if stats is None:
+                stats = self._stats[spec] = ModelStats(self.window_seconds)
+            stats.record(seconds, succeeded)
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def client(self, endpoint, asynchronous=False):
+        """The (async) OpenAI client for a configured endpoint, created on first use."""
+        key = (endpoint, asynchronous)
+        with self._lock:
+            if key not in self._clients:
+                from openai import OpenAI, AsyncOpenAI
+
+                settings = self.endpoints[endpoint]
+                api_key = settings.get('api_key') or os.getenv(settings.get('api_key_env', ''), '') or 'not-needed'
+                client_class = AsyncOpenAI if asynchronous else OpenAI
+                # Retries are left to the RequestScheduler and the fallback models
+                self._clients[key] = client_class(base_url=settings['base_url'], api_key=api_key, max_retries=0)
+            return self._clients[key]
+
+    def stats(self):
+        """Per model: requests and errors so far, plus the window's p50/p95 latency and error rate."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                spec: dict(stats.summary(now), requests=stats.requests, errors=stats.errors)
+                for spec, stats in sorted(self._stats.items())
+            }
+
+    def _is_degraded(self, spec, route, now):
+        stats = self._stats.get(spec)
+        if stats is None:
+            return False
+        summary = stats.summary(now)
+        if summary['samples'] < self.min_samples:
+            return False
+        if summary['error_rate'] > self.max_error_rate:
+            return True
+        return route.max_p95 is not None and summary['p95'] > route.max_p95
+
+
+def load_router(path=None):
+    """The router for a run: DEFAULT_ROUTES, with the stages and endpoints of the JSON config at `path` if given."""
+    return ModelRouter.from_file(path) if path else ModelRouter()
+
+
+def format_router_stats(router):
+    lines = [f"{'Model':<28} {'Requests':>8} {'Errors':>6} {'p50 s':>7} {'p95 s':>7} {'Err %':>6}"]
+    for spec, stats in router.stats().items():
+        p50 = f"{stats['p50']:.2f}" if stats['p50'] is not None else '-'
+        p95 = f"{stats['p95']:.2f}" if stats['p95'] is not None else '-'
+        lines.append(f"{spec:<28} {stats['requests']:>8} {stats['errors']:>6} {p50:>7} {p95:>7} "
+                     f"{stats['error_rate'] * 100:>5.0f}%")
+    lines.append(f"Fallbacks: {router.fallbacks}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Print the model routes in effect for each reshaping stage.")
+    arg_parser.add_argument('routes', nargs='?', help="JSON routing config (defaults to the built-in routes)")
+    args = arg_parser.parse_args(argv)
+
+    router = load_router(args.routes)
+    for stage, route in router.routes.items():
+        print(f"{stage:<18} {' -> '.join(route.models):<40} max_tokens={route.max_tokens} "
+              f"timeout={route.timeout}s max_p95={route.max_p95}s temperature={route.temperature}")
+    for name, settings in router.endpoints.items():
+        print(f"endpoint {name}: {settings['base_url']}")
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import os
+import re
+import sys
+import time
+import glob
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_PDF_CACHE_DIR = os.path.join('.resume_tailor_cache', 'pdf')
+
+# Auxiliary files kept per preamble so the next compile of the same resume class starts from them
+AUX_EXTENSIONS = ('.aux', '.out', '.toc')
+# Fixed job name inside the temporary build directory, so cached aux files fit every document
+_JOB_NAME = 'resume'
+_MAX_PDFLATEX_PASSES = 3
+_RERUN_PATTERN = re.compile(r'Rerun to get|Label\(s\) may have changed|rerunfilecheck', re.IGNORECASE)
+_ERROR_LINE_PATTERN = re.compile(r'^(?:! .*|.*:\d+: .*)$', re.MULTILINE)
+
+
+def find_latex_engine(preferred=None):
+    """
+    Return the LaTeX engine to compile with: `preferred` if given, otherwise latexmk, falling back to pdflatex.
+
+    Returns:
+    - str or None: The engine name, or None if neither is installed.
+    """
+    candidates = [preferred] if preferred else ['latexmk', 'pdflatex']
+    for engine in candidates:
+        if shutil.which(engine):
+            return engine
+    return None
+
+
+def preamble_key(content):
+    """Hash of everything before \\begin{document}, which identifies the resume class and packages."""
+    end = content.find('\\begin{document}')
+    return hashlib.sha256(content[:end if end != -1 else len(content)].encode('utf-8')).hexdigest()[:16]
+
+
+def content_key(engine, content):
+    return hashlib.sha256(f"{engine}\0{content}".encode('utf-8')).hexdigest()
+
+
+class PdfCompiler:
+    """
+    Compile tailored .tex files to PDF with a pool of worker processes.
+
+    Every document is built in its own temporary directory (with the .tex file's directory on
+    TEXINPUTS, so local class files and \\input files are still found), which keeps parallel builds
+    from overwriting each other's aux files. Two caches live under `cache_dir`:
+    - Built PDFs keyed by a hash of the engine and the .tex content. An unchanged document is copied
+      from there instead of being recompiled.
+    - The .aux files of the last successful build per preamble. Tailored resumes of the same class
+      share their labels and references, so a build seeded with them usually needs a single pass.
+    """
+
+    def __init__(self, engine=None, workers=None, cache_dir=DEFAULT_PDF_CACHE_DIR, timeout=120):
+        """
+        Params:
+        - engine (str): 'latexmk' or 'pdflatex'. Defaults to whichever is installed, latexmk first.
+        - workers (int): Documents compiled at the same time. Defaults to the number of CPU cores.
+        - cache_dir (str): Directory for the PDF and aux caches, or None to always compile from scratch.
+        - timeout (float): Seconds before a single engine run is abandoned.
+        """
+        self.engine = find_latex_engine(engine)
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+
+    def compile(self, tex_path, pdf_path=None):
+        """
+        Compile one document in this process.
+
+        Returns:
+        - dict: tex_path, pdf_path, status ('compiled', 'cached' or 'failed'), seconds, passes and error.
+        """
+        if pdf_path is None:
+            pdf_path = os.path.splitext(tex_path)[0] + '.pdf'
+        if self.engine is None:
+            return _failed(tex_path, pdf_path, 0.0, "No LaTeX engine found. Install latexmk or pdflatex.")
+        return _compile_document(self.engine, tex_path, pdf_path, self.cache_dir, self.timeout)
+
+    def compile_many(self, tex_paths, output_dir=None):
+        """
+        Compile several documents in parallel, one per worker process.
+
+        Params:
+        - tex_paths (list): Paths of the .tex files.
+        - output_dir (str): Directory for the PDFs. Defaults to next to each .tex file.
+
+        Returns:
+        - list: One result dict per document (see compile()), in the order of `tex_paths`.
+        """
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        pdf_paths = [
+            os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + '.pdf') if output_dir
+            else os.path.splitext(path)[0] + '.pdf'
+            for path in tex_paths
+        ]
+        if self.engine is None or len(tex_paths) <= 1 or self.workers <= 1:
+            return [self.compile(tex_path, pdf_path) for tex_path, pdf_path in zip(tex_paths, pdf_paths)]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tex_paths))) as pool:
+            futures = [
+                pool.submit(_compile_document, self.engine, tex_path, pdf_path, self.cache_dir, self.timeout)
+                for tex_path, pdf_path in zip(tex_paths, pdf_paths)
+            ]
+            return [future.result() for future in futures]
+
+
+def _compile_document(engine, tex_path, pdf_path, cache_dir, timeout):
+    """Build one document in a temporary directory. Runs in a worker process, so it must stay module-level."""
+    started = time.perf_counter()
+    try:
+        with open(tex_path, 'r') as file:
+            content = file.read()
+    except OSError as e:
+        return _failed(tex_path, pdf_path, time.perf_counter() - started, str(e))
+
+    cached_pdf = aux_dir = None
+    if cache_dir:
+        cached_pdf = os.path.join(cache_dir, f"{content_key(engine, content)}.pdf")
+        aux_dir = os.path.join(cache_dir, 'aux', preamble_key(content))
+        if os.path.exists(cached_pdf):
+            _copy_into_place(cached_pdf, pdf_path)
+            return _result(tex_path, pdf_path, 'cached', time.perf_counter() - started, 0, None)
+
+    with tempfile.TemporaryDirectory(prefix='resume_pdf_') as build_dir:
+        with open(os.path.join(build_dir, f"{_JOB_NAME}.tex"), 'w') as file:
+            file.write(content)
+        if aux_dir and os.path.isdir(aux_dir):
+            for path in glob.glob(os.path.join(aux_dir, f"{_JOB_NAME}.*")):
+                shutil.copy(path, build_dir)
+
+        # A trailing separator keeps the engine's default search path after the source directory
+        source_dir = os.path.dirname(os.path.abspath(tex_path))
+        env = dict(os.environ, TEXINPUTS=f"{source_dir}{os.pathsep}{os.environ.get('TEXINPUTS', '')}")
+
+        passes, error = _run_engine(engine, build_dir, env, timeout, os.path.basename(tex_path))
+        built_pdf = os.path.join(build_dir, f"{_JOB_NAME}.pdf")
+        if error is None and not os.path.exists(built_pdf):
+            error = "The engine finished without producing a PDF."
+        if error is not None:
+            return _failed(tex_path, pdf_path, time.perf_counter() - started, error, passes)
+
+        _copy_into_place(built_pdf, pdf_path)
+        if cache_dir:
+            try:
+                _copy_into_place(built_pdf, cached_pdf)
+                os.makedirs(aux_dir, exist_ok=True)
+                for extension in AUX_EXTENSIONS:
+                    aux_path = os.path.join(build_dir, _JOB_NAME + extension)
+                    if os.path.exists(aux_path):
+                        _copy_into_place(aux_path, os.path.join(aux_dir, _JOB_NAME + extension))
+            except OSError as e:
+                print(f"Could not cache the build of {tex_path}: {e}")
+
+    return _result(tex_path, pdf_path, 'compiled', time.perf_counter() - started, passes, None)
+
+
+def _run_engine(engine, build_dir, env, timeout, tex_name):
+    """Run the engine in `build_dir`. Returns (passes, error), where error is None on success."""
+    flags = ['-interaction=nonstopmode', '-halt-on-error', '-file-line-error']
+    if engine == 'latexmk':
+        commands = [['latexmk', '-pdf', *flags, f"{_JOB_NAME}.tex"]]
+    else:
+        commands = [[engine, *flags, f"{_JOB_NAME}.tex"]] * _MAX_PDFLATEX_PASSES
+
+    passes = 0
+    for command in commands:
+        passes += 1
+        try:
+            completed = subprocess.run(command, cwd=build_dir, env=env, stdin=subprocess.DEVNULL,
+                                       capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return passes, f"{engine} timed out after {timeout}s"
+        except OSError as e:
+            return passes, f"Could not run {engine}: {e}"
+
+        log = _read_log(build_dir)
+        if completed.returncode != 0:
+            return passes, _error_summary(log, tex_name) or f"{engine} exited with status {completed.returncode}"
+        # latexmk reruns pdflatex itself; plain pdflatex only needs another pass if it asks for one
+        if engine == 'latexmk' or not _RERUN_PATTERN.search(log):
+            break
+    return passes, None
+
+
+def _read_log(build_dir):
+    try:
+        with open(os.path.join(build_dir, f"{_JOB_NAME}.log"), 'r', errors='replace') as file:
+            return file.read()
+    except OSError:
+        return ''
+
+
+def _error_summary(log, tex_name, limit=3):
+    """The first few error lines of a LaTeX log (with -file-line-error they read file:line: message)."""
+    lines = [line.strip() for line in _ERROR_LINE_PATTERN.findall(log)]
+    return '; '.join(lines[:limit]).replace(f"./{_JOB_NAME}.tex:", f"{tex_name}:")
+
+
+def _copy_into_place(source, destination):
+    """Copy through a temporary file and rename, so readers never see a partly written PDF."""
+    directory = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{destination}.{os.getpid()}.tmp"
+    shutil.copyfile(source, temporary_path)
+    os.replace(temporary_path, destination)
+
+
+def _result(tex_path, pdf_path, status, seconds, passes, error):
+    return {'tex_path': tex_path, 'pdf_path': pdf_path if error is None else None, 'status': status,
+            'seconds': seconds, 'passes': passes, 'error': error}
+
+
+def _failed(tex_path, pdf_path, seconds, error, passes=0):
+    return _result(tex_path, pdf_path, 'failed', seconds, passes, error)
+
+
+def summarize(results, elapsed):
+    """Aggregate compile results: counts per status, total and slowest compile times."""
+    compiled = [result for result in results if result['status'] == 'compiled']
+    return {
+        'documents': len(results),
+        'compiled': len(compiled),
+        'cached': sum(1 for result in results if result['status'] == 'cached'),
+        'failed': sum(1 for result in results if result['status'] == 'failed'),
+        'elapsed_seconds': elapsed,
+        'compile_seconds': sum(result['seconds'] for result in compiled),
+        'slowest_seconds': max((result['seconds'] for result in compiled), default=0.0),
+    }
+
+
+def print_report(results, elapsed):
+    for result in results:
+        if result['error']:
+            print(f"  FAILED {result['tex_path']} ({result['seconds']:.2f}s): {result['error']}")
+        else:
+            passes = f", {result['passes']} pass{'es' if result['passes'] != 1 else ''}" if result['passes'] else ''
+            print(f"  {result['status']:<8} {result['pdf_path']} ({result['seconds']:.2f}s{passes})")
+    summary = summarize(results, elapsed)
+    print(f"PDFs: {summary['compiled']} compiled, {summary['cached']} unchanged, {summary['failed']} failed "
+          f"in {elapsed:.1f}s ({summary['compile_seconds']:.1f}s of compile time)")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compile LaTeX resumes to PDF in parallel.")
+    arg_parser.add_argument('paths', nargs='+', help=".tex files, or directories whose .tex files are compiled")
+    arg_parser.add_argument('--output-dir', default=None, help="Directory for the PDFs (defaults to next to each .tex file)")
+    arg_parser.add_argument('--engine', choices=('latexmk', 'pdflatex'), default=None,
+                            help="LaTeX engine (defaults to latexmk if installed, otherwise pdflatex)")
+    arg_parser.add_argument('--workers', type=int, default=None, help="Documents compiled at once (defaults to the CPU count)")
+    arg_parser.add_argument('--timeout', type=float, default=120, help="Seconds before a compile is abandoned")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Recompile even if the .tex content is unchanged")
+    args = arg_parser.parse_args(argv)
+
+    tex_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            tex_paths.extend(sorted(glob.glob(os.path.join(path, '*.tex'))))
+        else:
+            tex_paths.append(path)
+    if not tex_paths:
+        print("Error: No .tex files found.")
+        return 1
+
+    compiler = PdfCompiler(engine=args.engine, workers=args.workers, timeout=args.timeout,
+                           cache_dir=None if args.no_cache else DEFAULT_PDF_CACHE_DIR)
+    if compiler.engine is None:
+        print("Error: No LaTeX engine found. Install latexmk or pdflatex (TeX Live or MiKTeX).")
+        return 1
+
+    print(f"Compiling {len(tex_paths)} document(s) with {compiler.engine} on {compiler.workers} worker(s)...")
+    started = time.perf_counter()
+    results = compiler.compile_many(tex_paths, args.output_dir)
+    print_report(results, time.perf_counter() - started)
+    return 1 if any(result['error'] for result in results) else 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
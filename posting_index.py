@@ -0,0 +1,257 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import argparse
+import threading
+from array import array
+
+DEFAULT_POSTING_INDEX_PATH = os.path.join('.resume_tailor_cache', 'posting_index.sqlite3')
+
+_MASK64 = (1 << 64) - 1
+_WORD_PATTERN = re.compile(r'[a-z0-9+#]+')
+
+
+def shingles(text, size=3):
+    """CRC32 hashes of the overlapping `size`-word shingles of the normalised (lowercase, alphanumeric) text."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))}
+    return {zlib.crc32(' '.join(words[index:index + size]).encode('utf-8')) for index in range(len(words) - size + 1)}
+
+
+def resume_hash(parser):
+    """Identify a resume by its content and template, so results are only reused for the same resume."""
+    return hashlib.sha256(f"{parser.template.name}\0{parser.content}".encode('utf-8')).hexdigest()
+
+
+def settings_hash(settings):
+    """Fingerprint of the settings a result was tailored with (a JSON-serialisable dict)."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class PostingIndex:
+    """
+    Persistent MinHash/LSH index of tailored job postings and their results.
+
+    Each posting is reduced to a one-permutation MinHash signature of its word shingles: every
+    shingle is hashed once and the hash lands in one of `num_perm` bins, each keeping its minimum
+    (empty bins borrow from the next filled one). The signature is split into `bands` bands.
+    A band's values (together with the resume hash) form a bucket key stored in an indexed SQLite
+    table, so a lookup is one indexed query for the candidate postings sharing any bucket, followed
+    by comparing their signatures. Postings whose estimated Jaccard similarity reaches `threshold`
+    are near-duplicates: the same role reposted with a new requisition id, location or wording.
+    Each posting also records a fingerprint of the settings it was tailored with, so a lookup can be
+    limited to results produced the same way.
+    """
+
+    def __init__(self, path=DEFAULT_POSTING_INDEX_PATH, num_perm=64, bands=16, threshold=0.85, shingle_size=3, seed=1):
+        """
+        Params:
+        - path (str): Location of the SQLite database file.
+        - num_perm (int): MinHash signature length. Must be divisible by `bands`.
+        - bands (int): LSH bands. More bands find less similar candidates at the cost of more comparisons.
+        - threshold (float): Minimum estimated Jaccard similarity for a posting to count as a near-duplicate.
+        - shingle_size (int): Words per shingle.
+        - seed (int): Seed of the shingle hash. Changing it (or num_perm) invalidates stored signatures.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        generator = random.Random(seed)
+        # Odd multiplier and offset of the multiply-add hash that mixes the shingles' CRC32 values
+        self._multiplier = generator.getrandbits(64) | 1
+        self._offset = generator.getrandbits(64)
+        self._parameters = f"{num_perm}:{bands}:{shingle_size}:{seed}"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            """CREATE TABLE IF NOT EXISTS postings (
+                id INTEGER PRIMARY KEY,
+                resume_hash TEXT NOT NULL,
+                parameters TEXT NOT NULL,
+                settings TEXT NOT NULL DEFAULT '',
+                label TEXT,
+                signature BLOB NOT NULL,
+                keywords TEXT NOT NULL,
+                local_keywords TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                key INTEGER NOT NULL,
+                posting_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key);"""
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(postings)")}
+        if 'settings' not in columns:
+            # Postings indexed before settings were recorded never match a settings fingerprint
+            self._connection.execute("ALTER TABLE postings ADD COLUMN settings TEXT NOT NULL DEFAULT ''")
+        self._connection.commit()
+
+    def signature(self, text):
+        """One-permutation MinHash signature of `text`, with empty bins densified from their right neighbour."""
+        bin_count = self.num_perm
+        multiplier, offset = self._multiplier, self._offset
+        bins = [None] * bin_count
+        for value in shingles(text, self.shingle_size):
+            mixed = (value * multiplier + offset) & _MASK64
+            position, rank = mixed % bin_count, mixed // bin_count
+            current = bins[position]
+            if current is None or rank < current:
+                bins[position] = rank
+
+        if None in bins:
+            original = bins[:]
+            for position in range(bin_count):
+                if original[position] is None:
+                    # Borrow the nearest filled bin to the right, offset by the distance so borrowed values stay distinct
+                    distance = next(step for step in range(1, bin_count) if original[(position + step) % bin_count] is not None)
+                    bins[position] = (original[(position + distance) % bin_count] + distance * 0x9E3779B97F4A7C15) & _MASK64
+        return array('Q', bins)
+
+    def query(self, resume_hash, job_description, signature=None, settings=None):
+        """
+        Find the most similar posting already tailored against the same resume, and with the same
+        settings fingerprint (see settings_hash()) unless `settings` is None.
+
+        Returns:
+        - dict or None: id, label, similarity, keywords, local_keywords, experience, technical_skills
+          and education of the best match at or above the threshold.
+        """
+        signature = signature if signature is not None else self.signature(job_description)
+        keys = self._bucket_keys(resume_hash, signature)
+        query = (f"SELECT id, signature FROM postings WHERE id IN "
+                 f"(SELECT posting_id FROM buckets WHERE key IN ({','.join('?' * len(keys))})) AND parameters = ?")
+        parameters = (*keys, self._parameters)
+        if settings is not None:
+            query += " AND settings = ?"
+            parameters += (settings,)
+        with self._lock:
+            candidate_rows = self._connection.execute(query, parameters).fetchall()
+
+            best_id, best_similarity = None, 0.0
+            for posting_id, stored in candidate_rows:
+                similarity = self._similarity(signature, array('Q', stored))
+                if similarity > best_similarity:
+                    best_id, best_similarity = posting_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            label, keywords, local_keywords, result = self._connection.execute(
+                "SELECT label, keywords, local_keywords, result FROM postings WHERE id = ?", (best_id,)
+            ).fetchone()
+
+        result = json.loads(result)
+        return {
+            'id': best_id,
+            'label': label,
+            'similarity': best_similarity,
+            'keywords': json.loads(keywords),
+            'local_keywords': json.loads(local_keywords),
+            'experience': result['experience'],
+            'technical_skills': result['technical_skills'],
+            'education': result['education'],
+        }
+
+    def add(self, resume_hash, job_description, keywords, local_keywords, experience, technical_skills, education,
+            label=None, signature=None, settings=''):
+        """Index a tailored posting and its result, with the fingerprint of its settings. Returns the new posting id."""
+        signature = signature if signature is not None else self.signature(job_description)
+        result = {'experience': experience, 'technical_skills': technical_skills, 'education': education}
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO postings (resume_hash, parameters, settings, label, signature, keywords, local_keywords, result, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (resume_hash, self._parameters, settings, label, signature.tobytes(), json.dumps(keywords),
+                 json.dumps(local_keywords), json.dumps(result), time.time()),
+            )
+            posting_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO buckets (key, posting_id) VALUES (?, ?)",
+                [(key, posting_id) for key in self._bucket_keys(resume_hash, signature)],
+            )
+            self._connection.commit()
+        return posting_id
+
+    def stats(self):
+        with self._lock:
+            postings = self._connection.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        return {'postings': postings, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        self._connection.close()
+
+    def _bucket_keys(self, resume_hash, signature):
+        """One signed 64-bit key per band, from the resume hash, the band number and the band's values."""
+        prefix = resume_hash.encode('utf-8')
+        keys = []
+        for band in range(self.bands):
+            values = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(prefix + band.to_bytes(2, 'little') + values.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def _similarity(self, signature, other):
+        """Estimated Jaccard similarity: the share of signature positions that agree."""
+        return sum(1 for left, right in zip(signature, other) if left == right) / self.num_perm
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Look up a job description in the posting index.")
+    arg_parser.add_argument('resume', help="Path to the LaTeX resume (.tex file) the postings were tailored against")
+    arg_parser.add_argument('job', nargs='?', help="Path to the job description (reads stdin when omitted)")
+    arg_parser.add_argument('--index', default=DEFAULT_POSTING_INDEX_PATH, help="Path of the index database")
+    arg_parser.add_argument('--threshold', type=float, default=0.85, help="Minimum similarity of a near-duplicate")
+    arg_parser.add_argument('--jd-token-budget', type=int, default=600,
+                            help="The token budget the postings were compacted with when they were tailored")
+    arg_parser.add_argument('--no-compact', action='store_true', help="The postings were tailored without compaction")
+    args = arg_parser.parse_args(argv)
+
+    from resume_parser import LatexResumeParser
+    from jd_compactor import JobDescriptionCompactor
+
+    if args.job:
+        with open(args.job, 'r') as file:
+            job_description = file.read()
+    else:
+        job_description = sys.stdin.read()
+    if not args.no_compact:
+        # Postings are indexed as the reshaper saw them; the learned library is not saved from here
+        job_description = JobDescriptionCompactor(token_budget=args.jd_token_budget).compact(job_description)['text']
+
+    index = PostingIndex(args.index, threshold=args.threshold)
+    resume = resume_hash(LatexResumeParser.load(args.resume))
+    started = time.perf_counter()
+    match = index.query(resume, job_description)
+    elapsed = time.perf_counter() - started
+    print(f"Indexed postings: {index.stats()['postings']}")
+    if match is None:
+        print(f"No near-duplicate found ({elapsed * 1000:.2f} ms).")
+    else:
+        print(f"Near-duplicate of '{match['label']}' ({match['similarity']:.0%} similar, {elapsed * 1000:.2f} ms)")
+        print(f"Keywords: {', '.join(match['keywords'])}")
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+
+PRIORITY_HIGH = 0    # Critical-path calls, e.g. extract_keywords
+PRIORITY_NORMAL = 1  # Section rewrites
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {'APIConnectionError', 'APITimeoutError'}
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` tokens are available (0 if they are available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # A request larger than the bucket only needs a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RequestScheduler:
+    """
+    Paces, prioritises and retries LLM requests.
+
+    Every request is admitted through two token buckets, one for requests per minute and one for
+    tokens per minute, using the prompt size and max_tokens to estimate its token cost. Waiting
+    requests are admitted strictly by priority lane, then in arrival order, so keyword extraction
+    goes ahead of queued rewrites. Rate-limit (429), timeout and 5xx errors are retried with jittered
+    exponential backoff. A Retry-After header from the server pauses every lane until it expires.
+    """
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=40000, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+        self._waiting = []  # Heap of (priority, sequence) for blocked threads
+        self._condition = threading.Condition(self._lock)
+        self._async_waiting = []  # Heap of (priority, sequence) for waiting coroutines
+        self._async_condition = None
+        self._async_condition_loop = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.throttled_seconds = 0.0
+
+    @staticmethod
+    def estimate_tokens(messages, max_tokens):
+        """Estimate a request's token cost: about four characters per prompt token, plus the completion budget."""
+        prompt_characters = sum(len(message.get('content') or '') for message in messages)
+        return prompt_characters // 4 + 4 * len(messages) + (max_tokens or 0)
+
+    def run(self, call, estimated_tokens, priority=PRIORITY_NORMAL, on_retry=None, max_retries=None):
+        """
+        Run `call()` once it is admitted, retrying transient failures. Returns its result.
+
+        `on_retry(error)`, if given, is called before each retry. `max_retries` overrides the
+        scheduler's limit for this call (e.g. fewer when the caller has a fallback model).
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            self._acquire(estimated_tokens, priority)
+            try:
+                result = call()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, max_retries)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Interrupted (e.g. KeyboardInterrupt): the request is no longer in flight
+                self._after_interruption()
+                raise
+            self._after_success()
+            return result
+
+    async def run_async(self, call, estimated_tokens, priority=PRIORITY_NORMAL, on_retry=None, max_retries=None):
+        """Async version of run(): `call()` must return an awaitable."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(max_retries + 1):
+            await self._acquire_async(estimated_tokens, priority)
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._after_failure(e, attempt, max_retries)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(e)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (e.g. by _yield_in_order): the request is no longer in flight
+                self._after_interruption()
+                raise
+            self._after_success()
+            return result
+
+    def stats(self):
+        """Return queue depth per priority lane and request counters."""
+        with self._lock:
+            lanes = {}
+            for priority, _ in self._waiting + self._async_waiting:
+                lanes[priority] = lanes.get(priority, 0) + 1
+            return {
+                'queued': len(self._waiting) + len(self._async_waiting),
+                'queued_by_priority': lanes,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+            }
+
+    def _acquire(self, estimated_tokens, priority):
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        wait = self._admission_wait(estimated_tokens)
+                        if wait <= 0:
+                            heapq.heappop(self._waiting)
+                            self._admit(estimated_tokens)
+                            self._condition.notify_all()
+                            return
+                        self.throttled_seconds += wait
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                # A waiter interrupted before admission must not stay at the head of the queue
+                if self._remove_ticket(self._waiting, ticket):
+                    self._condition.notify_all()
+
+    async def _acquire_async(self, estimated_tokens, priority):
+        condition = self._get_async_condition()
+        ticket = (priority, next(self._sequence))
+        async with condition:
+            with self._lock:
+                heapq.heappush(self._async_waiting, ticket)
+            try:
+                while True:
+                    with self._lock:
+                        is_head = self._async_waiting[0] == ticket
+                        wait = self._admission_wait(estimated_tokens) if is_head else None
+                        if is_head and wait <= 0:
+                            heapq.heappop(self._async_waiting)
+                            self._admit(estimated_tokens)
+                    if is_head and wait <= 0:
+                        condition.notify_all()
+                        return
+                    if is_head:
+                        self.throttled_seconds += wait
+                        try:
+                            await asyncio.wait_for(condition.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await condition.wait()
+            finally:
+                # A cancelled waiter must not stay at the head of the queue and block everyone behind it
+                with self._lock:
+                    removed = self._remove_ticket(self._async_waiting, ticket)
+                if removed:
+                    condition.notify_all()
+
+    @staticmethod
+    def _remove_ticket(heap, ticket):
+        """Remove a ticket that was never admitted from a waiting heap. Returns True if it was there."""
+        # Caller holds self._lock
+        if ticket not in heap:
+            return False
+        heap.remove(ticket)
+        heapq.heapify(heap)
+        return True
+
+    def _get_async_condition(self):
+        loop = asyncio.get_running_loop()
+        if self._async_condition is None or self._async_condition_loop is not loop:
+            self._async_condition = asyncio.Condition()
+            self._async_condition_loop = loop
+        return self._async_condition
+
+    def _admission_wait(self, estimated_tokens):
+        # Caller holds self._lock
+        now = time.monotonic()
+        return max(
+            self._paused_until - now,
+            self._request_bucket.wait_time(1, now),
+            self._token_bucket.wait_time(estimated_tokens, now),
+        )
+
+    def _admit(self, estimated_tokens):
+        # Caller holds self._lock
+        self._request_bucket.consume(1)
+        self._token_bucket.consume(estimated_tokens)
+        self.in_flight += 1
+
+    def _after_success(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def _after_interruption(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _after_failure(self, error, attempt, max_retries):
+        """Record a failed attempt. Returns the delay before retrying, or None if the error is final."""
+        status_code = getattr(error, 'status_code', None)
+        retryable = status_code in RETRYABLE_STATUS_CODES or type(error).__name__ in RETRYABLE_ERROR_NAMES
+        retry_after = self._retry_after(error)
+
+        with self._lock:
+            self.in_flight -= 1
+            if status_code == 429:
+                self.rate_limited += 1
+            if not retryable or attempt >= max_retries:
+                self.failed += 1
+                return None
+            self.retries += 1
+
+            backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+            delay = random.uniform(backoff / 2, backoff)  # Jitter spreads out retries from concurrent callers
+            if retry_after is not None:
+                # Honour the server's Retry-After for every lane, not just this request
+                delay = min(self.max_delay, retry_after) + random.uniform(0, self.base_delay / 4)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+        print(f"Request failed ({type(error).__name__}, status {status_code}); retrying in {delay:.1f}s")
+        return delay
+
+    @staticmethod
+    def _retry_after(error):
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if not headers:
+            return None
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000
+            if headers.get('retry-after'):
+                return float(headers['retry-after'])
+        except ValueError:
+            return None  # HTTP-date form, fall back to exponential backoff
+        return None
+
+
+# Example usage
+if __name__ == "__main__":
+    class RateLimited(Exception):
+        status_code = 429
+
+    attempts = []
+
+    def flaky_call():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise RateLimited("Rate limit reached")
+        return "OK"
+
+    scheduler = RequestScheduler(requests_per_minute=60, tokens_per_minute=10000, base_delay=0.5)
+    print(scheduler.run(flaky_call, estimated_tokens=200, priority=PRIORITY_HIGH))
+    print(scheduler.stats())
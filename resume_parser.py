@@ -1,120 +1,153 @@
-import re
+import os
+import json
+import hashlib
+from latex_tokenizer import LatexDocument
+from latex_templates import get_template
+
+# Bump whenever the tokenizer or the parse_* methods change what they produce, so cached parses are discarded
+PARSER_VERSION = 1
+DEFAULT_PARSE_CACHE_DIR = os.path.join('.resume_tailor_cache', 'parsed')
 
 class LatexResumeParser:
-    def __init__(self, latex_file_path):
+    def __init__(self, latex_file_path=None, template=None):
+        # Resume class layout (macro names and argument order), see latex_templates.py
+        self.template = get_template(template)
         self.content = None
+        self.document = None  # Section/entry tree built by LatexTokenizer
         self.experience = []
         self.education = []
         self.technical_skills = []
         self.markers = {}  # Stores positions of parsed sections
-        
+
+        if latex_file_path is None:
+            return  # Filled in by load() from a cached parse
+
         # Load the LaTeX content from the file
         with open(latex_file_path, 'r') as file:
             self.content = file.read()
+        self._parse()
+
+    @classmethod
+    def load(cls, latex_file_path, cache_dir=DEFAULT_PARSE_CACHE_DIR, template=None):
+        """
+        Return the parsed resume, reusing a cached parse when the file has not changed.
+
+        Parses are stored in `cache_dir` under the SHA-256 of the file contents, template name and PARSER_VERSION, so
+        editing the file (or upgrading the parser) misses the cache and parses it afresh.
 
-        # Parse the sections automatically upon initialization
+        Params:
+        - latex_file_path (str): Path to the .tex resume.
+        - cache_dir (str): Directory for the cached parses, or None to always parse.
+        - template (str or ResumeTemplate): Resume class layout, the \\resumeSubheading one by default.
+
+        Returns:
+        - LatexResumeParser
+        """
+        with open(latex_file_path, 'r') as file:
+            content = file.read()
+
+        parser = cls(template=template)
+        parser.content = content
+        if cache_dir is None:
+            parser._parse()
+            return parser
+
+        key = hashlib.sha256(f"{PARSER_VERSION}\0{parser.template.name}\0{content}".encode('utf-8')).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{key}.json")
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                parser._restore(json.load(file))
+            return parser
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            pass  # Missing or unreadable cache entry - parse and rewrite it
+
+        parser._parse()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump(parser._serialize(), file)
+            os.replace(temporary_path, cache_path)  # Atomic, so concurrent loaders never read a partial file
+        except OSError as e:
+            print(f"Could not cache the parsed resume: {e}")
+        return parser
+
+    def _parse(self):
+        # Tokenize the document once, then parse the sections from the resulting tree
+        self.document = self.template.tokenizer().tokenize(self.content)
         self.parse_experience()
         self.parse_education()
         self.parse_technical_skills()
 
+    def _serialize(self):
+        return {
+            'parser_version': PARSER_VERSION,
+            'template': self.template.name,
+            'experience': self.experience,
+            'education': self.education,
+            'technical_skills': self.technical_skills,
+            'markers': self.markers,
+            'document': self.document.to_dict(),
+        }
+
+    def _restore(self, data):
+        if data.get('parser_version') != PARSER_VERSION:
+            raise ValueError("Cached parse was written by a different parser version.")
+        if data.get('template') != self.template.name:
+            raise ValueError("Cached parse was made with a different resume template.")
+        self.document = LatexDocument.from_dict(data['document'], self.content)
+        self.experience = data['experience']
+        self.education = data['education']
+        self.technical_skills = data['technical_skills']
+        self.markers = data['markers']
+
     def parse_experience(self):
-        # Extract the Experience section and store position
-        experience_section = self._extract_section(r'\\section{Experience}', r'\\section{', self.content)
+        # Find the Experience section and store its position
+        experience_section = self._find_section('Experience', 'experience')
         if not experience_section:
             return
 
-        experience_start = self.content.find(experience_section)
-        self.markers['experience_start'] = experience_start
-        self.markers['experience_end'] = experience_start + len(experience_section)
-
-        # Find all the jobs with company, title, dates, and location
-        experience_entries = re.findall(
-            r'\\resumeSubheading\s*?\{(.*?)\}\s*?\{(.*?)\}\s*?\{(.*?)\}\s*?\{(.*?)\}', 
-            experience_section, 
-            re.DOTALL
-        )
-
+        # Each entry command holds the title, dates, company and location, followed by its own bullets
         self.experience = []
-        for title, dates, company, location in experience_entries:
-            bullets = self._extract_bullet_points(experience_section, title)
-            self.experience.append({
-                'job_title': title.strip(),
-                'company': company.strip(),
-                'location': location.strip(),
-                'dates': dates.strip(),
-                'bullet_points': bullets
-            })
+        for entry in experience_section.entries:
+            parsed = self.template.parse_experience_entry(entry)
+            if parsed is not None:
+                self.experience.append(parsed)
 
     def parse_education(self):
-        # Extract the Education section and store position
-        education_section = self._extract_section(r'\\section{Education}', r'\\section{', self.content)
+        # Find the Education section and store its position
+        education_section = self._find_section('Education', 'education')
         if not education_section:
             return
 
-        education_start = self.content.find(education_section)
-        self.markers['education_start'] = education_start
-        self.markers['education_end'] = education_start + len(education_section)
-
-        # Find all the education entries
-        education_entries = re.findall(
-            r'\\resumeSubheading\s*?\{(.*?)\}\s*?\{(.*?)\}\s*?\{(.*?)\}\s*?\{(.*?)\}', 
-            education_section, 
-            re.DOTALL
-        )
-
         self.education = []
-        for institution, dates, major, _ in education_entries:
-            self.education.append({
-                'institution': institution.strip(),
-                'major': major.strip(),
-                'dates': dates.strip()
-            })
+        for entry in education_section.entries:
+            parsed = self.template.parse_education_entry(entry)
+            if parsed is not None:
+                self.education.append(parsed)
 
     def parse_technical_skills(self):
-        # Extract the Technical Skills section and store position
-        tech_section = self._extract_section(r'\\section{Technical Skills}', r'\\section{', self.content)
+        # Find the Technical Skills section and store its position
+        tech_section = self._find_section('Technical Skills', 'technical_skills')
         if not tech_section:
             return
 
-        tech_start = self.content.find(tech_section)
-        self.markers['technical_skills_start'] = tech_start
-        self.markers['technical_skills_end'] = tech_start + len(tech_section)
-
-        # Extract technical skills categories and the associated skills
-        tech_entries = re.findall(r'\\textbf{(.*?)}{: (.*?)}', tech_section, re.DOTALL)
+        self.technical_skills = self.template.parse_technical_skills(tech_section)
 
-        self.technical_skills = {}
-        for label, skills in tech_entries:
-            self.technical_skills[label.strip()] = [skill.strip() for skill in skills.split(',')]
-
-    def _extract_section(self, start_pattern, end_pattern, content):
-        # Find the start of the section
-        start_match = re.search(start_pattern, content)
-        if not start_match:
+    def _find_section(self, title, marker_name):
+        """Look up a section in the document tree and record its span in self.markers."""
+        section = self.document.section(title)
+        if section is None:
             return None
 
-        # Find the end of the section (next section or end of document)
-        end_match = re.search(end_pattern, content[start_match.end():])
-        if end_match:
-            return content[start_match.end():start_match.end() + end_match.start()]
-        else:
-            return content[start_match.end():]  # If no end match, return till the end of the document
-
-    def _extract_bullet_points(self, section_content, job_title):
-        # Extract the bullet points associated with a job
-        job_start = re.search(re.escape(job_title), section_content)
-        if not job_start:
-            return []
-
-        bullet_section = section_content[job_start.end():]
-        bullet_points = re.findall(r'\\resumeItem\{(.*?)\}', bullet_section, re.DOTALL)
-
-        return [bullet.strip() for bullet in bullet_points]
+        self.markers[f'{marker_name}_start'] = section.start
+        self.markers[f'{marker_name}_end'] = section.end
+        return section
 
 
 # Example usage
 if __name__ == "__main__":
-    parser = LatexResumeParser('resume.tex')
+    parser = LatexResumeParser.load('resume.tex')
     print("Experience:", parser.experience)
     print("Education:", parser.education)
     print("Technical Skills:", parser.technical_skills)
@@ -1,130 +1,160 @@
-import re
+import os
 from resume_parser import LatexResumeParser
+from latex_templates import get_template
 
 class LatexResumeRepackager:
-    def __init__(self, parser: LatexResumeParser):
+    def __init__(self, parser: LatexResumeParser, template=None):
         self.parser = parser
+        # Sections are rendered with the parser's resume class layout unless another is given
+        self.template = get_template(template) if template is not None else parser.template
         self.original_content = self.parser.content
+        # Pending replacements keyed by section name: (start, end, new_content), with offsets into original_content.
+        # Nothing is spliced until render(), so the parser's markers stay valid whatever order sections are replaced in.
+        self._edits = {}
 
     def replace_experience(self, new_experience):
         # Repack the experience section by replacing the content between markers
         start = self.parser.markers['experience_start']
         end = self.parser.markers['experience_end']
-        new_experience_content = self._generate_experience_content(new_experience)
-        self.original_content = self.original_content[:start] + new_experience_content + self.original_content[end:]
+        self._edits['experience'] = (start, end, self._generate_experience_content(new_experience))
 
     def replace_education(self, new_education):
         # Repack the education section by replacing the content between markers
         start = self.parser.markers['education_start']
         end = self.parser.markers['education_end']
-        new_education_content = self._generate_education_content(new_education)
-        self.original_content = self.original_content[:start] + new_education_content + self.original_content[end:]
-
-    def replace_technical_skills(self, new_skills):
-        """
-        Find the \section{Technical Skills} tag, and replace the existing \textbf{} lines
-        with new content while retaining the structure.
-        """
-        # Locate the position of the \section{Technical Skills}
-        section_pattern = r'\\section\{Technical Skills\}'
-        match = re.search(section_pattern, self.original_content)
-
-        if match:
-            # Extract everything from the end of \section{Technical Skills} to the end of the section
-            start = match.end()
-
-            # Now locate the end of the itemize block by finding where \end{itemize} occurs
-            end_match = re.search(r'\\end\{itemize\}', self.original_content[start:])
-            if not end_match:
-                raise ValueError("Couldn't find the end of the Technical Skills section.")
-            
-            end = start + end_match.end()
-
-            # Generate the new technical skills section content
-            new_skills_content = self._generate_technical_skills_content(new_skills)
-
-            # Replace the old technical skills section with the new content
-            self.original_content = (
-                self.original_content[:start] + new_skills_content + self.original_content[end:]
-            )
-
-    def _generate_technical_skills_content(self, skills):
-        """
-        Generate LaTeX formatted content for the technical skills section with all \textbf{}
-        lines wrapped under a single \small{\item{...}} block.
-        """
-        skills_content = "\\begin{itemize}[leftmargin=0.15in, label={}]\n    \\small{\\item{\n"
-
-        # Loop over each skill category and its corresponding skills
-        for category, skill_list in skills.items():
-            # Escape LaTeX special characters
-            category_escaped = self._escape_latex_special_chars(category)
-            skill_list_escaped = [self._escape_latex_special_chars(skill) for skill in skill_list]
-
-            # Append the \textbf{category} and the list of skills in the format: \textbf{category}: {skills}
-            skills_content += f"    \\textbf{{{category_escaped}}}{{: {', '.join(skill_list_escaped)}}} \\\\\n"
-
-        # Close the \small and \item block
-        skills_content += "    }}\n"
-        
-        # Close the itemize block
-        skills_content += "\\end{itemize}\n"
-        
-        return skills_content
-
-    def _escape_latex_special_chars(self, text):
-        """Escape special LaTeX characters to prevent breaking the LaTeX syntax."""
-        special_chars = {
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '&': r'\&',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '\\': r'\textbackslash{}'
-        }
-        return re.sub(r'([%$#&_{}~^\\])', lambda match: special_chars[match.group()], text)
+        self._edits['education'] = (start, end, self._generate_education_content(new_education))
+
+    def replace_technical_skills(self, new_skills, raw_latex=False):
+        """
+        Replace the skill lines of the Technical Skills section with new content. For the default
+        template this is everything from the end of \section{Technical Skills} through the section's
+        first \end{itemize}, retaining whatever follows the itemize block.
+
+        Skills are escaped unless `raw_latex` is set (e.g. for skills taken from a parsed resume). Skills
+        equal to the parsed ones (kept when the rewrite failed) are LaTeX source already and never escaped.
+        """
+        tech_section = self.parser.document.section('Technical Skills')
+        if not tech_section:
+            return
+        raw_latex = raw_latex or new_skills == self.parser.technical_skills
+
+        start, end = self.template.technical_skills_span(tech_section)
+        self._edits['technical_skills'] = (start, end, self._generate_technical_skills_content(new_skills, raw_latex))
+
+    def render(self):
+        """
+        Apply every pending section replacement to the original content in a single pass.
+        """
+        edits = sorted(self._edits.values(), key=lambda edit: edit[0])
+
+        pieces = []
+        cursor = 0
+        for start, end, new_content in edits:
+            if start < cursor:
+                raise ValueError("Section replacements overlap; cannot apply them to the original content.")
+            pieces.append(self.original_content[cursor:start])
+            pieces.append(new_content)
+            cursor = end
+        pieces.append(self.original_content[cursor:])
+        return ''.join(pieces)
+
+    async def save_to_file_streaming(self, output_path, experience_stream):
+        """
+        Save the document while the experience section is still being reshaped.
+
+        Everything before the experience section (with any other pending replacements applied) is
+        written first, then each entry from `experience_stream` - an async iterator of
+        (index, entry) pairs such as ResumeReshaper.stream_experience_async() - is rendered and flushed
+        as it arrives, followed by the rest of the document. The document is written to a temporary
+        file in the same directory and moved to `output_path` only once the stream has completed.
+
+        Returns:
+        - list: The experience entries that were written, in order.
+        """
+        start = self.parser.markers['experience_start']
+        end = self.parser.markers['experience_end']
+        self._edits.pop('experience', None)
+
+        # Render the document around the experience section with a placeholder, then split on it
+        placeholder = "\0experience\0"
+        self._edits['experience'] = (start, end, placeholder)
+        try:
+            before, after = self.render().split(placeholder)
+        finally:
+            del self._edits['experience']
+        if not (before + after).strip().endswith("\\end{document}"):
+            after += "\n\\end{document}"
+
+        experience = []
+        # Stream into a temporary file next to the output, which only replaces it once complete, so a
+        # stream that fails partway leaves no truncated .tex and keeps any earlier output
+        directory, name = os.path.split(os.path.abspath(output_path))
+        temporary_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        try:
+            with open(temporary_path, 'w') as file:
+                file.write(before)
+                file.write(self.template.entry_list_start)
+                file.flush()
+                async for _, entry in experience_stream:
+                    experience.append(entry)
+                    file.write(self._generate_experience_entry_content(entry))
+                    file.flush()
+                file.write(self.template.entry_list_end)
+                file.write(after)
+            os.replace(temporary_path, output_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        # Keep the final experience so render()/save_to_file() reproduce the streamed document
+        self.replace_experience(experience)
+        return experience
+
+    def _generate_technical_skills_content(self, skills, raw_latex=False):
+        """
+        Generate LaTeX formatted content for the technical skills section. The default template wraps
+        all \textbf{} lines under a single \small{\item{...}} block.
+        """
+        parts = []
+        self.template.render_technical_skills(skills, parts, raw_latex)
+        return ''.join(parts)
 
     def save_to_file(self, output_path):
         """
-        Ensure the document ends with \end{document} and save the modified LaTeX content to a file.
+        Apply the pending replacements, ensure the document ends with \end{document} and save it to a file.
         """
-        if not self.original_content.strip().endswith("\\end{document}"):
-            self.original_content += "\n\\end{document}"
+        content = self.render()
+        if not content.strip().endswith("\\end{document}"):
+            content += "\n\\end{document}"
 
         # Save the modified LaTeX content to a file
         with open(output_path, 'w') as file:
-            file.write(self.original_content)
+            file.write(content)
     
     def _generate_experience_content(self, experience):
         """
         Generate LaTeX formatted content for the experience section.
         """
-        experience_content = "\\resumeSubHeadingListStart\n"
-        for entry in experience:
-            # Escape LaTeX special characters
-            job_title = self._escape_latex_special_chars(entry.get('job_title', ''))
-            company = self._escape_latex_special_chars(entry.get('company', ''))
-            location = self._escape_latex_special_chars(entry.get('location', ''))
-            dates = self._escape_latex_special_chars(entry.get('dates', ''))
-
-            # Add the formatted subheading (job title, company, dates)
-            experience_content += f"\\resumeSubheading{{{job_title}}}{{{dates}}}{{{company}}}{{{location}}}\n"
-            experience_content += "\\resumeItemListStart\n"
-
-            # Add the bullet points for each experience entry
-            for bullet in entry.get('bullet_points', []):
-                bullet_escaped = self._escape_latex_special_chars(bullet)
-                experience_content += f"\\resumeItem{{{bullet_escaped}}}\n"
+        parts = []
+        self.template.render_experience(experience, parts)
+        return ''.join(parts)
 
-            experience_content += "\\resumeItemListEnd\n"
-        experience_content += "\\resumeSubHeadingListEnd\n"
-
-        return experience_content
+    def _generate_experience_entry_content(self, entry):
+        """
+        Generate the entry heading and bullet points for a single experience entry.
+        """
+        parts = []
+        self.template.render_experience_entry(entry, parts)
+        return ''.join(parts)
 
+    def _generate_education_content(self, education):
+        """
+        Generate LaTeX formatted content for the education section.
+        """
+        parts = []
+        self.template.render_education(education, self.parser.education, parts)
+        return ''.join(parts)
 
 
 # Example usage
@@ -1,44 +1,626 @@
 import os
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
-from resume_repackager import LatexResumeRepackager
-from resume_parser import LatexResumeParser
+import time
+import asyncio
+from pydantic import ValidationError
+from incremental_json import IncrementalJSONParser
+from json_repair import repair_json
+from resume_schemas import ExperienceEntry, EducationEntry, TechnicalSkillsResponse, ResumeResponse, response_format_for
+from request_scheduler import RequestScheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from instrumentation import NULL_TRACER
+from model_router import is_model_failure
 
 class ResumeReshaper:
-    def __init__(self, client, parser, job_description):
+    # Upper bound for a single completion's max_tokens (gpt-4 has an 8k context shared with the prompt)
+    MAX_OUTPUT_TOKENS = 4000
+
+    # Span names for the LLM calls made for each response schema
+    _SPAN_NAMES = {
+        ExperienceEntry: 'experience',
+        EducationEntry: 'education',
+        TechnicalSkillsResponse: 'technical_skills',
+        ResumeResponse: 'whole_resume',
+    }
+
+    def __init__(self, client, parser, job_description, async_client=None, max_concurrency=5, cache=None,
+                 keyword_strategy='llm', keyword_extractor=None, coverage_threshold=None,
+                 structured_output=None, max_reasks=1, scheduler=None, tracer=None, compactor=None,
+                 posting_index=None, posting_label=None, router=None, variants=1):
         self.parser = parser
         self.job_description = job_description
         self.client = client
+        self.async_client = async_client
+        self.max_concurrency = max_concurrency
+        self.cache = cache  # Optional LLMResponseCache shared across runs
+        # 'llm' asks the model for keywords; 'local' uses the offline KeywordExtractor and skips that round trip
+        self.keyword_strategy = keyword_strategy
+        self.keyword_extractor = keyword_extractor
+        # Experience entries whose keyword coverage already reaches this fraction are kept as-is (None rewrites all)
+        self.coverage_threshold = coverage_threshold
+        self._scorer = None
+        # 'json_object' or 'json_schema' requests structured output from models that support it (gpt-4 does not)
+        self.structured_output = structured_output
+        # Follow-up requests allowed per entry when a response still fails validation after local repair
+        self.max_reasks = max_reasks
+        # Optional RequestScheduler (shared across reshapers in batch mode) that paces requests to the
+        # account's rate limits and retries 429/5xx responses
+        self.scheduler = scheduler
+        # Optional Tracer that records a span per LLM call (latency, tokens, retries, cache hits)
+        self.tracer = tracer or NULL_TRACER
+        # Optional ModelRouter (shared across reshapers) that picks each stage's model and falls back
+        # to the next one when a model is slow or failing
+        self.router = router
+        # Rewrites requested per experience entry in one call (n); the best is picked locally by VariantRanker
+        self.variants = variants
+        self.experience_variants = []  # Per experience entry, its ranked variants (when variants > 1)
+        self._variant_ranker = None
+        # Names the posting in the posting index; the first line of a posting is usually the job title
+        self.posting_label = posting_label or next(
+            (line.strip()[:80] for line in job_description.splitlines() if line.strip()), ''
+        )
+        # Optional JobDescriptionCompactor that strips boilerplate from the posting before any prompt uses it
+        self.compaction = None
+        if compactor is not None:
+            self._compact_job_description(compactor)
         self.keywords = []
+        # Optional PostingIndex of earlier results, looked up before any request is sent
+        self.posting_index = posting_index
+        self.reused_posting = None  # The near-duplicate posting found by lookup_similar_posting(), if any
+        # Requests given up on after every attempt failed validation; a result with any is not indexed
+        self.failed_requests = 0
+        self._keywords_from_index = False
+        self._posting_signature = None
+        self._local_keywords = None
+        self._semaphore = None
+        self._semaphore_loop = None
 
-    def extract_keywords(self):
-        print("Extracting keywords from the job description...")
-        prompt = f"""Given the following job description, extract the most relevant keywords and phrases that might be 
-        used by an Applicant Tracking System (ATS) to filter applicants. Please return a list of keywords only.
-        Job Description: {self.job_description}
+    def _compact_job_description(self, compactor):
+        from jd_compactor import format_compaction
+
+        with self.tracer.span('compact_job_description') as span:
+            self.compaction = compactor.compact(self.job_description)
+            span.set(original_tokens=self.compaction['original_tokens'], compacted_tokens=self.compaction['compacted_tokens'],
+                     tokens_saved=self.compaction['tokens_saved'])
+        self.job_description = self.compaction['text']
+        print(format_compaction(self.compaction))
+
+    def lookup_similar_posting(self):
         """
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an assistant that identifies keywords for job descriptions that are likely to be used in ATS software."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.7
+        Look the job description up in the posting index.
+
+        A near-duplicate posting tailored against the same resume is reused as a whole when the
+        offline extractor finds no keyword in this posting that it did not find in the earlier one.
+        Otherwise the earlier posting's keywords plus the new ones are used and keyword extraction is
+        skipped, so only the sections are reshaped again.
+
+        Returns:
+        - tuple or None: (new_experience, new_technical_skills, new_education) to reuse as-is.
+        """
+        if self.posting_index is None:
+            return None
+        from posting_index import resume_hash
+
+        with self.tracer.span('posting_index_lookup') as span:
+            self._posting_signature = self.posting_index.signature(self.job_description)
+            match = self.posting_index.query(resume_hash(self.parser), self.job_description, self._posting_signature,
+                                             settings=self._settings_hash())
+            span.set(hit=match is not None)
+            if match is None:
+                return None
+            known = {keyword.lower() for keyword in match['local_keywords']}
+            added_keywords = [keyword for keyword in self._extract_local_keywords() if keyword.lower() not in known]
+            span.set(similarity=match['similarity'], added_keywords=len(added_keywords))
+
+        self.reused_posting = match
+        if not added_keywords:
+            self.keywords = match['keywords']
+            print(f"Reusing the result for a near-duplicate posting ({match['similarity']:.0%} similar): {match['label']}")
+            return match['experience'], match['technical_skills'], match['education']
+
+        known = {keyword.lower() for keyword in match['keywords']}
+        self.keywords = match['keywords'] + [keyword for keyword in added_keywords if keyword.lower() not in known]
+        self._keywords_from_index = True
+        print(f"Near-duplicate posting found ({match['similarity']:.0%} similar): {match['label']}. "
+              f"Reshaping for its keywords plus {', '.join(added_keywords)}")
+        return None
+
+    def record_posting(self, new_experience, new_technical_skills, new_education):
+        """
+        Add this posting and its result to the posting index, unless the result was reused from it or
+        a section failed (an entry or the skills left empty, or kept as the original after validation
+        kept failing), since reusing it would carry the failure over to other postings.
+        """
+        if self.posting_index is None or (self.reused_posting is not None and not self._keywords_from_index):
+            return
+        if self.failed_requests or not new_technical_skills or not all(new_experience) or not all(new_education):
+            print("Not adding this posting to the posting index: a section could not be reshaped.")
+            return
+        from posting_index import resume_hash
+
+        self.posting_index.add(
+            resume_hash(self.parser), self.job_description, self.keywords, self._extract_local_keywords(),
+            new_experience, new_technical_skills, new_education, label=self.posting_label,
+            signature=self._posting_signature, settings=self._settings_hash()
         )
-        self.keywords = response.choices[0].message.content.strip().split(', ')
-        print("Keywords identified: ", self.keywords)
+
+    def _settings_hash(self):
+        """Fingerprint of the settings that shape the result, so a result is only reused when they match."""
+        from posting_index import settings_hash
+
+        routes = None
+        if self.router is not None:
+            routes = {stage: [route.models, route.max_tokens, route.temperature] for stage, route in self.router.routes.items()}
+        return settings_hash({
+            'keyword_strategy': self.keyword_strategy,
+            'coverage_threshold': self.coverage_threshold,
+            'structured_output': self.structured_output,
+            'variants': self.variants,
+            'routes': routes,
+        })
+
+    def save_variants(self, output_path, new_technical_skills, new_education):
+        """
+        Save the ranked experience variants next to the tailored resume at `output_path`, so the other
+        variants can be rendered later (see variant_ranker.py).
+
+        Returns:
+        - str or None: The variants file, or None when no variants were generated.
+        """
+        if self.variants <= 1 or not self.experience_variants or None in self.experience_variants:
+            return None
+        from variant_ranker import save_variants, variants_path
+
+        path = variants_path(output_path)
+        save_variants(path, self.experience_variants, new_technical_skills, new_education)
+        print(f"Experience variants saved as {path}")
+        return path
+
+    def extract_keywords(self):
+        if self._keywords_from_index:
+            return
+        print("Extracting keywords from the job description...")
+        with self.tracer.span('extract_keywords', strategy=self.keyword_strategy) as span:
+            if self.keyword_strategy == 'local':
+                self._extract_keywords_locally()
+            else:
+                response = self._create_completion(
+                    self._keyword_messages(), max_tokens=150, priority=PRIORITY_HIGH, span_name='keywords'
+                )
+                self._set_keywords(response)
+            span.set(keywords=len(self.keywords))
+
+    async def extract_keywords_async(self):
+        if self._keywords_from_index:
+            return
+        print("Extracting keywords from the job description...")
+        with self.tracer.span('extract_keywords', strategy=self.keyword_strategy) as span:
+            if self.keyword_strategy == 'local':
+                self._extract_keywords_locally()
+            else:
+                response = await self._create_completion_async(
+                    self._keyword_messages(), max_tokens=150, priority=PRIORITY_HIGH, span_name='keywords'
+                )
+                self._set_keywords(response)
+            span.set(keywords=len(self.keywords))
 
     def reshape_experience(self):
         print("\nReshaping experience based on the extracted keywords...")
         new_experience = []
+        if self.variants > 1:
+            self.experience_variants = [None] * len(self.parser.experience)
+            for index, experience_entry in enumerate(self.parser.experience):
+                candidates, bullet_point_count = self._experience_variants(experience_entry)
+                new_experience.append(self._select_variant(index, experience_entry, candidates, bullet_point_count))
+            return new_experience
         
         for experience_entry in self.parser.experience:
-            bullet_point_count = 6
-            average_length = sum(len(bp) for bp in experience_entry['bullet_points']) // bullet_point_count
+            if self._has_enough_coverage(experience_entry):
+                new_experience.append(self._keep_entry(experience_entry))
+                continue
+            messages, bullet_point_count = self._experience_request(experience_entry)
+            new_experience.append(self._request_json(
+                messages, 500, ExperienceEntry, self._experience_label(experience_entry),
+                max_bullet_points=bullet_point_count, fallback=self._keep_entry(experience_entry)
+            ))
+        
+        return new_experience
+
+    async def reshape_experience_async(self):
+        print("\nReshaping experience based on the extracted keywords...")
+
+        async def reshape_entry(experience_entry):
+            if self._has_enough_coverage(experience_entry):
+                return self._keep_entry(experience_entry)
+            messages, bullet_point_count = self._experience_request(experience_entry)
+            return await self._request_json_async(
+                messages, 500, ExperienceEntry, self._experience_label(experience_entry),
+                max_bullet_points=bullet_point_count, fallback=self._keep_entry(experience_entry)
+            )
+
+        if self.variants > 1:
+            self.experience_variants = [None] * len(self.parser.experience)
+            variants = await asyncio.gather(*(self._experience_variants_async(entry) for entry in self.parser.experience))
+            # Ranked in resume order, so each entry is deduplicated against the ones picked before it
+            return [
+                self._select_variant(index, experience_entry, candidates, bullet_point_count)
+                for index, (experience_entry, (candidates, bullet_point_count)) in enumerate(zip(self.parser.experience, variants))
+            ]
+
+        # gather() preserves the order of parser.experience regardless of completion order
+        return list(await asyncio.gather(*(reshape_entry(entry) for entry in self.parser.experience)))
+
+    def reshape_education(self):
+        print("\nReshaping education based on the extracted keywords...")
+        new_education = []
+        for education_entry in self.parser.education:
+            new_education.append(self._request_json(
+                self._education_messages(education_entry), 300, EducationEntry,
+                f"education for {education_entry['institution']}", fallback=self._keep_entry(education_entry)
+            ))
+        
+        return new_education
+
+    async def reshape_education_async(self):
+        print("\nReshaping education based on the extracted keywords...")
+
+        async def reshape_entry(education_entry):
+            return await self._request_json_async(
+                self._education_messages(education_entry), 300, EducationEntry,
+                f"education for {education_entry['institution']}", fallback=self._keep_entry(education_entry)
+            )
+
+        return list(await asyncio.gather(*(reshape_entry(entry) for entry in self.parser.education)))
+
+    def reshape_technical_skills(self):
+        print("\nReshaping technical skills based on the extracted keywords...")
+        reshaped_skills = self._request_json(
+            self._technical_skills_messages(), 300, TechnicalSkillsResponse, "technical skills",
+            fallback=self._kept_technical_skills()
+        )
+        return reshaped_skills['technical_skills']
+
+    async def reshape_technical_skills_async(self):
+        print("\nReshaping technical skills based on the extracted keywords...")
+        reshaped_skills = await self._request_json_async(
+            self._technical_skills_messages(), 300, TechnicalSkillsResponse, "technical skills",
+            fallback=self._kept_technical_skills()
+        )
+        return reshaped_skills['technical_skills']
+
+    async def reshape_all_async(self):
+        """
+        Extract keywords, then send every experience, education and technical skills prompt at once.
+
+        At most `max_concurrency` requests are in flight at any time. Entries are returned in the
+        same order as `parser.experience` and `parser.education`.
+
+        Returns:
+        - tuple: (new_experience, new_technical_skills, new_education)
+        """
+        if self.async_client is None:
+            raise ValueError("An async client (e.g. AsyncOpenAI) is required for concurrent reshaping.")
+
+        reused = self.lookup_similar_posting()
+        if reused is not None:
+            return reused
+        await self.extract_keywords_async()
+        new_experience, new_technical_skills, new_education = await asyncio.gather(
+            self.reshape_experience_async(),
+            self.reshape_technical_skills_async(),
+            self.reshape_education_async(),
+        )
+        self.record_posting(new_experience, new_technical_skills, new_education)
+        return new_experience, new_technical_skills, new_education
+
+    def reshape_all_single_call(self):
+        """
+        Extract keywords, then reshape the experience, technical skills and education sections with a
+        single request that returns one JSON document for the whole resume.
+
+        Returns:
+        - tuple: (new_experience, new_technical_skills, new_education)
+        """
+        reused = self.lookup_similar_posting()
+        if reused is not None:
+            return reused
+        self.extract_keywords()
+        print("\nReshaping the whole resume in a single request...")
+        messages, max_tokens, rewritten_indexes = self._single_call_request()
+        response = self._create_completion(
+            messages, max_tokens=max_tokens, response_format=response_format_for(ResumeResponse, self.structured_output),
+            span_name='whole_resume'
+        )
+        result, failed_experience, failed_education, skills_failed = self._split_single_call_response(response, rewritten_indexes)
+
+        # Re-ask only the entries that still fail validation, one request each
+        new_experience, new_technical_skills, new_education = result
+        for index in failed_experience:
+            entry = self.parser.experience[index]
+            messages, bullet_point_count = self._experience_request(entry)
+            new_experience[index] = self._request_json(
+                messages, 500, ExperienceEntry, self._experience_label(entry), max_bullet_points=bullet_point_count,
+                fallback=new_experience[index]
+            )
+        for index in failed_education:
+            entry = self.parser.education[index]
+            new_education[index] = self._request_json(
+                self._education_messages(entry), 300, EducationEntry, f"education for {entry['institution']}",
+                fallback=new_education[index]
+            )
+        if skills_failed:
+            new_technical_skills = self.reshape_technical_skills()
+        self.record_posting(new_experience, new_technical_skills, new_education)
+        return new_experience, new_technical_skills, new_education
+
+    async def reshape_all_single_call_async(self):
+        """Async version of reshape_all_single_call()."""
+        reused = self.lookup_similar_posting()
+        if reused is not None:
+            return reused
+        await self.extract_keywords_async()
+        print("\nReshaping the whole resume in a single request...")
+        messages, max_tokens, rewritten_indexes = self._single_call_request()
+        response = await self._create_completion_async(
+            messages, max_tokens=max_tokens, response_format=response_format_for(ResumeResponse, self.structured_output),
+            span_name='whole_resume'
+        )
+        result, failed_experience, failed_education, skills_failed = self._split_single_call_response(response, rewritten_indexes)
+
+        # Re-ask only the entries that still fail validation, concurrently
+        new_experience, new_technical_skills, new_education = result
+
+        async def reask_experience(index):
+            entry = self.parser.experience[index]
+            messages, bullet_point_count = self._experience_request(entry)
+            new_experience[index] = await self._request_json_async(
+                messages, 500, ExperienceEntry, self._experience_label(entry), max_bullet_points=bullet_point_count,
+                fallback=new_experience[index]
+            )
+
+        async def reask_education(index):
+            entry = self.parser.education[index]
+            new_education[index] = await self._request_json_async(
+                self._education_messages(entry), 300, EducationEntry, f"education for {entry['institution']}",
+                fallback=new_education[index]
+            )
+
+        reasks = [reask_experience(index) for index in failed_experience]
+        reasks += [reask_education(index) for index in failed_education]
+        if skills_failed:
+            reasks.append(self.reshape_technical_skills_async())
+        results = await asyncio.gather(*reasks)
+        if skills_failed:
+            new_technical_skills = results[-1]
+        self.record_posting(new_experience, new_technical_skills, new_education)
+        return new_experience, new_technical_skills, new_education
+
+    def stream_experience_async(self, on_bullet=None):
+        """
+        Start reshaping every experience entry with streamed completions and return an async iterator
+        of (index, reshaped_entry) pairs in the order of `parser.experience`.
+
+        All requests are sent straight away. Each bullet point is passed to
+        on_bullet(entry_index, bullet_index, text) as soon as it has streamed in, and each entry is
+        yielded as soon as it and every entry before it are complete. Must be called from a running
+        event loop. A caller that stops before iterating to the end must call aclose() on the iterator,
+        which cancels the requests still running even if iteration never started.
+
+        With variants > 1, the entries' variants are requested without streaming and each entry's
+        bullet points are passed on once its best variant has been picked.
+        """
+        if self.variants > 1:
+            print(f"\nReshaping {self.variants} experience variants per entry based on the extracted keywords...")
+            self.experience_variants = [None] * len(self.parser.experience)
+            tasks = [
+                asyncio.ensure_future(self._experience_variants_async(entry)) for entry in self.parser.experience
+            ]
+            return _ExperienceStream(tasks, self._select_in_order(tasks, on_bullet))
+
+        print("\nStreaming reshaped experience based on the extracted keywords...")
+        tasks = [
+            asyncio.ensure_future(self._stream_experience_entry(index, entry, on_bullet))
+            for index, entry in enumerate(self.parser.experience)
+        ]
+        return _ExperienceStream(tasks, self._yield_in_order(tasks))
+
+    async def _stream_experience_entry(self, index, experience_entry, on_bullet):
+        if self._has_enough_coverage(experience_entry):
+            kept_entry = self._keep_entry(experience_entry)
+            if on_bullet is not None:
+                for bullet_index, bullet in enumerate(kept_entry['bullet_points']):
+                    on_bullet(index, bullet_index, bullet)
+            return kept_entry
+
+        messages, bullet_point_count = self._experience_request(experience_entry)
+
+        def on_value(path, value):
+            # Bullets past the limit are dropped by _parse_json, so they are not surfaced either
+            if on_bullet is not None and path[1] < bullet_point_count:
+                on_bullet(index, path[1], value)
+
+        label = self._experience_label(experience_entry)
+        reshaped_entry = await self._stream_completion_async(
+            messages, max_tokens=500, watch_paths={('bullet_points',)}, on_value=on_value,
+            span_name='experience', label=label
+        )
+        return await self._request_json_async(
+            messages, 500, ExperienceEntry, label, max_bullet_points=bullet_point_count,
+            first_response=reshaped_entry, fallback=self._keep_entry(experience_entry)
+        )
+
+    async def _select_in_order(self, tasks, on_bullet):
+        """Yield (index, reshaped_entry) pairs, picking each entry's variant once it and the entries before it are in."""
+        try:
+            async for index, (candidates, bullet_point_count) in self._yield_in_order(tasks):
+                experience_entry = self._select_variant(index, self.parser.experience[index], candidates, bullet_point_count)
+                if on_bullet is not None:
+                    for bullet_index, bullet in enumerate(experience_entry.get('bullet_points', [])):
+                        on_bullet(index, bullet_index, bullet)
+                yield index, experience_entry
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _experience_variants(self, experience_entry):
+        """
+        Request `variants` rewrites of an experience entry with one call.
 
-            prompt = f"""
+        Returns:
+        - tuple: (the rewrites that match ExperienceEntry, requested bullet point count). An entry kept
+          as-is is its only variant; when no rewrite parses, the first one is repaired by re-asking.
+        """
+        if self._has_enough_coverage(experience_entry):
+            return [self._keep_entry(experience_entry)], len(experience_entry['bullet_points'])
+        messages, bullet_point_count = self._experience_request(experience_entry)
+        label = self._experience_label(experience_entry)
+        responses = self._create_completion(
+            messages, max_tokens=500, response_format=response_format_for(ExperienceEntry, self.structured_output),
+            span_name='experience', label=label, n=self.variants
+        )
+        candidates = self._parse_variants(responses, label)
+        if not candidates:
+            repaired = self._request_json(messages, 500, ExperienceEntry, label, max_bullet_points=bullet_point_count,
+                                          first_response=responses[0])
+            if repaired is None:
+                return [self._keep_entry(experience_entry)], len(experience_entry['bullet_points'])
+            candidates = [repaired]
+        return candidates, bullet_point_count
+
+    async def _experience_variants_async(self, experience_entry):
+        """Async version of _experience_variants()."""
+        if self._has_enough_coverage(experience_entry):
+            return [self._keep_entry(experience_entry)], len(experience_entry['bullet_points'])
+        messages, bullet_point_count = self._experience_request(experience_entry)
+        label = self._experience_label(experience_entry)
+        responses = await self._create_completion_async(
+            messages, max_tokens=500, response_format=response_format_for(ExperienceEntry, self.structured_output),
+            span_name='experience', label=label, n=self.variants
+        )
+        candidates = self._parse_variants(responses, label)
+        if not candidates:
+            repaired = await self._request_json_async(messages, 500, ExperienceEntry, label,
+                                                      max_bullet_points=bullet_point_count, first_response=responses[0])
+            if repaired is None:
+                return [self._keep_entry(experience_entry)], len(experience_entry['bullet_points'])
+            candidates = [repaired]
+        return candidates, bullet_point_count
+
+    def _parse_variants(self, responses, label):
+        candidates = []
+        for number, response in enumerate(responses, 1):
+            print(f"\nGPT Response for {label} (variant {number}):\n{response}")  # Debugging: print the GPT response
+            # Not truncated to the bullet point count here, so VariantRanker sees the count the model returned
+            parsed, error = self._parse_json(response, ExperienceEntry)
+            if error is None:
+                candidates.append(parsed)
+            else:
+                print(f"Variant {number} failed validation ({error}); dropping it.")
+        return candidates
+
+    def _select_variant(self, index, experience_entry, candidates, bullet_point_count):
+        """
+        Rank an entry's variants (deduplicated against the entries picked before it), store the ranking
+        in experience_variants and return the best variant.
+        """
+        if self._variant_ranker is None:
+            from variant_ranker import VariantRanker
+            self._variant_ranker = VariantRanker(self.keywords)
+        other_bullet_points = [
+            bullet for ranked in self.experience_variants if ranked for bullet in ranked[0]['entry'].get('bullet_points', [])
+        ]
+        ranked = self._variant_ranker.rank(
+            candidates, experience_entry, bullet_point_count,
+            self._average_bullet_length(experience_entry, bullet_point_count), other_bullet_points
+        )
+        for variant in ranked:
+            if 'bullet_points' in variant['entry']:
+                variant['entry']['bullet_points'] = variant['entry']['bullet_points'][:bullet_point_count]
+        self.experience_variants[index] = ranked
+        if len(ranked) > 1:
+            best = ranked[0]
+            print(f"Picked the best of {len(ranked)} variants for {self._experience_label(experience_entry)} "
+                  f"(score {best['score']:.2f}, {best['coverage']:.0%} keyword coverage"
+                  f"{', ' + '; '.join(best['problems']) if best['problems'] else ''})")
+        return ranked[0]['entry']
+
+    @staticmethod
+    def _average_bullet_length(experience_entry, bullet_point_count):
+        """The bullet point length the rewrite prompt asks for: the original bullets' total spread over the new count."""
+        if not bullet_point_count:
+            # An entry kept as-is without bullet points
+            return 0
+        return sum(len(bp) for bp in experience_entry['bullet_points']) // bullet_point_count
+
+    @staticmethod
+    async def _yield_in_order(tasks):
+        try:
+            for index, task in enumerate(tasks):
+                yield index, await task
+        finally:
+            # Stop outstanding requests if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    def _keyword_messages(self):
+        prompt = f"""Given the following job description, extract the most relevant keywords and phrases that might be 
+        used by an Applicant Tracking System (ATS) to filter applicants. Please return a list of keywords only.
+        Job Description: {self.job_description}
+        """
+        return [
+            {"role": "system", "content": "You are an assistant that identifies keywords for job descriptions that are likely to be used in ATS software."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _extract_keywords_locally(self):
+        self.keywords = list(self._extract_local_keywords())
+        print("Keywords identified: ", self.keywords)
+
+    def _extract_local_keywords(self):
+        """Keywords found by the offline KeywordExtractor, computed once per job description."""
+        if self._local_keywords is None:
+            if self.keyword_extractor is None:
+                from keyword_extractor import KeywordExtractor
+                self.keyword_extractor = KeywordExtractor()
+            self._local_keywords = self.keyword_extractor.extract(self.job_description)
+        return self._local_keywords
+
+    def _has_enough_coverage(self, experience_entry):
+        """Return True if the entry already covers enough keywords to skip rewriting it."""
+        if self.coverage_threshold is None or not self.keywords:
+            return False
+
+        if self._scorer is None or self._scorer.keywords != self.keywords:
+            from ats_scorer import ATSScorer
+            self._scorer = ATSScorer(self.keywords)
+
+        coverage = self._scorer.score_entry(experience_entry)['coverage']
+        if coverage >= self.coverage_threshold:
+            print(f"\nKeeping {experience_entry['job_title']} at {experience_entry['company']} as-is ({coverage:.0%} keyword coverage)")
+            return True
+        return False
+
+    @staticmethod
+    def _keep_entry(experience_entry):
+        # The fields still hold the resume's LaTeX source, so the repackager must not escape them again
+        return dict(experience_entry, raw_latex=True)
+
+    def _kept_technical_skills(self):
+        # The repackager writes skills equal to the parsed ones as LaTeX source, unescaped
+        return {'technical_skills': self.parser.technical_skills or {}}
+
+    @staticmethod
+    def _experience_label(experience_entry):
+        return f"experience for {experience_entry['job_title']} at {experience_entry['company']}"
+
+    def _set_keywords(self, response):
+        self.keywords = response.split(', ')
+        print("Keywords identified: ", self.keywords)
+
+    def _experience_request(self, experience_entry):
+        bullet_point_count = 6
+        average_length = self._average_bullet_length(experience_entry, bullet_point_count)
+
+        prompt = f"""
             We're rewriting a resume to get it past Applicant Tracking System (ATS).
             Feel free to fabricate/exaggerate bullet points, use made up metrics, impact, etc. as long as it's within the realm of possibility.
             Rewrite the following work experience to align with the following keywords: {', '.join(self.keywords)}.
@@ -63,32 +645,14 @@ class ResumeReshaper:
             Dates: {experience_entry['dates']}
             Bullet Points: {', '.join(experience_entry['bullet_points'])}
             """
+        messages = [
+            {"role": "system", "content": "You are an assistant that rewrites resume experience sections in JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+        return messages, bullet_point_count
 
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an assistant that rewrites resume experience sections in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
-
-            reshaped_entry = response.choices[0].message.content.strip()
-            print(f"\nGPT Response for Experience:\n{reshaped_entry}")  # Debugging: print the GPT response
-
-            # Parse JSON response and limit bullet points
-            reshaped_experience = self._parse_gpt_response(reshaped_entry, max_bullet_points=bullet_point_count)
-            new_experience.append(reshaped_experience)
-        
-        return new_experience
-
-
-    def reshape_education(self):
-        print("\nReshaping education based on the extracted keywords...")
-        new_education = []
-        for education_entry in self.parser.education:
-            prompt = f"""
+    def _education_messages(self, education_entry):
+        prompt = f"""
             Rewrite the following education details to align with the following keywords: {', '.join(self.keywords)}.
             Make the education background sound more relevant to the job description. Return the result in the following JSON format:
             {{
@@ -100,24 +664,12 @@ class ResumeReshaper:
             Major: {education_entry.get('major', 'N/A')}
             Dates: {education_entry['dates']}
             """
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that rewrites education sections of resumes."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.7
-            )
-            reshaped_entry = response.choices[0].message.content.strip()
-            print(f"\nReshaped education for {education_entry['institution']}:\n{reshaped_entry}")
-            new_education.append(self._parse_gpt_response(reshaped_entry))
-        
-        return new_education
+        return [
+            {"role": "system", "content": "You are a helpful assistant that rewrites education sections of resumes."},
+            {"role": "user", "content": prompt}
+        ]
 
-    def reshape_technical_skills(self):
-        print("\nReshaping technical skills based on the extracted keywords...")
-        
+    def _technical_skills_messages(self):
         prompt = f"""
         Rewrite the following technical skills to align with the following keywords: {', '.join(self.keywords)}.
         Retain or introduce skill categories as needed, but limit the total number of categories to be no greater than 3. 
@@ -130,51 +682,531 @@ class ResumeReshaper:
         }}
         }}
         """
-   
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an assistant that rewrites technical skills sections and aren't afraid of fabricating skills to get the applicant pass ATS screening software."},
-                {"role": "user", "content": prompt}
+        return [
+            {"role": "system", "content": "You are an assistant that rewrites technical skills sections and aren't afraid of fabricating skills to get the applicant pass ATS screening software."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _single_call_request(self):
+        """
+        Build the whole-resume prompt and pick a max_tokens budget that fits the expected output.
+
+        Returns:
+        - tuple: (messages, max_tokens, indexes of the experience entries sent for rewriting)
+        """
+        bullet_point_count = 6
+        rewritten_indexes = [
+            index for index, entry in enumerate(self.parser.experience) if not self._has_enough_coverage(entry)
+        ]
+        resume = {
+            'experience': [
+                {key: self.parser.experience[index][key] for key in ('job_title', 'company', 'location', 'dates', 'bullet_points')}
+                for index in rewritten_indexes
             ],
-            max_tokens=300,
-            temperature=0.7
+            'education': [
+                {key: entry[key] for key in ('institution', 'major', 'dates')} for entry in self.parser.education
+            ],
+            'technical_skills': self.parser.technical_skills or {},
+        }
+
+        prompt = f"""
+        We're rewriting a resume to get it past Applicant Tracking System (ATS).
+        Feel free to fabricate/exaggerate bullet points, use made up metrics, impact, etc. as long as it's within the realm of possibility.
+        Rewrite the resume below to align with the following keywords: {', '.join(self.keywords)}.
+        Rules:
+        - Return exactly {len(resume['experience'])} experience entries and {len(resume['education'])} education entries, in the same order as the input.
+        - Each experience entry has exactly {bullet_point_count} bullet points, each roughly as long as the original bullet points.
+        - Do NOT alter job titles, companies, locations, institutions or dates.
+        - Make the education background sound more relevant to the job description.
+        - Retain or introduce technical skill categories as needed, but use no more than 3 categories.
+        Return only JSON matching this schema, with no other text:
+        {{
+        "experience": [{{"job_title": "<job_title>", "company": "<company>", "location": "<location>", "dates": "<dates>", "bullet_points": ["<bullet_point>", ...]}}, ...],
+        "education": [{{"institution": "<institution>", "major": "<major>", "dates": "<dates>"}}, ...],
+        "technical_skills": {{"<Category>": ["<Skill>", ...], ...}}
+        }}
+        Resume: {json.dumps(resume)}
+        """
+        messages = [
+            {"role": "system", "content": "You are an assistant that rewrites whole resumes in JSON format."},
+            {"role": "user", "content": prompt}
+        ]
+
+        # Output budget: the bullets at their current length, plus the education and skills, plus JSON overhead
+        experience_tokens = 0
+        for entry in resume['experience']:
+            bullets = entry['bullet_points']
+            average_bullet_tokens = self._estimate_tokens(' '.join(bullets)) // max(1, len(bullets))
+            experience_tokens += bullet_point_count * (average_bullet_tokens + 15) + 40
+        education_tokens = 60 * len(resume['education'])
+        skills_tokens = 150
+        max_tokens = int((experience_tokens + education_tokens + skills_tokens) * 1.2)
+        max_tokens = max(300, min(max_tokens, self.MAX_OUTPUT_TOKENS))
+        return messages, max_tokens, rewritten_indexes
+
+    def _split_single_call_response(self, response, rewritten_indexes):
+        """
+        Split the whole-resume JSON back into the per-section shapes LatexResumeRepackager consumes.
+
+        Each entry is validated on its own, so one malformed entry does not discard the rest.
+
+        Returns:
+        - tuple: ((new_experience, new_technical_skills, new_education), experience indexes that failed
+          validation, education indexes that failed validation, whether the technical skills failed)
+        """
+        print(f"\nGPT Response for the whole resume:\n{response}")
+        parsed, error = self._parse_json(response, ResumeResponse)
+        if error:
+            print(f"Whole-resume response failed validation: {error}")
+            parsed = {}
+        reshaped_experience = parsed.get('experience') or []
+        reshaped_education = parsed.get('education') or []
+
+        # Entries that were never sent, and entries that fail validation until re-asked, keep their original content
+        new_experience = [self._keep_entry(entry) for entry in self.parser.experience]
+        failed_experience = []
+        for position, index in enumerate(rewritten_indexes):
+            entry = self._validate_entry(
+                reshaped_experience[position] if position < len(reshaped_experience) else None, ExperienceEntry
+            )
+            if entry is None:
+                failed_experience.append(index)
+            else:
+                entry['bullet_points'] = entry['bullet_points'][:6]
+                new_experience[index] = entry
+
+        new_education = []
+        failed_education = []
+        for index, original_entry in enumerate(self.parser.education):
+            entry = self._validate_entry(
+                reshaped_education[index] if index < len(reshaped_education) else None, EducationEntry
+            )
+            if entry is None:
+                failed_education.append(index)
+                entry = self._keep_entry(original_entry)
+            new_education.append(entry)
+
+        technical_skills = self._validate_entry({'technical_skills': parsed.get('technical_skills')}, TechnicalSkillsResponse)
+        skills_failed = technical_skills is None
+        new_technical_skills = {} if skills_failed else technical_skills['technical_skills']
+
+        return (new_experience, new_technical_skills, new_education), failed_experience, failed_education, skills_failed
+
+    @staticmethod
+    def _validate_entry(entry, schema):
+        """Validate one entry against `schema`, returning the cleaned dict or None."""
+        if entry is None:
+            return None
+        try:
+            return schema.model_validate(entry).model_dump()
+        except ValidationError:
+            return None
+
+    @staticmethod
+    def _estimate_tokens(text):
+        # Roughly four characters per token for English text
+        return len(text) // 4 + 1
+
+    def _request_json(self, messages, max_tokens, schema, label, max_bullet_points=None, first_response=None,
+                      fallback=None):
+        """
+        Request a JSON response matching `schema`, repairing it locally and re-asking when it still fails.
+        `first_response` reuses an already received response.
+
+        Returns:
+        - dict: The validated response, or `fallback` (the original section, so no empty section is
+          written) if every attempt failed.
+        """
+        response_format = response_format_for(schema, self.structured_output)
+        span_name = self._SPAN_NAMES.get(schema, 'completion')
+        response = first_response
+        if response is None:
+            response = self._create_completion(
+                messages, max_tokens=max_tokens, response_format=response_format, span_name=span_name, label=label
+            )
+        for attempt in range(self.max_reasks + 1):
+            print(f"\nGPT Response for {label}:\n{response}")  # Debugging: print the GPT response
+            parsed, error = self._parse_json(response, schema, max_bullet_points)
+            if error is None:
+                return parsed
+            if attempt == self.max_reasks:
+                break
+            print(f"Response failed validation ({error}); asking again...")
+            messages = self._reask_messages(messages, response, error)
+            response = self._create_completion(
+                messages, max_tokens=max_tokens, response_format=response_format, span_name=span_name,
+                label=f"{label} (re-ask {attempt + 1})"
+            )
+
+        print(f"Giving up on {label} after {self.max_reasks + 1} attempts; keeping the original.")
+        self.failed_requests += 1
+        return fallback
+
+    async def _request_json_async(self, messages, max_tokens, schema, label, max_bullet_points=None, first_response=None,
+                                  fallback=None):
+        """Async version of _request_json(). `first_response` reuses an already received (e.g. streamed) response."""
+        response_format = response_format_for(schema, self.structured_output)
+        span_name = self._SPAN_NAMES.get(schema, 'completion')
+        response = first_response
+        if response is None:
+            response = await self._create_completion_async(
+                messages, max_tokens=max_tokens, response_format=response_format, span_name=span_name, label=label
+            )
+        for attempt in range(self.max_reasks + 1):
+            print(f"\nGPT Response for {label}:\n{response}")  # Debugging: print the GPT response
+            parsed, error = self._parse_json(response, schema, max_bullet_points)
+            if error is None:
+                return parsed
+            if attempt == self.max_reasks:
+                break
+            print(f"Response failed validation ({error}); asking again...")
+            messages = self._reask_messages(messages, response, error)
+            response = await self._create_completion_async(
+                messages, max_tokens=max_tokens, response_format=response_format, span_name=span_name,
+                label=f"{label} (re-ask {attempt + 1})"
+            )
+
+        print(f"Giving up on {label} after {self.max_reasks + 1} attempts; keeping the original.")
+        self.failed_requests += 1
+        return fallback
+
+    @staticmethod
+    def _reask_messages(messages, response, error):
+        return messages + [
+            {"role": "assistant", "content": response},
+            {"role": "user", "content": f"That response could not be used: {error}. Reply with only the corrected JSON in the requested format, with no other text."}
+        ]
+
+    def _create_completion(self, messages, max_tokens, model=None, temperature=0.7, response_format=None,
+                           priority=PRIORITY_NORMAL, span_name='completion', label=None, n=1):
+        """Return the completion's text, or with n > 1 the texts of its n choices."""
+        targets = self._targets(span_name, model, max_tokens, temperature)
+        for number, target in enumerate(targets, 1):
+            last = number == len(targets)
+            try:
+                with self.tracer.span(span_name, kind='llm', label=label or span_name, model=target['spec'],
+                                      max_tokens=target['max_tokens']) as span:
+                    return self._traced_completion(span, messages, target, response_format, priority, last, n)
+            except Exception as e:
+                if last or not is_model_failure(e):
+                    raise
+                self._fall_back(label or span_name, target, targets[number], e)
+
+    def _traced_completion(self, span, messages, target, response_format, priority, last=True, n=1):
+        cache_key = self._cache_key(target['spec'], messages, target['temperature'], target['max_tokens'], n,
+                                    response_format)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            span.set(cache_hit=True)
+            return cached if n == 1 else json.loads(cached)
+        if n > 1:
+            span.set(choices=n)
+
+        extra_arguments = self._request_arguments(target, response_format, n)
+        client = self.client if target['endpoint'] is None else self.router.client(target['endpoint'])
+
+        def create():
+            started = time.perf_counter()
+            try:
+                response = client.chat.completions.create(
+                    model=target['model'],
+                    messages=messages,
+                    max_tokens=target['max_tokens'],
+                    temperature=target['temperature'],
+                    **extra_arguments
+                )
+            except Exception as e:
+                self._record_latency(target, started, e)
+                raise
+            self._record_latency(target, started)
+            return response
+
+        if self.scheduler is None:
+            response = create()
+        else:
+            response = self.scheduler.run(
+                create, RequestScheduler.estimate_tokens(messages, target['max_tokens'] * n), priority,
+                on_retry=lambda error: span.increment('retries'), max_retries=self._retries_before_fallback(last)
+            )
+        self.tracer.record_usage(span, getattr(response, 'usage', None), target['model'])
+        return self._store_choices(cache_key, response, n)
+
+    async def _create_completion_async(self, messages, max_tokens, model=None, temperature=0.7, response_format=None,
+                                       priority=PRIORITY_NORMAL, span_name='completion', label=None, n=1):
+        targets = self._targets(span_name, model, max_tokens, temperature)
+        for number, target in enumerate(targets, 1):
+            last = number == len(targets)
+            try:
+                with self.tracer.span(span_name, kind='llm', label=label or span_name, model=target['spec'],
+                                      max_tokens=target['max_tokens']) as span:
+                    return await self._traced_completion_async(span, messages, target, response_format, priority, last, n)
+            except Exception as e:
+                if last or not is_model_failure(e):
+                    raise
+                self._fall_back(label or span_name, target, targets[number], e)
+
+    async def _traced_completion_async(self, span, messages, target, response_format, priority, last=True, n=1):
+        cache_key = self._cache_key(target['spec'], messages, target['temperature'], target['max_tokens'], n,
+                                    response_format)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            span.set(cache_hit=True)
+            return cached if n == 1 else json.loads(cached)
+        if n > 1:
+            span.set(choices=n)
+
+        extra_arguments = self._request_arguments(target, response_format, n)
+        client = self.async_client if target['endpoint'] is None else self.router.client(target['endpoint'], asynchronous=True)
+
+        async def create():
+            started = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=target['model'],
+                    messages=messages,
+                    max_tokens=target['max_tokens'],
+                    temperature=target['temperature'],
+                    **extra_arguments
+                )
+            except Exception as e:
+                self._record_latency(target, started, e)
+                raise
+            self._record_latency(target, started)
+            return response
+
+        async with self._get_semaphore():
+            response = await self._schedule_async(create, messages, target['max_tokens'] * n, priority, span, last)
+        self.tracer.record_usage(span, getattr(response, 'usage', None), target['model'])
+        return self._store_choices(cache_key, response, n)
+
+    async def _stream_completion_async(self, messages, max_tokens, watch_paths, on_value, model=None, temperature=0.7,
+                                       span_name='completion', label=None):
+        """
+        Stream a completion, feeding each chunk to an IncrementalJSONParser so watched values reach
+        on_value as soon as they are complete. Returns the full response text.
+
+        A failing model is only swapped for the next one before any of its output has been streamed.
+        """
+        targets = self._targets(span_name, model, max_tokens, temperature)
+        for number, target in enumerate(targets, 1):
+            last = number == len(targets)
+            pieces = []
+            try:
+                with self.tracer.span(span_name, kind='llm', label=label or span_name, model=target['spec'],
+                                      max_tokens=target['max_tokens'], stream=True) as span:
+                    return await self._traced_stream_completion_async(
+                        span, messages, watch_paths, on_value, target, pieces, last
+                    )
+            except Exception as e:
+                if last or pieces or not is_model_failure(e):
+                    raise
+                self._fall_back(label or span_name, target, targets[number], e)
+
+    async def _traced_stream_completion_async(self, span, messages, watch_paths, on_value, target, pieces, last=True):
+        json_parser = IncrementalJSONParser(on_value, watch_paths)
+        cache_key = self._cache_key(target['spec'], messages, target['temperature'], target['max_tokens'])
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            span.set(cache_hit=True)
+            json_parser.feed(cached)
+            return cached
+
+        extra_arguments = self._request_arguments(target)
+        client = self.async_client if target['endpoint'] is None else self.router.client(target['endpoint'], asynchronous=True)
+
+        def create():
+            return client.chat.completions.create(
+                model=target['model'],
+                messages=messages,
+                max_tokens=target['max_tokens'],
+                temperature=target['temperature'],
+                stream=True,
+                stream_options={"include_usage": True},  # The final chunk then carries response.usage
+                **extra_arguments
+            )
+
+        async with self._get_semaphore():
+            started = time.perf_counter()
+            try:
+                # Only opening the stream is retried; an error mid-stream propagates to the caller
+                stream = await self._schedule_async(create, messages, target['max_tokens'], PRIORITY_NORMAL, span, last)
+                async for chunk in stream:
+                    if getattr(chunk, 'usage', None) is not None:
+                        self.tracer.record_usage(span, chunk.usage, target['model'])
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not pieces:
+                            span.set(first_token_seconds=round(time.perf_counter() - started, 3))
+                        pieces.append(delta)
+                        json_parser.feed(delta)
+            except Exception as e:
+                self._record_latency(target, started, e)
+                raise
+            self._record_latency(target, started)
+
+        content = ''.join(pieces).strip()
+        self._cache_store(cache_key, content)
+        return content
+
+    def _targets(self, span_name, model, max_tokens, temperature):
+        """
+        The models to try for a request, best first: the router's route for the stage, or just `model`
+        (gpt-4 when not given) when there is no router or the caller names a model explicitly.
+        """
+        if self.router is None or model is not None:
+            model = model or 'gpt-4'
+            return [{'model': model, 'spec': model, 'endpoint': None, 'max_tokens': max_tokens, 'timeout': None,
+                     'temperature': temperature}]
+        return self.router.targets(span_name, max_tokens, temperature)
+
+    @staticmethod
+    def _request_arguments(target, response_format=None, n=1):
+        extra_arguments = {'response_format': response_format} if response_format else {}
+        if target['timeout'] is not None:
+            extra_arguments['timeout'] = target['timeout']
+        if n != 1:
+            extra_arguments['n'] = n
+        return extra_arguments
+
+    def _store_choices(self, cache_key, response, n):
+        """Cache and return the response text, or the list of its choices' texts when n > 1."""
+        if n == 1:
+            content = response.choices[0].message.content.strip()
+            self._cache_store(cache_key, content)
+            return content
+        contents = [(choice.message.content or '').strip() for choice in sorted(response.choices, key=lambda choice: choice.index)]
+        self._cache_store(cache_key, json.dumps(contents))
+        return contents
+
+    def _record_latency(self, target, started, error=None):
+        """Report a request's latency and outcome to the router. Errors that are not the model's are not counted."""
+        if self.router is None or (error is not None and not is_model_failure(error)):
+            return
+        self.router.record(target['spec'], time.perf_counter() - started, error is None)
+
+    def _retries_before_fallback(self, last):
+        """Scheduler retries for a request: fewer when another model is waiting to take over."""
+        if self.router is None or last:
+            return None
+        return self.router.retries_before_fallback
+
+    def _fall_back(self, label, target, next_target, error):
+        self.router.record_fallback()
+        print(f"{target['spec']} failed for {label} ({type(error).__name__}); falling back to {next_target['spec']}")
+
+    async def _schedule_async(self, create, messages, max_tokens, priority, span, last=True):
+        """Await `create()` directly, or through the scheduler's rate limits and retries when one is set."""
+        if self.scheduler is None:
+            return await create()
+        return await self.scheduler.run_async(
+            create, RequestScheduler.estimate_tokens(messages, max_tokens), priority,
+            on_retry=lambda error: span.increment('retries'), max_retries=self._retries_before_fallback(last)
         )
-        reshaped_skills = response.choices[0].message.content.strip()
-        print(f"\nReshaped technical skills:\n{reshaped_skills}")
 
-        # Parse the response into structured technical skills
-        return self._parse_gpt_response(reshaped_skills).get('technical_skills', {})
+    def _cache_key(self, model, messages, temperature, max_tokens, n=1, response_format=None):
+        if self.cache is None:
+            return None
+        return self.cache.make_key(model, messages, temperature, max_tokens, n, response_format)
+
+    def _cache_lookup(self, cache_key):
+        if cache_key is None:
+            return None
+        return self.cache.get(cache_key)
+
+    def _cache_store(self, cache_key, content):
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+
+    def _get_semaphore(self):
+        """Return the concurrency limiter, creating it for the currently running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _parse_json(self, response, schema=None, max_bullet_points=None):
+        """
+        Parse (and locally repair) a GPT response as JSON, validating it against `schema` if given.
+
+        Returns:
+        - tuple: (parsed dict, None) on success, or ({}, error message) on failure.
+        """
+        try:
+            parsed_response = repair_json(response)
+        except ValueError as e:
+            return {}, str(e)
+        if not isinstance(parsed_response, dict):
+            return {}, "expected a JSON object"
+
+        if schema is not None:
+            try:
+                parsed_response = schema.model_validate(parsed_response).model_dump()
+            except ValidationError as e:
+                return {}, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+
+        # If bullet points are present and max_bullet_points is set, truncate the list if necessary
+        if max_bullet_points and 'bullet_points' in parsed_response:
+            parsed_response['bullet_points'] = parsed_response['bullet_points'][:max_bullet_points]
 
-    def _parse_gpt_response(self, response, max_bullet_points=None):
+        return parsed_response, None
+
+    def _parse_gpt_response(self, response, max_bullet_points=None, schema=None):
         """
         Parse the GPT response as JSON data and ensure the number of bullet points doesn't exceed the limit.
         
         Params:
-        - response (str): The raw GPT response to parse.
+        - response (str): The raw GPT response to parse. Markdown fences, trailing commas and truncation are repaired.
         - max_bullet_points (int): The maximum number of bullet points to accept (if provided).
+        - schema (type[BaseModel]): Optional pydantic model the response must validate against.
         
         Returns:
         - dict: Parsed experience, education, or technical skills data.
         """
-        try:
-            parsed_response = json.loads(response)  # Parse GPT response as JSON
-            
-            # If bullet points are present and max_bullet_points is set, truncate the list if necessary
-            if max_bullet_points and 'bullet_points' in parsed_response:
-                parsed_response['bullet_points'] = parsed_response['bullet_points'][:max_bullet_points]
-            
-            return parsed_response
-        except json.JSONDecodeError:
-            print("Error parsing JSON from GPT response. Response was:")
+        parsed_response, error = self._parse_json(response, schema, max_bullet_points)
+        if error:
+            print(f"Error parsing JSON from GPT response ({error}). Response was:")
             print(response)
-            return {}
+        return parsed_response
 
 
+class _ExperienceStream:
+    """
+    The async iterator returned by stream_experience_async(). It owns the entries' tasks, so aclose()
+    cancels them and collects their results even when nothing has iterated it yet (closing an async
+    generator that never started does not run its cleanup).
+    """
+
+    def __init__(self, tasks, entries):
+        self.tasks = tasks
+        self._entries = entries
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._entries.__anext__()
+
+    async def aclose(self):
+        await self._entries.aclose()
+        for task in self.tasks:
+            task.cancel()
+        # Retrieve every outcome so no "Task exception was never retrieved" is logged
+        await asyncio.gather(*self.tasks, return_exceptions=True)
 
 
 # Example usage
 if __name__ == "__main__":
+    # Only the example needs these; the CLI and pipelines import this module without them
+    from openai import OpenAI
+    from dotenv import load_dotenv
+    from resume_parser import LatexResumeParser
+    from resume_repackager import LatexResumeRepackager
+
     # Load environment variables from .env file
     load_dotenv()
 
@@ -0,0 +1,120 @@
+from typing import Dict, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+class ExperienceEntry(BaseModel):
+    """One reshaped experience entry, as returned by the experience prompt."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    job_title: str
+    company: str
+    location: str = ''
+    dates: str
+    bullet_points: List[str] = Field(min_length=1)
+
+    @field_validator('bullet_points')
+    @classmethod
+    def bullet_points_not_blank(cls, bullet_points):
+        bullet_points = [bullet.strip() for bullet in bullet_points if bullet and bullet.strip()]
+        if not bullet_points:
+            raise ValueError("bullet_points must contain at least one non-empty bullet point")
+        return bullet_points
+
+
+class EducationEntry(BaseModel):
+    """One reshaped education entry, as returned by the education prompt."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    institution: str
+    major: str
+    dates: str
+
+
+class TechnicalSkillsResponse(BaseModel):
+    """The technical skills prompt's response: category name -> skills."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    technical_skills: Dict[str, List[str]] = Field(min_length=1)
+
+
+class ResumeResponse(BaseModel):
+    """
+    The single-call prompt's response. Entries are kept as raw dicts here and validated one by one
+    against ExperienceEntry/EducationEntry, so a single bad entry can be re-asked on its own.
+    """
+
+    model_config = ConfigDict(extra='ignore')
+
+    experience: List[dict] = []
+    education: List[dict] = []
+    technical_skills: dict = {}
+
+
+class ResumeResponseSchema(BaseModel):
+    """The schema sent to the API for the single-call prompt: ResumeResponse with its entries' own schemas."""
+
+    experience: List[ExperienceEntry]
+    education: List[EducationEntry]
+    technical_skills: Dict[str, List[str]]
+
+
+# Schemas sent to the API in place of the model the response is parsed with
+_API_SCHEMAS = {ResumeResponse: ResumeResponseSchema}
+
+
+def strict_json_schema(json_schema):
+    """
+    Rewrite a JSON schema into the form strict structured output accepts: every object closed
+    (additionalProperties false) with all of its properties required, and no defaults.
+
+    Returns:
+    - dict or None: The strict schema, or None when it has a free-form object (a Dict field such as
+      the technical skills) that strict mode cannot express.
+    """
+    strict = {key: value for key, value in json_schema.items() if key != 'default'}
+    for key in ('properties', '$defs'):
+        if key in strict:
+            strict[key] = {name: strict_json_schema(value) for name, value in strict[key].items()}
+            if None in strict[key].values():
+                return None
+    for key in ('anyOf', 'allOf', 'oneOf'):
+        if key in strict:
+            strict[key] = [strict_json_schema(value) for value in strict[key]]
+            if None in strict[key]:
+                return None
+    if isinstance(strict.get('items'), dict):
+        strict['items'] = strict_json_schema(strict['items'])
+        if strict['items'] is None:
+            return None
+
+    if strict.get('type') == 'object':
+        if 'properties' not in strict or strict.get('additionalProperties') not in (None, False):
+            return None
+        strict['additionalProperties'] = False
+        strict['required'] = list(strict['properties'])
+    return strict
+
+
+def response_format_for(schema, mode):
+    """
+    Build the `response_format` argument for a chat completion.
+
+    Params:
+    - schema (type[BaseModel]): The model the response must match.
+    - mode (str): 'json_object' for JSON mode, 'json_schema' to send the model's JSON schema, or None.
+      The schema is sent in strict mode when strict mode can express it.
+
+    Returns:
+    - dict or None: None when structured output is not requested.
+    """
+    if mode == 'json_object':
+        return {"type": "json_object"}
+    if mode == 'json_schema':
+        json_schema = _API_SCHEMAS.get(schema, schema).model_json_schema()
+        strict = strict_json_schema(json_schema)
+        if strict is not None:
+            return {"type": "json_schema", "json_schema": {"name": schema.__name__, "schema": strict, "strict": True}}
+        return {"type": "json_schema", "json_schema": {"name": schema.__name__, "schema": json_schema}}
+    return None
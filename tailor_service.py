@@ -0,0 +1,508 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from openai import OpenAI, AsyncOpenAI
+from dotenv import load_dotenv
+from resume_parser import LatexResumeParser
+from latex_templates import TEMPLATES
+from jd_compactor import JobDescriptionCompactor
+from posting_index import PostingIndex
+from model_router import load_router
+from resume_reshaper import ResumeReshaper
+from resume_repackager import LatexResumeRepackager
+from llm_cache import LLMResponseCache
+from request_scheduler import RequestScheduler
+
+MAX_BODY_BYTES = 1024 * 1024
+HTTP_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                409: 'Conflict', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+class TailorJob:
+    """One queued tailoring request and the events it has produced so far."""
+
+    def __init__(self, resume_id, job_description=None, workday_url=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.resume_id = resume_id
+        self.job_description = job_description
+        self.workday_url = workday_url
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.output_path = None
+        self.keywords = []
+        self.error = None
+        self.events = []
+        self._changed = asyncio.Event()  # Set (and replaced) whenever an event is added
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def emit(self, event, **data):
+        self.events.append(dict(data, event=event, time=time.time()))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_events(self, count):
+        """Wait until more than `count` events exist or the job has finished."""
+        while len(self.events) <= count and not self.finished:
+            await self._changed.wait()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'resume_id': self.resume_id,
+            'workday_url': self.workday_url,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'seconds': (self.finished_at - self.started_at) if self.finished_at and self.started_at else None,
+            'keywords': self.keywords,
+            'output_path': self.output_path,
+            'error': self.error,
+            'events': len(self.events),
+        }
+
+
+class TailorService:
+    """
+    Long-running tailoring service with warm state.
+
+    Resumes are parsed once when registered (and re-parsed only if the file changes), and the OpenAI
+    clients, response cache and request scheduler are created once and shared by every job. Jobs
+    are accepted onto a bounded queue and run by `workers` concurrent workers, so the latency of a
+    request is only the LLM work it needs.
+
+    HTTP API (JSON unless noted):
+    - GET  /health                 Queue depth, worker count, loaded resumes and scheduler/cache/model stats.
+    - GET  /resumes                Registered resume ids.
+    - POST /resumes                {"id": ..., "path": ...} registers (and parses) a resume.
+    - POST /jobs                   {"resume_id": ..., "job_description": ...} or {"resume_id": ..., "workday_url": ...}.
+                                   Returns 202 with the job, or 503 when the queue is full.
+    - GET  /jobs/<id>              Job status and result metadata, for polling.
+    - GET  /jobs/<id>/events       Newline-delimited JSON events (compacted, reused, keywords, bullets, entries, done) streamed live.
+    - GET  /jobs/<id>/result       The tailored .tex document (text/plain).
+    """
+
+    def __init__(self, client, async_client, output_dir='tailored_resumes', workers=2, queue_size=100,
+                 max_concurrency=5, cache=None, scheduler=None, keyword_strategy='llm', coverage_threshold=None,
+                 structured_output=None, workday_fetch_mode='http', max_finished_jobs=500, compactor=None,
+                 posting_index=None, router=None):
+        self.client = client
+        self.async_client = async_client
+        self.output_dir = output_dir
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.scheduler = scheduler
+        self.keyword_strategy = keyword_strategy
+        self.coverage_threshold = coverage_threshold
+        self.structured_output = structured_output
+        self.workday_fetch_mode = workday_fetch_mode
+        self.max_finished_jobs = max_finished_jobs
+        self.compactor = compactor  # Optional JobDescriptionCompactor shared by every job
+        self.posting_index = posting_index  # Optional PostingIndex of earlier jobs' results
+        self.router = router  # Optional ModelRouter shared by every job
+        self.keyword_extractor = None
+        if keyword_strategy == 'local' or posting_index is not None:
+            from keyword_extractor import KeywordExtractor
+            self.keyword_extractor = KeywordExtractor()
+
+        self.resumes = {}  # resume id -> (path, mtime, LatexResumeParser)
+        self.jobs = OrderedDict()
+        self._queue = None
+        self._worker_tasks = []
+        self._server = None
+
+    def register_resume(self, resume_id, path, template=None):
+        """Parse a resume and keep it warm under `resume_id`. `template` names its LaTeX layout (see latex_templates.py)."""
+        parser = LatexResumeParser.load(path, template=template)
+        self.resumes[resume_id] = (path, os.path.getmtime(path), parser)
+        print(f"Registered resume '{resume_id}' ({path})")
+        return parser
+
+    def register_resumes_from(self, directory, template=None):
+        """Register every .tex file in `directory`, using the file name without extension as its id."""
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.tex'):
+                self.register_resume(os.path.splitext(name)[0], os.path.join(directory, name), template)
+
+    def get_parser(self, resume_id):
+        """Return the warm parser for `resume_id`, re-parsing the file only if it changed on disk."""
+        path, mtime, parser = self.resumes[resume_id]
+        if os.path.exists(path) and os.path.getmtime(path) != mtime:
+            parser = self.register_resume(resume_id, path, parser.template)
+        return parser
+
+    async def start(self, host='127.0.0.1', port=8080):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        if self.compactor is not None:
+            self.compactor.library.save()
+
+    def submit(self, resume_id, job_description=None, workday_url=None):
+        """
+        Queue a tailoring job.
+
+        Raises:
+        - KeyError: If the resume id is not registered.
+        - ValueError: If neither a job description nor a Workday URL is given.
+        - asyncio.QueueFull: If the queue is full.
+        """
+        if resume_id not in self.resumes:
+            raise KeyError(f"Unknown resume id '{resume_id}'")
+        if not job_description and not workday_url:
+            raise ValueError("Either job_description or workday_url is required.")
+
+        job = TailorJob(resume_id, job_description, workday_url)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        return job
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'queued': self._queue.qsize() if self._queue else 0,
+            'queue_size': self.queue_size,
+            'workers': self.workers,
+            'running': sum(1 for job in self.jobs.values() if job.status == 'running'),
+            'resumes': sorted(self.resumes),
+            'scheduler': self.scheduler.stats() if self.scheduler else None,
+            'cache': self.cache.stats() if self.cache else None,
+            'posting_index': self.posting_index.stats() if self.posting_index else None,
+            'models': dict(self.router.stats(), fallbacks=self.router.fallbacks) if self.router else None,
+        }
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        job.emit('started')
+        try:
+            parser = self.get_parser(job.resume_id)
+            if not job.job_description:
+                job.job_description = await asyncio.to_thread(self._scrape_workday, job.workday_url)
+                job.emit('job_description', characters=len(job.job_description))
+
+            reshaper = ResumeReshaper(
+                client=self.client,
+                parser=parser,
+                job_description=job.job_description,
+                async_client=self.async_client,
+                max_concurrency=self.max_concurrency,
+                cache=self.cache,
+                keyword_strategy=self.keyword_strategy,
+                keyword_extractor=self.keyword_extractor,
+                coverage_threshold=self.coverage_threshold,
+                structured_output=self.structured_output,
+                scheduler=self.scheduler,
+                compactor=self.compactor,
+                posting_index=self.posting_index,
+                posting_label=f"{job.resume_id}-{job.id}",
+                router=self.router,
+            )
+            if reshaper.compaction is not None:
+                job.emit('compacted', original_tokens=reshaper.compaction['original_tokens'],
+                         compacted_tokens=reshaper.compaction['compacted_tokens'],
+                         tokens_saved=reshaper.compaction['tokens_saved'])
+            reused = reshaper.lookup_similar_posting()
+            if reshaper.reused_posting is not None:
+                job.emit('reused', posting=reshaper.reused_posting['label'],
+                         similarity=reshaper.reused_posting['similarity'], whole_result=reused is not None)
+
+            output_path = os.path.join(self.output_dir, f"{job.resume_id}-{job.id}.tex")
+            if reused is not None:
+                await self._save_reused(job, parser, reshaper, reused, output_path)
+            else:
+                await self._reshape_and_save(job, parser, reshaper, output_path)
+
+            job.output_path = output_path
+            job.status = 'succeeded'
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = 'failed'
+            print(f"Job {job.id} failed: {job.error}")
+        job.finished_at = time.time()
+        job.emit('done', status=job.status, output_path=job.output_path, error=job.error)
+
+    async def _reshape_and_save(self, job, parser, reshaper, output_path):
+        await reshaper.extract_keywords_async()
+        job.keywords = reshaper.keywords
+        job.emit('keywords', keywords=reshaper.keywords)
+
+        def on_bullet(entry_index, bullet_index, text):
+            job.emit('bullet', entry=entry_index, index=bullet_index, text=text)
+
+        experience_stream = reshaper.stream_experience_async(on_bullet=on_bullet)
+        try:
+            new_technical_skills, new_education = await asyncio.gather(
+                reshaper.reshape_technical_skills_async(),
+                reshaper.reshape_education_async(),
+            )
+        except BaseException:
+            # Nothing will read the experience stream now, so stop its requests
+            await experience_stream.aclose()
+            raise
+        job.emit('technical_skills', technical_skills=new_technical_skills)
+        job.emit('education', education=new_education)
+
+        async def report_entries():
+            async for index, entry in experience_stream:
+                job.emit('entry', index=index, entry=entry)
+                yield index, entry
+
+        repackager = LatexResumeRepackager(parser)
+        repackager.replace_technical_skills(new_technical_skills)
+        repackager.replace_education(new_education)
+        new_experience = await repackager.save_to_file_streaming(output_path, report_entries())
+        reshaper.record_posting(new_experience, new_technical_skills, new_education)
+
+    async def _save_reused(self, job, parser, reshaper, reused, output_path):
+        """Write the result of a near-duplicate posting, emitting the same events as a reshaped job."""
+        new_experience, new_technical_skills, new_education = reused
+        job.keywords = reshaper.keywords
+        job.emit('keywords', keywords=reshaper.keywords)
+        job.emit('technical_skills', technical_skills=new_technical_skills)
+        job.emit('education', education=new_education)
+        for index, entry in enumerate(new_experience):
+            job.emit('entry', index=index, entry=entry)
+
+        repackager = LatexResumeRepackager(parser)
+        repackager.replace_experience(new_experience)
+        repackager.replace_technical_skills(new_technical_skills)
+        repackager.replace_education(new_education)
+        repackager.save_to_file(output_path)
+
+    def _scrape_workday(self, url):
+        from workday_scraper import WorkdayScraper
+        scraper = WorkdayScraper(url, fetch_mode=self.workday_fetch_mode)
+        scraper.scrape_job_description()
+        if not scraper.job_description:
+            raise ValueError(f"Could not read a job description from {url}")
+        return scraper.job_description
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY_BYTES:
+                await self._send_json(writer, 413, {'error': "Request body too large."})
+                return
+            body = await reader.readexactly(length) if length else b''
+            await self._route(method.upper(), urlsplit(target).path.rstrip('/') or '/', body, writer)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await self._send_json(writer, 400, {'error': f"Malformed request: {e}"})
+        except ConnectionError:
+            pass  # The client went away, e.g. while streaming events
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body, writer):
+        if path == '/health' and method == 'GET':
+            await self._send_json(writer, 200, self.health())
+            return
+
+        if path == '/resumes':
+            if method == 'GET':
+                await self._send_json(writer, 200, {'resumes': sorted(self.resumes)})
+            elif method == 'POST':
+                payload = self._json_body(body)
+                if not payload.get('id') or not payload.get('path'):
+                    await self._send_json(writer, 400, {'error': "Both 'id' and 'path' are required."})
+                elif not os.path.exists(payload['path']):
+                    await self._send_json(writer, 404, {'error': f"File not found: {payload['path']}"})
+                elif payload.get('template') and payload['template'] not in TEMPLATES:
+                    await self._send_json(writer, 400, {'error': f"Unknown template '{payload['template']}'. Available: {', '.join(sorted(TEMPLATES))}"})
+                else:
+                    await asyncio.to_thread(self.register_resume, payload['id'], payload['path'], payload.get('template'))
+                    await self._send_json(writer, 200, {'id': payload['id']})
+            else:
+                await self._send_json(writer, 405, {'error': "Use GET or POST."})
+            return
+
+        if path == '/jobs':
+            if method != 'POST':
+                await self._send_json(writer, 405, {'error': "Use POST to submit a job."})
+                return
+            payload = self._json_body(body)
+            try:
+                job = self.submit(payload.get('resume_id'), payload.get('job_description'), payload.get('workday_url'))
+            except KeyError as e:
+                await self._send_json(writer, 404, {'error': e.args[0]})
+            except ValueError as e:
+                await self._send_json(writer, 400, {'error': str(e)})
+            except asyncio.QueueFull:
+                await self._send_json(writer, 503, {'error': "The job queue is full, try again later."},
+                                      headers={'Retry-After': '5'})
+            else:
+                await self._send_json(writer, 202, job.to_dict())
+            return
+
+        match = re.fullmatch(r'/jobs/([0-9a-f]+)(/events|/result)?', path)
+        job = self.jobs.get(match.group(1)) if match else None
+        if job is None:
+            await self._send_json(writer, 404, {'error': f"Not found: {path}"})
+            return
+        if method != 'GET':
+            await self._send_json(writer, 405, {'error': "Use GET."})
+            return
+
+        if match.group(2) == '/events':
+            await self._stream_events(job, writer)
+        elif match.group(2) == '/result':
+            if job.status != 'succeeded':
+                await self._send_json(writer, 409, {'error': f"Job is {job.status}.", 'job': job.to_dict()})
+                return
+            with open(job.output_path, 'r', encoding='utf-8') as file:
+                await self._send(writer, 200, file.read().encode('utf-8'), 'text/plain; charset=utf-8')
+        else:
+            await self._send_json(writer, 200, job.to_dict())
+
+    async def _stream_events(self, job, writer):
+        """Write the job's events as newline-delimited JSON until it finishes, then close the connection."""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        sent = 0
+        while True:
+            while sent < len(job.events):
+                writer.write((json.dumps(job.events[sent]) + '\n').encode('utf-8'))
+                sent += 1
+            await writer.drain()
+            if job.finished and sent >= len(job.events):
+                return
+            await job.wait_for_events(sent)
+
+    @staticmethod
+    def _json_body(body):
+        payload = json.loads(body or b'{}')
+        if not isinstance(payload, dict):
+            raise ValueError("The request body must be a JSON object.")
+        return payload
+
+    async def _send_json(self, writer, status, payload, headers=None):
+        await self._send(writer, status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+
+    @staticmethod
+    async def _send(writer, status, data, content_type, headers=None):
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(data)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+
+async def serve(service, host, port):
+    bound_host, bound_port = await service.start(host, port)
+    print(f"Tailoring service listening on http://{bound_host}:{bound_port}")
+    try:
+        await asyncio.Event().wait()  # Run until interrupted
+    finally:
+        await service.stop()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run the resume tailoring service.")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    arg_parser.add_argument('--resumes-dir', default='.', help="Directory whose .tex files are registered at startup")
+    arg_parser.add_argument('--output-dir', default='tailored_resumes', help="Directory for the tailored .tex files")
+    arg_parser.add_argument('--workers', type=int, default=2, help="Jobs run at the same time")
+    arg_parser.add_argument('--queue-size', type=int, default=100, help="Jobs that can wait in the queue")
+    arg_parser.add_argument('--max-concurrency', type=int, default=5, help="In-flight LLM requests per job")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Bypass the LLM response cache")
+    arg_parser.add_argument('--keywords', choices=('llm', 'local'), default='llm',
+                            help="Extract keywords with the LLM or with the offline extractor")
+    arg_parser.add_argument('--template', choices=sorted(TEMPLATES), default='resume',
+                            help="LaTeX layout of the registered resumes: resume (\\resumeSubheading) or moderncv (\\cventry)")
+    arg_parser.add_argument('--rpm', type=int, default=500, help="Requests per minute allowed by the OpenAI account")
+    arg_parser.add_argument('--tpm', type=int, default=40000, help="Tokens per minute allowed by the OpenAI account")
+    arg_parser.add_argument('--jd-token-budget', type=int, default=600,
+                            help="Tokens of each job description kept after boilerplate is stripped")
+    arg_parser.add_argument('--no-compact', action='store_true', help="Send job descriptions to the LLM unchanged")
+    arg_parser.add_argument('--reuse-threshold', type=float, default=0.85,
+                            help="Similarity (0-1) at which a job reuses the result of an earlier near-duplicate posting")
+    arg_parser.add_argument('--no-reuse', action='store_true', help="Tailor every job from scratch")
+    arg_parser.add_argument('--routes', default=None,
+                            help="JSON file of per-stage model routes and endpoints (defaults to the built-in routes)")
+    args = arg_parser.parse_args(argv)
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OpenAI API key not found in the environment. Make sure it is set in the .env file.")
+        return 1
+    try:
+        router = load_router(args.routes)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error: Could not load the model routes: {e}")
+        return 1
+
+    service = TailorService(
+        client=OpenAI(api_key=api_key, max_retries=0),
+        async_client=AsyncOpenAI(api_key=api_key, max_retries=0),
+        output_dir=args.output_dir,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_concurrency=args.max_concurrency,
+        cache=LLMResponseCache(bypass=args.no_cache),
+        scheduler=RequestScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm),
+        keyword_strategy=args.keywords,
+        compactor=None if args.no_compact else JobDescriptionCompactor(token_budget=args.jd_token_budget),
+        posting_index=None if args.no_reuse else PostingIndex(threshold=args.reuse_threshold),
+        router=router,
+    )
+    service.register_resumes_from(args.resumes_dir, args.template)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
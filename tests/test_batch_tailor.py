@@ -0,0 +1,31 @@
+import os
+import json
+from benchmark import generate_resume
+from batch_tailor import BatchTailor, load_job_descriptions
+from fake_openai_server import AsyncFakeChatClient, FakeChatClient
+from resume_parser import LatexResumeParser
+
+JOB_DESCRIPTION = """Backend Engineer
+Requirements:
+- Experience with Python and PostgreSQL
+"""
+
+
+def test_colliding_job_ids_get_their_own_output_files(tmp_path, capsys):
+    resume_path = tmp_path / 'resume.tex'
+    resume_path.write_text(generate_resume(2, seed=3), encoding='utf-8')
+    jobs_path = tmp_path / 'jobs.jsonl'
+    ids = ['a/b', 'a_b', 'a_b', 'A_B', 'acme/site:REQ-1', 'acme_site_REQ-1']
+    jobs_path.write_text(''.join(json.dumps({'id': job_id, 'job_description': JOB_DESCRIPTION}) + '\n' for job_id in ids))
+
+    batch = BatchTailor(FakeChatClient(), AsyncFakeChatClient(), LatexResumeParser(str(resume_path)),
+                        str(tmp_path / 'out'), keyword_strategy='local')
+    summary = batch.run(load_job_descriptions(str(jobs_path)))
+
+    assert summary['succeeded'] == len(ids)
+    output_paths = [result['output_path'] for result in batch.results]
+    assert [os.path.basename(path) for path in output_paths] == [
+        'a_b.tex', 'a_b-2.tex', 'a_b-3.tex', 'A_B-4.tex', 'acme_site_REQ-1.tex', 'acme_site_REQ-1-2.tex',
+    ]
+    assert sorted(path.name for path in (tmp_path / 'out').glob('*.tex')) == sorted(os.path.basename(path) for path in output_paths)
+    assert "Job 'a_b' would overwrite the output of job 'a/b'" in capsys.readouterr().out
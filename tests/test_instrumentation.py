@@ -0,0 +1,16 @@
+from instrumentation import Tracer
+
+
+def test_prometheus_text_has_one_sample_per_series():
+    tracer = Tracer()
+    for size in (1000, 2000, 3000):
+        with tracer.span('parse', input_bytes=size):
+            pass
+        with tracer.span('save') as span:
+            span.set(output_bytes=size * 2)
+
+    samples = [line for line in tracer.prometheus_text().splitlines() if line and not line.startswith('#')]
+    series = [line.rsplit(' ', 1)[0] for line in samples]
+    assert len(series) == len(set(series))
+    assert 'resume_tailor_document_bytes{name="parse",field="input_bytes"} 3000' in samples
+    assert 'resume_tailor_document_bytes{name="save",field="output_bytes"} 6000' in samples
@@ -0,0 +1,69 @@
+from jd_compactor import BoilerplateLibrary, JobDescriptionCompactor
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Acme Robotics builds warehouse automation.
+Requirements:
+- 5+ years of experience with Python
+- Experience with AWS
+You will design and maintain our order routing services.
+"""
+
+
+def make_compactor(tmp_path, learn_threshold=3):
+    library = BoilerplateLibrary(path=str(tmp_path / 'library.json'), learn_threshold=learn_threshold)
+    return JobDescriptionCompactor(token_budget=600, library=library)
+
+
+def test_compacting_the_same_posting_repeatedly_learns_nothing(tmp_path):
+    compactor = make_compactor(tmp_path)
+    results = [compactor.compact(JOB_DESCRIPTION)['text'] for _ in range(5)]
+    assert len(set(results)) == 1
+    assert 'Senior Backend Engineer' in results[-1]
+    assert 'You will design and maintain' in results[-1]
+    assert not compactor.library.hashes
+
+
+def test_posting_counts_survive_a_reload(tmp_path):
+    compactor = make_compactor(tmp_path)
+    compactor.compact(JOB_DESCRIPTION)
+    compactor.library.save()
+    reloaded = make_compactor(tmp_path)
+    for _ in range(3):
+        reloaded.compact(JOB_DESCRIPTION)
+    assert not reloaded.library.hashes
+
+
+def test_lines_shared_by_different_postings_are_learned_but_requirements_are_not(tmp_path):
+    compactor = make_compactor(tmp_path)
+    shared = "Acme Robotics builds warehouse automation.\nYou will design and maintain our order routing services.\n"
+    for role in ('Backend Engineer', 'Data Engineer', 'Platform Engineer'):
+        compactor.compact(f"{role}\n{shared}Requirements:\n- Experience with {role.split()[0]}\n")
+
+    text = compactor.compact(f"Site Reliability Engineer\n{shared}")['text']
+    assert 'Acme Robotics builds' not in text
+    assert 'You will design and maintain' in text
+
+
+def test_boilerplate_phrases_do_not_drop_requirements(tmp_path):
+    compactor = make_compactor(tmp_path)
+    requirements = [
+        "- Experience with pay transparency reporting systems and salary range analytics",
+        "- 5+ years building privacy policy enforcement in Python",
+        "- Familiarity with background check and E-Verify integrations",
+        "- Experience designing parental leave and 401(k) administration tools",
+    ]
+    posting = "Compensation Systems Engineer\nRequirements:\n" + "\n".join(requirements) + \
+        "\nBenefits:\nWe offer a salary range of $150k-$180k and paid time off.\n"
+    text = compactor.compact(posting)['text']
+    assert all(line in text for line in requirements)
+    assert 'paid time off' not in text
+
+
+def test_job_titles_are_not_boilerplate_headings(tmp_path):
+    compactor = make_compactor(tmp_path)
+    for title in ('Privacy Engineer', 'Compensation Analyst', 'Legal Counsel'):
+        text = compactor.compact(f"{title}\nYou will review contracts and data flows.\n"
+                                 "We are an equal opportunity employer.\n")['text']
+        assert text == f"{title}\nYou will review contracts and data flows."
+    text = compactor.compact("Senior Engineer\nPrivacy Notice:\nWe process applicant data under GDPR.\n")['text']
+    assert 'GDPR' not in text
@@ -0,0 +1,13 @@
+from keyword_extractor import KeywordExtractor
+
+
+def test_ordinary_words_are_not_read_as_skills():
+    keywords = KeywordExtractor().extract("We are a Series C startup running node pools and shipping containers.")
+    assert not {'C', 'Node.js', 'Docker', 'Security'} & set(keywords)
+
+
+def test_ambiguous_skills_match_in_context():
+    keywords = KeywordExtractor().extract(
+        "Strong C/C++ skills, Node.js services in Docker containers and application security reviews."
+    )
+    assert {'C', 'C++', 'Node.js', 'Docker', 'Security'} <= set(keywords)
@@ -0,0 +1,17 @@
+from llm_cache import LLMResponseCache
+
+MESSAGES = [{'role': 'user', 'content': 'Reshape this entry.'}]
+
+
+def test_response_format_is_part_of_the_key_only_when_set():
+    plain = LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500)
+    assert LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500, response_format=None) == plain
+    json_object = LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500, response_format={'type': 'json_object'})
+    json_schema = LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500, response_format={'type': 'json_schema'})
+    assert len({plain, json_object, json_schema}) == 3
+
+
+def test_free_form_response_is_not_served_to_a_structured_request(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set(LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500), 'Here is the entry: {...}')
+    assert cache.get(LLMResponseCache.make_key('gpt-4', MESSAGES, 0.7, 500, response_format={'type': 'json_object'})) is None
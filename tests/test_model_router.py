@@ -0,0 +1,29 @@
+from model_router import DEFAULT_ROUTES, is_model_failure
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def test_only_server_timeout_and_connection_errors_are_model_failures():
+    assert is_model_failure(StatusError(500))
+    assert is_model_failure(StatusError(503))
+    assert is_model_failure(APITimeoutError())
+    assert is_model_failure(APIConnectionError())
+    for status_code in (400, 401, 404, 429):
+        assert not is_model_failure(StatusError(status_code))
+    assert not is_model_failure(ValueError("bad JSON"))
+
+
+def test_keyword_extraction_keeps_gpt_4_first():
+    assert DEFAULT_ROUTES['keywords']['models'][0] == 'gpt-4'
@@ -0,0 +1,68 @@
+import sqlite3
+import pytest
+from benchmark import generate_resume
+from posting_index import PostingIndex, resume_hash, settings_hash
+from resume_parser import LatexResumeParser
+from resume_reshaper import ResumeReshaper
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Acme Robotics is hiring a backend engineer to design and maintain our order routing services.
+Requirements:
+- 5+ years of experience with Python and PostgreSQL
+- Experience with AWS, Docker and Kubernetes
+"""
+RESULT = ([{'job_title': 'Developer', 'bullet_points': ['Used Python']}], {'Languages': ['Python']}, [{'institution': 'MIT'}])
+
+
+@pytest.fixture
+def parser(tmp_path):
+    path = tmp_path / 'resume.tex'
+    path.write_text(generate_resume(2, seed=2), encoding='utf-8')
+    return LatexResumeParser(str(path))
+
+
+def test_query_only_matches_the_same_settings(tmp_path):
+    index = PostingIndex(str(tmp_path / 'index.sqlite3'))
+    index.add('resume', JOB_DESCRIPTION, ['Python'], ['python'], *RESULT, settings=settings_hash({'variants': 1}))
+
+    assert index.query('resume', JOB_DESCRIPTION, settings=settings_hash({'variants': 3})) is None
+    assert index.query('resume', JOB_DESCRIPTION, settings=settings_hash({'variants': 1}))['similarity'] == 1.0
+    assert index.query('resume', JOB_DESCRIPTION) is not None
+
+
+def test_index_without_settings_column_is_migrated(tmp_path):
+    path = str(tmp_path / 'index.sqlite3')
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE postings (id INTEGER PRIMARY KEY, resume_hash TEXT NOT NULL, parameters TEXT NOT NULL, "
+                       "label TEXT, signature BLOB NOT NULL, keywords TEXT NOT NULL, local_keywords TEXT NOT NULL, "
+                       "result TEXT NOT NULL, created_at REAL NOT NULL)")
+    connection.commit()
+    connection.close()
+
+    index = PostingIndex(path)
+    index.add('resume', JOB_DESCRIPTION, ['Python'], ['python'], *RESULT, settings='abc')
+    assert index.query('resume', JOB_DESCRIPTION, settings='abc') is not None
+
+
+def test_results_with_failed_sections_are_not_indexed(parser, tmp_path):
+    index = PostingIndex(str(tmp_path / 'index.sqlite3'))
+
+    def reshaper(**options):
+        reshaper = ResumeReshaper(client=None, parser=parser, job_description=JOB_DESCRIPTION,
+                                  keyword_strategy='local', posting_index=index, **options)
+        reshaper.keywords = ['Python']
+        return reshaper
+
+    experience, technical_skills, education = RESULT
+    reshaper().record_posting([{}], technical_skills, education)
+    reshaper().record_posting(experience, {}, education)
+    failed = reshaper()
+    failed.failed_requests = 1
+    failed.record_posting(experience, technical_skills, education)
+    assert index.stats()['postings'] == 0
+
+    reshaper().record_posting(experience, technical_skills, education)
+    assert index.stats()['postings'] == 1
+    assert reshaper().lookup_similar_posting() is not None
+    assert reshaper(variants=3).lookup_similar_posting() is None
+    assert index.query(resume_hash(parser), JOB_DESCRIPTION) is not None
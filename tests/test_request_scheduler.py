@@ -0,0 +1,83 @@
+import asyncio
+from request_scheduler import RequestScheduler, PRIORITY_HIGH
+
+
+def recorded_call(order, name):
+    async def call():
+        order.append(name)
+        return name
+    return call
+
+
+async def drained_scheduler():
+    # 6000 tokens per minute refill at 100 per second; one full-bucket request empties the bucket
+    scheduler = RequestScheduler(requests_per_minute=100000, tokens_per_minute=6000)
+    await scheduler.run_async(recorded_call([], 'drain'), 6000)
+    return scheduler
+
+
+def test_cancelled_waiter_does_not_block_the_queue():
+    async def scenario():
+        scheduler = await drained_scheduler()
+        order = []
+        # The head of the queue needs a full bucket (a minute); the request behind it only a tenth of a second
+        large = asyncio.ensure_future(scheduler.run_async(recorded_call(order, 'large'), 6000))
+        await asyncio.sleep(0.02)
+        small = asyncio.ensure_future(scheduler.run_async(recorded_call(order, 'small'), 10))
+        await asyncio.sleep(0.02)
+        assert scheduler.stats()['queued'] == 2
+
+        large.cancel()
+        await asyncio.gather(large, return_exceptions=True)
+        assert await asyncio.wait_for(small, timeout=2) == 'small'
+        assert order == ['small']
+        assert scheduler.stats()['queued'] == 0
+        assert scheduler.stats()['in_flight'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_high_priority_request_goes_ahead_of_queued_ones():
+    async def scenario():
+        scheduler = await drained_scheduler()
+        order = []
+        normal = asyncio.ensure_future(scheduler.run_async(recorded_call(order, 'normal'), 10))
+        await asyncio.sleep(0)
+        high = asyncio.ensure_future(scheduler.run_async(recorded_call(order, 'high'), 10, PRIORITY_HIGH))
+        await asyncio.wait_for(asyncio.gather(normal, high), timeout=2)
+        assert order == ['high', 'normal']
+        assert scheduler.stats()['completed'] == 3
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_call_releases_in_flight():
+    async def scenario():
+        scheduler = RequestScheduler()
+        started = asyncio.Event()
+
+        async def call():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(scheduler.run_async(call, 1))
+        await started.wait()
+        assert scheduler.stats()['in_flight'] == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler.stats()['in_flight'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_interrupted_sync_call_releases_in_flight():
+    scheduler = RequestScheduler()
+
+    def call():
+        raise KeyboardInterrupt
+
+    try:
+        scheduler.run(call, 1)
+    except KeyboardInterrupt:
+        pass
+    assert scheduler.stats()['in_flight'] == 0
@@ -0,0 +1,74 @@
+from resume_parser import LatexResumeParser
+
+RESUME = r"""\documentclass{article}
+% \section{Commented Out}
+\begin{document}
+\section{Education}
+  \resumeSubHeadingListStart
+    \resumeSubheading
+      {State University}{Aug. 2014 -- May 2018}
+      {B.S. in Computer Science \& Mathematics}{Austin, TX}
+  \resumeSubHeadingListEnd
+\section{Experience}
+  \resumeSubHeadingListStart
+    % \resumeSubheading{Old Job}{2010}{Old Co}{Nowhere}
+    \resumeSubheading
+      {Senior Engineer}{Jan. 2020 -- Present}
+      {Acme {\em Labs}}{Remote}
+      \resumeItemListStart
+        \resumeItem{Cut latency by 40\% with \textbf{Redis {cluster}} caching} % trailing } comment {
+        \resumeItem{Wrote parsers for \{JSON\} and \} characters}
+      \resumeItemListEnd
+  \resumeSubHeadingListEnd
+\section{Technical Skills}
+ \begin{itemize}[leftmargin=0.15in, label={}]
+    \small{\item{
+     \textbf{Languages}{: Python, C\#, SQL} \\
+     \textbf{Tools}{: Docker, {\LaTeX}} \\
+    }}
+ \end{itemize}
+\end{document}
+"""
+
+
+def parse(tmp_path, content=RESUME):
+    path = tmp_path / 'resume.tex'
+    path.write_text(content, encoding='utf-8')
+    return LatexResumeParser(str(path))
+
+
+def test_nested_braces_escapes_and_comments(tmp_path):
+    parser = parse(tmp_path)
+
+    assert [section.title for section in parser.document.sections] == ['Education', 'Experience', 'Technical Skills']
+    assert parser.experience == [{
+        'job_title': 'Senior Engineer',
+        'company': 'Acme {\\em Labs}',
+        'location': 'Remote',
+        'dates': 'Jan. 2020 -- Present',
+        'bullet_points': [
+            'Cut latency by 40\\% with \\textbf{Redis {cluster}} caching',
+            'Wrote parsers for \\{JSON\\} and \\} characters',
+        ],
+    }]
+    assert parser.education == [{
+        'institution': 'State University',
+        'major': 'B.S. in Computer Science \\& Mathematics',
+        'dates': 'Aug. 2014 -- May 2018',
+        'location': 'Austin, TX',
+    }]
+    assert parser.technical_skills == {'Languages': ['Python', 'C\\#', 'SQL'], 'Tools': ['Docker', '{\\LaTeX}']}
+
+
+def test_spans_point_into_the_original_content(tmp_path):
+    parser = parse(tmp_path)
+
+    for section in parser.document.sections:
+        assert parser.content[section.heading_start:].startswith('\\section{' + section.title + '}')
+        for command in section.commands:
+            assert parser.content[command.start:].startswith('\\' + command.name)
+            for argument in command.args:
+                assert parser.content[argument.start:argument.end] == argument.text
+    assert parser.content[parser.markers['experience_end']:].startswith('\\section{Technical Skills}')
+    assert parser.content[:parser.markers['education_start']].endswith('\\section{Education}')
+
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from benchmark import generate_resume
+from resume_parser import LatexResumeParser
+from resume_repackager import LatexResumeRepackager
+
+
+@pytest.fixture
+def parser(tmp_path):
+    path = tmp_path / 'resume.tex'
+    path.write_text(generate_resume(3, seed=3), encoding='utf-8')
+    return LatexResumeParser(str(path))
+
+
+def test_failed_stream_keeps_the_earlier_output(parser, tmp_path):
+    output_path = tmp_path / 'tailored.tex'
+    output_path.write_text('earlier output', encoding='utf-8')
+
+    async def failing_stream():
+        yield 0, dict(parser.experience[0], raw_latex=True)
+        raise RuntimeError("API error")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(LatexResumeRepackager(parser).save_to_file_streaming(str(output_path), failing_stream()))
+    assert output_path.read_text(encoding='utf-8') == 'earlier output'
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['resume.tex', 'tailored.tex']
+
+
+def test_streamed_document_matches_render(parser, tmp_path):
+    output_path = tmp_path / 'tailored.tex'
+    experience = [dict(entry, raw_latex=True) for entry in parser.experience]
+
+    async def stream():
+        for index, entry in enumerate(experience):
+            yield index, entry
+
+    repackager = LatexResumeRepackager(parser)
+    assert asyncio.run(repackager.save_to_file_streaming(str(output_path), stream())) == experience
+    assert output_path.read_text(encoding='utf-8') == repackager.render()
+
+
+NEW_EXPERIENCE = [{'job_title': 'Staff Engineer', 'company': 'Initech', 'location': 'Remote', 'dates': '2021 -- 2024',
+                   'bullet_points': ['Cut p95 latency by 30% with Redis', 'Moved CI to GitHub Actions']}]
+NEW_EDUCATION = [{'institution': 'Tech Institute', 'major': 'M.S. Computer Science', 'dates': '2019 -- 2021'}]
+NEW_SKILLS = {'Languages': ['Python', 'C#'], 'Cloud': ['AWS', 'Kubernetes']}
+
+
+def test_all_replacements_are_applied_in_one_render_whatever_their_order(parser):
+    content = parser.content
+    markers = dict(parser.markers)
+    replacements = {
+        'experience': lambda repackager: repackager.replace_experience(NEW_EXPERIENCE),
+        'education': lambda repackager: repackager.replace_education(NEW_EDUCATION),
+        'skills': lambda repackager: repackager.replace_technical_skills(NEW_SKILLS),
+    }
+    renders = []
+    for order in (('experience', 'education', 'skills'), ('skills', 'experience', 'education'), ('education', 'skills', 'experience')):
+        repackager = LatexResumeRepackager(parser)
+        for name in order:
+            replacements[name](repackager)
+        renders.append(repackager.render())
+    assert renders[0] == renders[1] == renders[2]
+    # The parser's content and offsets are never shifted by the edits
+    assert parser.markers == markers and parser.content == content
+
+    skills_start, skills_end = parser.template.technical_skills_span(parser.document.section('Technical Skills'))
+    edits = sorted([
+        (markers['education_start'], markers['education_end'], repackager._generate_education_content(NEW_EDUCATION)),
+        (markers['experience_start'], markers['experience_end'], repackager._generate_experience_content(NEW_EXPERIENCE)),
+        (skills_start, skills_end, repackager._generate_technical_skills_content(NEW_SKILLS)),
+    ])
+    expected, cursor = '', 0
+    for start, end, new_content in edits:
+        expected += content[cursor:start] + new_content
+        cursor = end
+    assert renders[0] == expected + content[cursor:]
+    assert 'Cut p95 latency by 30\\% with Redis' in renders[0] and 'C\\#' in renders[0]
+
+
+def test_adjacent_sections_are_replaced_without_touching_the_headings_between_them(parser):
+    education_start, education_end = parser.markers['education_start'], parser.markers['education_end']
+    experience_start, experience_end = parser.markers['experience_start'], parser.markers['experience_end']
+    # The edits meet at the \section{Experience} heading: the education body ends where it starts
+    assert parser.content[education_end:experience_start] == '\\section{Experience}'
+
+    repackager = LatexResumeRepackager(parser)
+    repackager.replace_education(NEW_EDUCATION)
+    repackager.replace_experience(NEW_EXPERIENCE)
+    rendered = repackager.render()
+
+    education = repackager._generate_education_content(NEW_EDUCATION)
+    experience = repackager._generate_experience_content(NEW_EXPERIENCE)
+    assert rendered == (parser.content[:education_start] + education + '\\section{Experience}' + experience
+                        + parser.content[experience_end:])
+
+    # Replacing a section again overrides its earlier edit instead of stacking on the original
+    repackager.replace_experience([dict(NEW_EXPERIENCE[0], job_title='Principal Engineer')])
+    assert 'Principal Engineer' in repackager.render() and 'Staff Engineer' not in repackager.render()
@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from benchmark import generate_resume
+from fake_openai_server import AsyncFakeChatClient, FakeChatClient
+from main import tailor_streaming
+from resume_parser import LatexResumeParser
+from resume_repackager import LatexResumeRepackager
+from resume_reshaper import ResumeReshaper
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Requirements:
+- 5+ years of experience with Python and PostgreSQL
+- Experience with AWS and Kubernetes
+"""
+
+
+@pytest.fixture
+def parser(tmp_path):
+    path = tmp_path / 'resume.tex'
+    path.write_text(generate_resume(4, seed=4), encoding='utf-8')
+    return LatexResumeParser(str(path))
+
+
+def test_failed_skills_stop_the_experience_stream(parser, tmp_path):
+    reshaper = ResumeReshaper(client=None, parser=parser, job_description=JOB_DESCRIPTION,
+                              async_client=AsyncFakeChatClient(latency=0.2), keyword_strategy='local')
+    streams = []
+    start_stream = reshaper.stream_experience_async
+
+    def stream_experience_async(on_bullet=None):
+        streams.append(start_stream(on_bullet=on_bullet))
+        return streams[-1]
+
+    async def fail():
+        raise RuntimeError("skills request failed")
+
+    reshaper.stream_experience_async = stream_experience_async
+    reshaper.reshape_technical_skills_async = fail
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await tailor_streaming(reshaper, LatexResumeRepackager(parser), str(tmp_path / 'out.tex'))
+        return [task.done() for task in streams[0].tasks]
+
+    assert all(asyncio.run(run()))
+
+
+def test_kept_entries_without_bullet_points_pass_variant_ranking(tmp_path):
+    path = tmp_path / 'resume.tex'
+    path.write_text(generate_resume(2, min_bullets=0, max_bullets=0, seed=2), encoding='utf-8')
+    parser = LatexResumeParser(str(path))
+    reshaper = ResumeReshaper(client=FakeChatClient(), parser=parser, job_description=JOB_DESCRIPTION,
+                              coverage_threshold=0.0, variants=2)
+    reshaper.keywords = ['Python']
+
+    experience = reshaper.reshape_experience()
+    assert [entry['job_title'] for entry in experience] == [entry['job_title'] for entry in parser.experience]
+    assert all(entry['bullet_points'] == [] for entry in experience)
+    assert reshaper.client.calls == 0
+
+
+class InvalidChatClient:
+    """Answers every request with text that never validates, so every re-ask fails too."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(model=model, usage=None, choices=[
+            SimpleNamespace(index=0, message=SimpleNamespace(role='assistant', content="Sorry, I can't help with that."))
+        ])
+
+
+def test_sections_fall_back_to_the_original_after_the_last_reask(parser, tmp_path):
+    client = InvalidChatClient()
+    reshaper = ResumeReshaper(client=client, parser=parser, job_description=JOB_DESCRIPTION, max_reasks=1)
+    reshaper.keywords = ['Python']
+
+    experience = reshaper.reshape_experience()
+    education = reshaper.reshape_education()
+    technical_skills = reshaper.reshape_technical_skills()
+    sections = len(parser.experience) + len(parser.education) + 1
+    assert client.calls == 2 * sections
+    assert reshaper.failed_requests == sections
+    assert [entry['job_title'] for entry in experience] == [entry['job_title'] for entry in parser.experience]
+    assert all(entry['raw_latex'] for entry in experience + education)
+    assert technical_skills == parser.technical_skills
+
+    repackager = LatexResumeRepackager(parser)
+    repackager.replace_experience(experience)
+    repackager.replace_education(education)
+    repackager.replace_technical_skills(technical_skills)
+    content = repackager.render()
+    assert '{}{}' not in content
+    for entry in parser.experience:
+        assert entry['job_title'] in content and entry['bullet_points'][0] in content
+    assert all(entry['institution'] in content for entry in parser.education)
+    assert 'Python, Java, SQL, Go' in content
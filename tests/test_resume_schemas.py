@@ -0,0 +1,28 @@
+from resume_schemas import EducationEntry, ExperienceEntry, ResumeResponse, TechnicalSkillsResponse, response_format_for
+
+
+def test_entry_schemas_are_sent_in_strict_mode():
+    response_format = response_format_for(ExperienceEntry, 'json_schema')['json_schema']
+    schema = response_format['schema']
+    assert response_format['strict'] is True
+    assert schema['additionalProperties'] is False
+    assert schema['required'] == ['job_title', 'company', 'location', 'dates', 'bullet_points']
+    assert 'default' not in schema['properties']['location']
+    assert response_format_for(EducationEntry, 'json_schema')['json_schema']['strict'] is True
+
+
+def test_whole_resume_schema_constrains_its_entries():
+    response_format = response_format_for(ResumeResponse, 'json_schema')['json_schema']
+    schema = response_format['schema']
+    assert response_format['name'] == 'ResumeResponse'
+    assert schema['properties']['experience']['items'] == {'$ref': '#/$defs/ExperienceEntry'}
+    assert schema['properties']['education']['items'] == {'$ref': '#/$defs/EducationEntry'}
+    assert schema['$defs']['ExperienceEntry']['required'][:2] == ['job_title', 'company']
+    # The skills are a free-form map, which strict mode cannot express
+    assert 'strict' not in response_format
+    assert 'strict' not in response_format_for(TechnicalSkillsResponse, 'json_schema')['json_schema']
+
+
+def test_parsing_still_accepts_raw_entries():
+    parsed = ResumeResponse.model_validate({'experience': [{'job_title': 'Developer'}], 'education': []})
+    assert parsed.experience == [{'job_title': 'Developer'}]
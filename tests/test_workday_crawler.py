@@ -0,0 +1,48 @@
+import pytest
+import requests
+from fake_workday_server import FakeWorkdayServer
+from workday_crawler import PostingStore, WorkdayCrawler
+
+
+@pytest.fixture
+def server():
+    with FakeWorkdayServer() as server:
+        yield server
+
+
+def crawl(server, store, **options):
+    crawler = WorkdayCrawler(server.board_url, store=store, workers=2, session=requests.Session(),
+                             api_base_url=server.base_url, retries=1, **options)
+    return crawler.crawl()
+
+
+def test_recrawl_fetches_only_changed_postings(server, tmp_path):
+    store = PostingStore(str(tmp_path / 'postings.sqlite3'))
+    first = crawl(server, store)
+    assert (first['listed'], first['new'], first['removed']) == (3, 3, 0)
+
+    server.postings[1]['listing'] = dict(server.postings[1]['listing'], locationsText='Remote')
+    second = crawl(server, store)
+    assert (second['changed'] + second['unchanged'], second['skipped']) == (1, 2)
+
+
+def test_search_crawl_does_not_remove_unmatched_postings(server, tmp_path):
+    store = PostingStore(str(tmp_path / 'postings.sqlite3'))
+    crawl(server, store)
+
+    summary = crawl(server, store, search_text='Software Engineer')
+    assert summary['listed'] == 2
+    assert summary['removed'] == 0
+    assert len(store.pending()) == 3
+
+
+def test_full_crawl_records_removed_postings(server, tmp_path):
+    store = PostingStore(str(tmp_path / 'postings.sqlite3'))
+    crawl(server, store)
+
+    del server.postings[2]
+    summary = crawl(server, store)
+    assert summary['removed'] == 1
+    assert {job_id for job_id, _ in store.pending()} == {
+        'pixar/Pixar_External_Career_Site:R-03785', 'pixar/Pixar_External_Career_Site:R-03811',
+    }
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import requests
+from fake_workday_server import FakeWorkdayServer
+from workday_scraper import WorkdayBrowserPool, WorkdayScraper, scrape_job_descriptions
+
+
+@pytest.fixture
+def server():
+    with FakeWorkdayServer() as server:
+        yield server
+
+
+def test_fetch_posting_reads_the_recorded_description(server):
+    scraper = WorkdayScraper(server.posting_url(0), fetch_mode='http', session=requests.Session(),
+                             api_base_url=server.base_url)
+    description = scraper.fetch_posting()
+    assert description.startswith('The Role')
+    assert '- Design and maintain GPU profiling tools in C++ and Python' in description
+    assert scraper.job_posting['jobReqId'] == 'R-03785'
+    assert server.stats()['detail_requests'] == 1
+
+
+def test_details_urls_map_to_the_same_endpoint(server):
+    url = server.posting_url(1).replace('/job/', '/details/', 1)
+    scraper = WorkdayScraper(url, fetch_mode='http', session=requests.Session(), api_base_url=server.base_url)
+    assert 'Automate asset publishing with USD' in scraper.fetch_posting()
+
+
+def test_unknown_posting_raises(server):
+    url = f"{server.board_url}/job/Nowhere/Gone_R-00000"
+    scraper = WorkdayScraper(url, fetch_mode='http', session=requests.Session(), api_base_url=server.base_url)
+    with pytest.raises(requests.HTTPError):
+        scraper.fetch_posting()
+
+
+def test_scrape_job_descriptions_keeps_stdout_clean(server, capsys):
+    urls = [server.posting_url(0), f"{server.board_url}/job/Nowhere/Gone_R-00000", server.posting_url(2)]
+    descriptions = scrape_job_descriptions(urls, fetch_mode='http', api_base_url=server.base_url)
+    assert descriptions[1] is None
+    assert 'RenderMan' in descriptions[2]
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'Gone_R-00000' in captured.err
+
+
+class CrashingDriver:
+    def __init__(self):
+        self.quits = 0
+
+    def get(self, url):
+        raise RuntimeError("browser crashed")
+
+    def quit(self):
+        self.quits += 1
+
+
+def test_browser_pool_shrinks_when_a_replacement_cannot_launch(server):
+    launched = []
+
+    def driver_factory():
+        if len(launched) == 2:
+            raise RuntimeError("geckodriver not found")
+        launched.append(CrashingDriver())
+        return launched[-1]
+
+    pool = WorkdayBrowserPool(size=2, driver_factory=driver_factory)
+    urls = [server.posting_url(0)] * 4
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # A dead browser put back on the queue would be reused, and an empty pool would block forever
+        assert executor.submit(pool.scrape_many, urls).result(timeout=10) == [None] * 4
+    assert [driver.quits for driver in launched] == [1, 1]
+    assert pool._all_drivers == []
+    pool.close()
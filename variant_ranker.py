@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import argparse
+from rapidfuzz import fuzz, process
+from ats_scorer import ATSScorer
+from latex_templates import TEMPLATES
+
+
+class VariantRanker:
+    """
+    Validate and rank candidate rewrites of an experience entry without another LLM request.
+
+    A candidate is valid when it keeps the job title and has exactly the requested number of bullet
+    points, none of them empty or longer than `max_length_ratio` times the requested length. Candidates
+    are scored by keyword coverage (ATSScorer), by how close their bullet points are to the requested
+    length, and by how few of their bullet points repeat one already used by another entry. Valid
+    candidates always rank above invalid ones.
+    """
+
+    def __init__(self, keywords, coverage_weight=1.0, length_weight=0.5, duplicate_weight=1.0,
+                 duplicate_threshold=85, max_length_ratio=2.0):
+        """
+        Params:
+        - keywords (list): The job description's keywords.
+        - coverage_weight, length_weight, duplicate_weight (float): Weights of keyword coverage, length
+          fit and the share of duplicated bullet points in a candidate's score.
+        - duplicate_threshold (int): rapidfuzz token set ratio (0-100) at which two bullet points count
+          as the same.
+        - max_length_ratio (float): Longest valid bullet point, as a multiple of the requested length.
+        """
+        self.scorer = ATSScorer(keywords)
+        self.coverage_weight = coverage_weight
+        self.length_weight = length_weight
+        self.duplicate_weight = duplicate_weight
+        self.duplicate_threshold = duplicate_threshold
+        self.max_length_ratio = max_length_ratio
+
+    def problems(self, candidate, original, bullet_point_count, target_length):
+        """Return the ways `candidate` breaks the constraints of the rewrite prompt (empty when it is valid)."""
+        problems = []
+        bullet_points = candidate.get('bullet_points') or []
+        if len(bullet_points) != bullet_point_count:
+            problems.append(f"{len(bullet_points)} bullet points instead of {bullet_point_count}")
+        if any(not bullet.strip() for bullet in bullet_points):
+            problems.append("empty bullet point")
+        if target_length and any(len(bullet) > target_length * self.max_length_ratio for bullet in bullet_points):
+            problems.append(f"bullet point over {int(target_length * self.max_length_ratio)} characters")
+        if candidate.get('job_title', '').strip().lower() != original.get('job_title', '').strip().lower():
+            problems.append("job title changed")
+        return problems
+
+    def length_fit(self, candidate, target_length):
+        """1.0 when every bullet point has the requested length, falling linearly to 0 at twice (or none of) it."""
+        bullet_points = candidate.get('bullet_points') or []
+        if not bullet_points:
+            return 0.0
+        if not target_length:
+            return 1.0
+        return sum(max(0.0, 1 - abs(len(bullet) - target_length) / target_length) for bullet in bullet_points) / len(bullet_points)
+
+    def duplicate_share(self, candidate, other_bullet_points):
+        """The share of the candidate's bullet points that repeat one of `other_bullet_points`."""
+        bullet_points = candidate.get('bullet_points') or []
+        if not bullet_points or not other_bullet_points:
+            return 0.0
+        duplicates = sum(
+            1 for bullet in bullet_points
+            if process.extractOne(bullet, other_bullet_points, scorer=fuzz.token_set_ratio,
+                                  score_cutoff=self.duplicate_threshold)
+        )
+        return duplicates / len(bullet_points)
+
+    def rank(self, candidates, original, bullet_point_count, target_length, other_bullet_points=()):
+        """
+        Score the candidate rewrites of `original` and sort them best first.
+
+        Params:
+        - candidates (list): Parsed experience entries.
+        - original (dict): The entry from LatexResumeParser.experience that was rewritten.
+        - bullet_point_count (int), target_length (int): The bullet count and length the prompt asked for.
+        - other_bullet_points (list): Bullet points of the resume's other entries.
+
+        Returns:
+        - list: dicts with the entry, score, coverage, length_fit, duplicates and problems.
+        """
+        other_bullet_points = list(other_bullet_points)
+        ranked = []
+        for candidate in candidates:
+            coverage = self.scorer.score_entry(candidate)['coverage']
+            length_fit = self.length_fit(candidate, target_length)
+            duplicates = self.duplicate_share(candidate, other_bullet_points)
+            ranked.append({
+                'entry': candidate,
+                'score': round(self.coverage_weight * coverage + self.length_weight * length_fit
+                               - self.duplicate_weight * duplicates, 4),
+                'coverage': coverage,
+                'length_fit': round(length_fit, 4),
+                'duplicates': duplicates,
+                'problems': self.problems(candidate, original, bullet_point_count, target_length),
+            })
+        ranked.sort(key=lambda variant: (not variant['problems'], variant['score']), reverse=True)
+        return ranked
+
+
+def variants_path(output_path):
+    """Where the variants of the tailored resume at `output_path` are saved: resume.tex -> resume.variants.json."""
+    return os.path.splitext(output_path)[0] + '.variants.json'
+
+
+def save_variants(path, experience_variants, technical_skills, education):
+    """Write the ranked experience variants, with the other tailored sections, for rendering later."""
+    with open(path, 'w') as file:
+        json.dump({
+            'experience_variants': experience_variants,
+            'technical_skills': technical_skills,
+            'education': education,
+        }, file, indent=2)
+
+
+def load_variants(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def select_variants(variants, picks=None):
+    """
+    The tailored experience with the variant picked for each entry.
+
+    Params:
+    - variants (dict): As written by save_variants().
+    - picks (dict): Entry number -> variant rank, both counted from 1. Other entries keep their top variant.
+
+    Returns:
+    - list: The experience entries.
+    """
+    picks = picks or {}
+    experience = []
+    for number, ranked in enumerate(variants['experience_variants'], 1):
+        rank = picks.get(number, 1)
+        if not 1 <= rank <= len(ranked):
+            raise ValueError(f"Entry {number} has {len(ranked)} variant(s), not {rank}.")
+        experience.append(ranked[rank - 1]['entry'])
+    return experience
+
+
+def render_variants(parser, variants, picks=None):
+    """Render the resume with the picked variants through LatexResumeRepackager and return the LaTeX."""
+    from resume_repackager import LatexResumeRepackager
+
+    repackager = LatexResumeRepackager(parser)
+    repackager.replace_experience(select_variants(variants, picks))
+    repackager.replace_technical_skills(variants['technical_skills'])
+    repackager.replace_education(variants['education'])
+    content = repackager.render()
+    if not content.strip().endswith("\\end{document}"):
+        content += "\n\\end{document}"
+    return content
+
+
+def parse_picks(values):
+    """Parse ENTRY=RANK strings (e.g. '2=3') into a dict."""
+    picks = {}
+    for value in values or []:
+        entry, separator, rank = value.partition('=')
+        if not separator or not entry.isdigit() or not rank.isdigit():
+            raise ValueError(f"Expected ENTRY=RANK, e.g. 2=3, not '{value}'.")
+        picks[int(entry)] = int(rank)
+    return picks
+
+
+def format_variants(variants):
+    lines = []
+    for number, ranked in enumerate(variants['experience_variants'], 1):
+        first = ranked[0]['entry']
+        lines.append(f"Entry {number}: {first.get('job_title', '')} @ {first.get('company', '')}")
+        for rank, variant in enumerate(ranked, 1):
+            status = '; '.join(variant['problems']) or 'valid'
+            lines.append(f"  {rank}. score {variant['score']:.2f}  coverage {variant['coverage']:>4.0%}  "
+                         f"length fit {variant['length_fit']:.2f}  duplicates {variant['duplicates']:>4.0%}  ({status})")
+            bullet_points = variant['entry'].get('bullet_points') or ['']
+            lines.append(f"     {bullet_points[0]}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="List or render the experience variants of a tailored resume.")
+    arg_parser.add_argument('resume', help="Path to the original LaTeX resume (.tex file)")
+    arg_parser.add_argument('variants', help="The .variants.json file written next to the tailored resume")
+    arg_parser.add_argument('--pick', action='append', metavar='ENTRY=RANK',
+                            help="Use variant RANK for experience entry ENTRY, both counted from 1 (repeatable)")
+    arg_parser.add_argument('-o', '--output', default=None, help="Render the resume with the picked variants to this file")
+    arg_parser.add_argument('--template', choices=sorted(TEMPLATES), default='resume', help="LaTeX layout of the resume")
+    args = arg_parser.parse_args(argv)
+
+    from resume_parser import LatexResumeParser
+
+    variants = load_variants(args.variants)
+    if not args.output:
+        print(format_variants(variants))
+        return 0
+    try:
+        content = render_variants(LatexResumeParser.load(args.resume, template=args.template), variants, parse_picks(args.pick))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    with open(args.output, 'w') as file:
+        file.write(content)
+    print(f"Resume with the picked variants saved as {args.output}")
+    return 0
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from workday_scraper import WORKDAY_HOST_PATTERN, WorkdayScraper, get_shared_session
+
+DEFAULT_POSTING_STORE_PATH = os.path.join('.resume_tailor_cache', 'postings.sqlite3')
+
+# The job-board endpoint returns at most 20 postings per page
+LISTING_PAGE_SIZE = 20
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class PostingStore:
+    """
+    Local SQLite store of job postings, keyed by board and requisition id.
+
+    Alongside the description, each posting keeps a hash of its listing entry (title, path, location)
+    and of its description, when its details were last fetched and changed, whether it has left the
+    board, and when it was last tailored, so a refresh only downloads what is new or changed and
+    pending() hands tailoring only the postings it has not seen in their current form.
+    """
+
+    def __init__(self, path=DEFAULT_POSTING_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS postings (
+                board TEXT NOT NULL,
+                requisition_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                location TEXT,
+                listing_hash TEXT NOT NULL,
+                content_hash TEXT,
+                job_description TEXT,
+                first_seen REAL NOT NULL,
+                checked_at REAL,
+                updated_at REAL,
+                removed_at REAL,
+                tailored_at REAL,
+                PRIMARY KEY (board, requisition_id)
+            )"""
+        )
+        self._connection.commit()
+
+    def known(self, board):
+        """Return {requisition_id: (listing_hash, checked_at, removed_at)} for the postings of `board`."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT requisition_id, listing_hash, checked_at, removed_at FROM postings WHERE board = ?", (board,)
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def save_posting(self, board, requisition_id, url, title, location, listing_hash, job_description, now=None,
+                     commit=True):
+        """
+        Insert or update a posting whose details were just fetched. With commit=False the write is
+        left for a later commit(), so a crawl does not pay for a disk sync per posting.
+
+        Returns:
+        - str: 'new', 'changed' (the description differs from the stored one) or 'unchanged'.
+        """
+        now = now or time.time()
+        digest = content_hash(job_description)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash FROM postings WHERE board = ? AND requisition_id = ?", (board, requisition_id)
+            ).fetchone()
+            if row is None:
+                self._connection.execute(
+                    "INSERT INTO postings (board, requisition_id, url, title, location, listing_hash, content_hash, "
+                    "job_description, first_seen, checked_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (board, requisition_id, url, title, location, listing_hash, digest, job_description, now, now, now),
+                )
+                status = 'new'
+            else:
+                status = 'unchanged' if row[0] == digest else 'changed'
+                self._connection.execute(
+                    "UPDATE postings SET url = ?, title = ?, location = ?, listing_hash = ?, content_hash = ?, "
+                    "job_description = ?, checked_at = ?, removed_at = NULL"
+                    + (", updated_at = ?" if status == 'changed' else "")
+                    + " WHERE board = ? AND requisition_id = ?",
+                    (url, title, location, listing_hash, digest, job_description, now)
+                    + ((now,) if status == 'changed' else ()) + (board, requisition_id),
+                )
+            if commit:
+                self._connection.commit()
+        return status
+
+    def commit(self):
+        with self._lock:
+            self._connection.commit()
+
+    def mark_removed(self, board, requisition_ids, now=None):
+        """Record that postings are no longer listed on `board`. Returns how many were newly removed."""
+        now = now or time.time()
+        with self._lock:
+            cursor = self._connection.executemany(
+                "UPDATE postings SET removed_at = ? WHERE board = ? AND requisition_id = ? AND removed_at IS NULL",
+                [(now, board, requisition_id) for requisition_id in requisition_ids],
+            )
+            self._connection.commit()
+        return cursor.rowcount
+
+    def pending(self, board=None):
+        """
+        Postings still listed that were never tailored, or changed since they were.
+
+        Returns:
+        - list: (job_id, job_description) tuples, with job ids of the form '<board>:<requisition id>'.
+        """
+        query = ("SELECT board, requisition_id, job_description FROM postings WHERE removed_at IS NULL "
+                 "AND job_description IS NOT NULL AND (tailored_at IS NULL OR tailored_at < updated_at)")
+        parameters = ()
+        if board is not None:
+            query += " AND board = ?"
+            parameters = (board,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY first_seen, requisition_id", parameters).fetchall()
+        return [(f"{row[0]}:{row[1]}", row[2]) for row in rows]
+
+    def mark_tailored(self, job_ids, now=None):
+        """Record that the postings with these pending() job ids were tailored."""
+        now = now or time.time()
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE postings SET tailored_at = ? WHERE board = ? AND requisition_id = ?",
+                [(now,) + tuple(job_id.split(':', 1)) for job_id in job_ids],
+            )
+            self._connection.commit()
+
+    def stats(self, board=None):
+        where, parameters = ("WHERE board = ?", (board,)) if board is not None else ("", ())
+        with self._lock:
+            total, removed = self._connection.execute(
+                f"SELECT COUNT(*), COUNT(removed_at) FROM postings {where}", parameters
+            ).fetchone()
+        return {'postings': total, 'listed': total - removed, 'removed': removed, 'pending': len(self.pending(board))}
+
+    def close(self):
+        self._connection.close()
+
+
+def is_posting_store(path):
+    return path.endswith(('.sqlite3', '.sqlite', '.db')) and os.path.isfile(path)
+
+
+class WorkdayCrawler:
+    """
+    Crawl a company's Workday job board into a PostingStore.
+
+    The listing is read from the board's job-board endpoint (POST /wday/cxs/<tenant>/<site>/jobs):
+    the first page gives the total, and the remaining pages are fetched concurrently. Details are
+    then fetched, with the same bounded parallelism, only for postings that are new, whose listing
+    entry changed, that reappeared, or whose details are older than `recheck_seconds`. Postings that
+    left the board are marked as removed, which only a complete listing without a search can show.
+    """
+
+    def __init__(self, board_url, store=None, workers=8, session=None, api_base_url=None, timeout=15,
+                 recheck_seconds=None, full_refresh=False, search_text='', retries=3):
+        """
+        Params:
+        - board_url (str): The board root, e.g. https://<tenant>.wd5.myworkdayjobs.com/en-US/<site>.
+        - store (PostingStore): Where postings are kept. Defaults to the store in .resume_tailor_cache.
+        - workers (int): Requests in flight at the same time.
+        - session (requests.Session): HTTP session to use. Defaults to the shared keep-alive session.
+        - api_base_url (str): Overrides the scheme and host of the job-board endpoint (e.g. a local stand-in server).
+        - timeout (float): HTTP timeout in seconds.
+        - recheck_seconds (float): Re-fetch the details of unchanged listings older than this, to catch
+          description edits the listing does not show. None only fetches new or changed listings.
+        - full_refresh (bool): Re-fetch the details of every listed posting.
+        - search_text (str): Only crawl postings matching this search, as typed into the board.
+        - retries (int): Attempts per request on connection errors and 429/5xx responses.
+        """
+        if not re.search(WORKDAY_HOST_PATTERN, board_url):
+            raise ValueError(f"Invalid Workday URL: {board_url}")
+        self.board_url = board_url
+        self.tenant, self.site, self.board_root = self.parse_board_url(board_url)
+        self.board = f"{self.tenant}/{self.site}"
+        self.store = store if store is not None else PostingStore()
+        self.workers = workers
+        self.session = session or get_shared_session(pool_size=max(10, workers))
+        self.api_base_url = api_base_url
+        self.timeout = timeout
+        self.recheck_seconds = recheck_seconds
+        self.full_refresh = full_refresh
+        self.search_text = search_text
+        self.retries = retries
+
+    @staticmethod
+    def parse_board_url(board_url):
+        """
+        Split a board URL such as https://<tenant>.wd5.myworkdayjobs.com/en-US/<site>[/details/...] into
+        (tenant, site, board root), where the board root is the URL up to and including the site.
+        """
+        parts = urlsplit(board_url)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        prefix = []
+        # Keep the optional locale prefix (e.g. en-US) in the board root
+        if segments and re.fullmatch(r'[a-z]{2}(-[A-Z]{2})?', segments[0]):
+            prefix, segments = segments[:1], segments[1:]
+        if not segments:
+            raise ValueError(f"Workday board URL has no site: {board_url}")
+        site = segments[0]
+        board_root = f"{parts.scheme}://{parts.netloc}/{'/'.join(prefix + [site])}"
+        return parts.hostname.split('.')[0], site, board_root
+
+    def listing_url(self):
+        """The board's listing endpoint, https://<tenant>.wd5.myworkdayjobs.com/wday/cxs/<tenant>/<site>/jobs."""
+        parts = urlsplit(self.board_root)
+        base_url = self.api_base_url.rstrip('/') if self.api_base_url else f"{parts.scheme}://{parts.netloc}"
+        return f"{base_url}/wday/cxs/{self.tenant}/{self.site}/jobs"
+
+    def crawl(self):
+        """
+        Refresh the store from the board.
+
+        Returns:
+        - dict: board, listed, new, changed, unchanged, skipped (not re-fetched), removed and failed
+          posting counts, listing pages read, and elapsed seconds.
+        """
+        started = time.perf_counter()
+        summary = {'board': self.board, 'listed': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'skipped': 0,
+                   'removed': 0, 'failed': 0, 'pages': 0, 'elapsed_seconds': 0.0}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listing, complete, pages = self._read_listing(executor)
+            summary['listed'] = len(listing)
+            summary['pages'] = pages
+            known = self.store.known(self.board)
+            to_fetch = [entry for requisition_id, entry in listing.items() if self._needs_fetch(requisition_id, entry, known)]
+            summary['skipped'] = len(listing) - len(to_fetch)
+            print(f"{self.board}: {len(listing)} postings listed, fetching details of {len(to_fetch)}...")
+
+            futures = {executor.submit(self._fetch_details, entry): entry for entry in to_fetch}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    description = future.result()
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    print(f"Could not fetch {entry['url']}: {e}")
+                    summary['failed'] += 1
+                    continue
+                status = self.store.save_posting(
+                    self.board, entry['requisition_id'], entry['url'], entry['title'], entry['location'],
+                    entry['listing_hash'], description, commit=False,
+                )
+                summary[status] += 1
+                if (summary['new'] + summary['changed'] + summary['unchanged']) % 100 == 0:
+                    self.store.commit()
+            self.store.commit()
+
+        if complete and not self.search_text:
+            # Only a complete listing of the whole board proves a posting is gone; a search lists a subset
+            missing = [requisition_id for requisition_id, (_, _, removed_at) in known.items()
+                       if requisition_id not in listing and removed_at is None]
+            summary['removed'] = self.store.mark_removed(self.board, missing)
+        elif not complete:
+            print("The listing could not be read completely; removed postings are not recorded this run.")
+        summary['elapsed_seconds'] = time.perf_counter() - started
+        return summary
+
+    def _read_listing(self, executor):
+        """Return ({requisition_id: entry}, whether every page was read, pages read)."""
+        first_page = self._fetch_listing_page(0)
+        total = first_page.get('total') or 0
+        pages = [first_page]
+        complete = True
+        futures = [executor.submit(self._fetch_listing_page, offset) for offset in range(LISTING_PAGE_SIZE, total, LISTING_PAGE_SIZE)]
+        for future in futures:
+            try:
+                pages.append(future.result())
+            except (requests.RequestException, ValueError) as e:
+                print(f"Could not read a listing page of {self.board}: {e}")
+                complete = False
+
+        listing = {}
+        for page in pages:
+            for posting in page.get('jobPostings') or []:
+                entry = self._listing_entry(posting)
+                if entry is not None:
+                    listing[entry['requisition_id']] = entry
+        return listing, complete, len(pages)
+
+    def _fetch_listing_page(self, offset):
+        body = {'appliedFacets': {}, 'limit': LISTING_PAGE_SIZE, 'offset': offset, 'searchText': self.search_text}
+
+        def request():
+            response = self.session.post(self.listing_url(), json=body, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+        return self._with_retries(request)
+
+    def _listing_entry(self, posting):
+        """Normalise one listing entry. The requisition id is the first bullet field, or else the posting path."""
+        external_path = posting.get('externalPath')
+        if not external_path:
+            return None
+        bullet_fields = posting.get('bulletFields') or []
+        requisition_id = bullet_fields[0] if bullet_fields else external_path.rstrip('/').rsplit('/', 1)[-1]
+        # postedOn ("Posted 3 Days Ago") changes daily, so it is left out of the listing hash
+        listed = {key: posting.get(key) for key in ('title', 'externalPath', 'locationsText', 'bulletFields')}
+        return {
+            'requisition_id': requisition_id,
+            'url': f"{self.board_root}{external_path}",
+            'title': posting.get('title'),
+            'location': posting.get('locationsText'),
+            'listing_hash': content_hash(json.dumps(listed, sort_keys=True)),
+        }
+
+    def _needs_fetch(self, requisition_id, entry, known):
+        if self.full_refresh or requisition_id not in known:
+            return True
+        listing_hash, checked_at, removed_at = known[requisition_id]
+        if listing_hash != entry['listing_hash'] or removed_at is not None or checked_at is None:
+            return True
+        return self.recheck_seconds is not None and time.time() - checked_at > self.recheck_seconds
+
+    def _fetch_details(self, entry):
+        scraper = WorkdayScraper(entry['url'], fetch_mode='http', session=self.session,
+                                 api_base_url=self.api_base_url, timeout=self.timeout)
+        return self._with_retries(scraper.fetch_posting)
+
+    def _with_retries(self, request):
+        """Call `request`, retrying connection errors and 429/5xx responses with exponential backoff."""
+        for attempt in range(self.retries):
+            try:
+                return request()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                response = getattr(e, 'response', None)
+                retryable = response is None or response.status_code in _RETRY_STATUS_CODES
+                if not retryable or attempt == self.retries - 1:
+                    raise
+                delay = 2 ** attempt
+                if response is not None and response.headers.get('Retry-After', '').isdigit():
+                    delay = min(int(response.headers['Retry-After']), 60)
+                time.sleep(delay)
+
+
+def print_crawl_summary(summary):
+    print(f"\nCrawled {summary['board']} in {summary['elapsed_seconds']:.1f}s ({summary['pages']} listing pages):")
+    print(f"  Listed:    {summary['listed']}")
+    print(f"  New:       {summary['new']}")
+    print(f"  Changed:   {summary['changed']}")
+    print(f"  Unchanged: {summary['unchanged']} re-fetched, {summary['skipped']} skipped")
+    print(f"  Removed:   {summary['removed']}")
+    if summary['failed']:
+        print(f"  Failed:    {summary['failed']}")
+
+
+def crawl_boards(board_urls, store_path=DEFAULT_POSTING_STORE_PATH, **options):
+    """Crawl each board into the store at `store_path`, printing a summary per board. Returns the exit status."""
+    store = PostingStore(store_path)
+    failed = False
+    for board_url in board_urls:
+        try:
+            summary = WorkdayCrawler(board_url, store=store, **options).crawl()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error: Could not crawl {board_url}: {e}")
+            failed = True
+            continue
+        print_crawl_summary(summary)
+        failed = failed or summary['failed'] > 0
+    print(f"\nPosting store {store_path}: {store.stats()}")
+    print(f"Tailor the new and changed postings with: python batch_tailor.py resume.tex {store_path}")
+    store.close()
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Crawl Workday job boards into the local posting store.")
+    arg_parser.add_argument('boards', nargs='+', help="Board roots, e.g. https://<tenant>.wd5.myworkdayjobs.com/en-US/<site>")
+    arg_parser.add_argument('--store', default=DEFAULT_POSTING_STORE_PATH, help="Path of the posting store")
+    arg_parser.add_argument('--workers', type=int, default=8, help="Requests in flight at the same time")
+    arg_parser.add_argument('--recheck-days', type=float, default=None,
+                            help="Re-fetch unchanged postings whose details are older than this many days")
+    arg_parser.add_argument('--full', action='store_true', help="Re-fetch the details of every listed posting")
+    arg_parser.add_argument('--search-text', default='', help="Only crawl postings matching this search (removed postings are not recorded)")
+    arg_parser.add_argument('--api-base-url', default=None, help="Send requests to this host instead (e.g. a local stand-in)")
+    args = arg_parser.parse_args(argv)
+
+    return crawl_boards(
+        args.boards, store_path=args.store, workers=args.workers, api_base_url=args.api_base_url,
+        recheck_seconds=args.recheck_days * 86400 if args.recheck_days is not None else None,
+        full_refresh=args.full, search_text=args.search_text,
+    )
+
+# Entry point of the script
+if __name__ == "__main__":
+    sys.exit(main())
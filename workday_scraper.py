@@ -1,50 +1,171 @@
 import re
-import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
+import sys
+import queue
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+WORKDAY_HOST_PATTERN = r'wd\d+\.myworkdayjobs\.com'
+JOB_DESCRIPTION_SELECTOR = 'div[data-automation-id="jobPostingDescription"]'
+
+_shared_session = None
+
+def get_shared_session(pool_size=10):
+    """Return the process-wide HTTP session, so every scraper reuses the same keep-alive connection pool."""
+    global _shared_session
+    if _shared_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept': 'application/json', 'User-Agent': 'resume-tailor'})
+        _shared_session = session
+    return _shared_session
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Convert the posting's HTML description into plain text, keeping paragraph and list structure."""
+
+    BLOCK_TAGS = {'p', 'div', 'br', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'section'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'li':
+            self.parts.append('\n- ')
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def get_text(self):
+        text = ''.join(self.parts).replace('\xa0', ' ')
+        lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.splitlines()]
+        # Collapse runs of blank lines left behind by nested block tags
+        return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def html_to_text(html):
+    extractor = _HTMLTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.get_text()
+
 
 class WorkdayScraper:
-    def __init__(self, url: str):
+    def __init__(self, url: str, fetch_mode: str = 'auto', session=None, api_base_url=None, timeout=15,
+                 browser_pool=None):
+        """
+        Params:
+        - url (str): The Workday job posting URL.
+        - fetch_mode (str): 'http' reads the posting JSON from the Workday job-board endpoint, 'browser' renders
+          the page with Selenium, and 'auto' tries HTTP first and falls back to the browser.
+        - session (requests.Session): HTTP session to use. Defaults to a shared, pooled keep-alive session.
+        - api_base_url (str): Overrides the scheme and host of the job-board endpoint (e.g. a local stand-in server).
+        - timeout (float): HTTP timeout in seconds.
+        - browser_pool (WorkdayBrowserPool): Warm browser sessions to use instead of launching a new browser.
+        """
         self.url = url
+        self.fetch_mode = fetch_mode
+        self.session = session
+        self.api_base_url = api_base_url
+        self.timeout = timeout
+        self.browser_pool = browser_pool
         self.job_description = None
+        self.job_posting = None  # Raw jobPostingInfo from the job-board endpoint, when fetched over HTTP
 
     def validate_url(self) -> bool:
         """Validate if the URL is a Workday application page."""
-        pattern = r'wd\d+\.myworkdayjobs\.com'
-        if re.search(pattern, self.url):
+        if re.search(WORKDAY_HOST_PATTERN, self.url):
             return True
         else:
             print(f"Invalid Workday URL: {self.url}")
             return False
 
+    def get_api_url(self):
+        """
+        Map a posting URL such as https://<tenant>.wd5.myworkdayjobs.com/en-US/<site>/details/<slug>
+        to its job-board endpoint https://<tenant>.wd5.myworkdayjobs.com/wday/cxs/<tenant>/<site>/job/<slug>.
+        """
+        parts = urlsplit(self.url)
+        tenant = parts.hostname.split('.')[0]
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        # Drop the optional locale prefix (e.g. en-US)
+        if segments and re.fullmatch(r'[a-z]{2}(-[A-Z]{2})?', segments[0]):
+            segments = segments[1:]
+
+        if len(segments) < 3 or segments[1] not in ('details', 'job'):
+            raise ValueError(f"Unrecognised Workday posting path: {parts.path}")
+
+        site, job_path = segments[0], '/'.join(segments[2:])
+        base_url = self.api_base_url.rstrip('/') if self.api_base_url else f"{parts.scheme}://{parts.netloc}"
+        return f"{base_url}/wday/cxs/{tenant}/{site}/job/{job_path}"
+
     def scrape_job_description(self):
         """Scrape the job description from the Workday page."""
         if not self.validate_url():
             return
 
-        driver = None
-        try:
-            # Set up Firefox options and driver
-            firefox_options = Options()
-            firefox_options.add_argument("--headless")  # Run in headless mode
-            driver = webdriver.Firefox(options=firefox_options)  # No need to specify GeckoDriver path now
+        if self.fetch_mode in ('auto', 'http'):
+            try:
+                self.fetch_job_description()
+                return
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"Could not fetch the job posting over HTTP: {e}")
+                if self.fetch_mode == 'http':
+                    return
+                print("Falling back to the browser...")
 
-            # Load the page
-            driver.get(self.url)
+        self._scrape_with_browser()
 
-            # Wait for the page to load the job description
-            time.sleep(5)  # Increase wait time if the page is slower
+    def fetch_job_description(self):
+        """Fetch the posting JSON from the Workday job-board endpoint and convert its HTML description to text."""
+        self.fetch_posting()
+        print(f"Job Description Captured:\n{self.job_description[:500]}...")  # Truncate output for readability
 
-            # Find the job description element
-            job_desc_element = driver.find_element(By.CSS_SELECTOR, 'div[data-automation-id="jobPostingDescription"]')
+    def fetch_posting(self):
+        """
+        Fetch the posting JSON from the Workday job-board endpoint without printing it.
 
-            if job_desc_element:
-                self.job_description = job_desc_element.text.strip()
+        Returns:
+        - str: The job description as plain text (also stored in job_description, with the raw
+          jobPostingInfo in job_posting).
+        """
+        session = self.session or get_shared_session()
+        response = session.get(self.get_api_url(), timeout=self.timeout)
+        response.raise_for_status()
+
+        self.job_posting = response.json()['jobPostingInfo']
+        description = html_to_text(self.job_posting.get('jobDescription', ''))
+        if not description:
+            raise ValueError("Job posting has no description.")
+
+        self.job_description = description
+        return description
+
+    def _scrape_with_browser(self):
+        """Render the page in headless Firefox and read the job description element."""
+        if self.browser_pool is not None:
+            self.job_description = self.browser_pool.scrape(self.url)
+            if self.job_description:
                 print(f"Job Description Captured:\n{self.job_description[:500]}...")  # Truncate output for readability
-            else:
-                raise ValueError("Job description element not found on the page.")
-        
+            return
+
+        driver = None
+        try:
+            driver = _launch_headless_firefox()
+            self.job_description = _read_job_description(driver, self.url, self.timeout)
+            print(f"Job Description Captured:\n{self.job_description[:500]}...")  # Truncate output for readability
         except Exception as e:
             print(f"An error occurred: {e}")
         finally:
@@ -59,6 +180,154 @@ class WorkdayScraper:
             print("No job description found. Have you scraped the page?")
             return None
 
+def _launch_headless_firefox():
+    # Selenium is only needed for the browser path, so it is imported on demand
+    from selenium import webdriver
+    from selenium.webdriver.firefox.options import Options
+
+    firefox_options = Options()
+    firefox_options.add_argument("--headless")  # Run in headless mode
+    return webdriver.Firefox(options=firefox_options)  # No need to specify GeckoDriver path now
+
+
+def _read_job_description(driver, url, timeout):
+    """Load `url` and wait (up to `timeout` seconds) for the job description element to render."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(url)
+    job_desc_element = WebDriverWait(driver, timeout).until(
+        expected_conditions.presence_of_element_located((By.CSS_SELECTOR, JOB_DESCRIPTION_SELECTOR))
+    )
+    description = job_desc_element.text.strip()
+    if not description:
+        raise ValueError("Job description element not found on the page.")
+    return description
+
+
+class WorkdayBrowserPool:
+    """
+    A small pool of warm headless Firefox sessions shared by concurrent scrapes.
+
+    Browsers are launched once and handed out to worker threads; a page is read as soon as the
+    job description element appears instead of after a fixed delay. A browser that errors is
+    replaced so one bad page does not poison later scrapes; if a replacement cannot be launched,
+    the pool shrinks, and once no browser is left scrapes fail instead of waiting for one.
+    """
+
+    def __init__(self, size=3, wait_timeout=15, driver_factory=_launch_headless_firefox):
+        self.size = size
+        self.wait_timeout = wait_timeout
+        self.driver_factory = driver_factory
+        self._drivers = queue.Queue()
+        self._all_drivers = []
+        self._executor = None
+
+    def start(self):
+        """Launch every browser in the pool in parallel."""
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.size)
+        for driver in self._executor.map(lambda _: self.driver_factory(), range(self.size)):
+            self._all_drivers.append(driver)
+            self._drivers.put(driver)
+
+    def scrape(self, url):
+        """Scrape one posting with a pooled browser. Returns None if the page could not be read."""
+        self.start()
+        if not re.search(WORKDAY_HOST_PATTERN, url):
+            print(f"Invalid Workday URL: {url}", file=sys.stderr)
+            return None
+
+        driver = self._drivers.get()
+        if driver is None:
+            # No browser is left; pass the marker on so other waiting scrapes give up too
+            self._drivers.put(None)
+            print(f"No browser left in the pool to scrape {url}", file=sys.stderr)
+            return None
+        try:
+            return _read_job_description(driver, url, self.wait_timeout)
+        except Exception as e:
+            print(f"An error occurred while scraping {url}: {e}", file=sys.stderr)
+            driver = self._replace_driver(driver)
+            return None
+        finally:
+            if driver is not None:
+                self._drivers.put(driver)
+            elif not self._all_drivers:
+                self._drivers.put(None)
+
+    def scrape_many(self, urls):
+        """Scrape every URL concurrently. Returns the descriptions in the same order as `urls` (None for failures)."""
+        self.start()
+        return list(self._executor.map(self.scrape, urls))
+
+    def _replace_driver(self, driver):
+        """Quit `driver` and launch a new browser in its place. Returns None, shrinking the pool, if the launch fails."""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._all_drivers.remove(driver)
+        try:
+            new_driver = self.driver_factory()
+        except Exception as e:
+            print(f"Couldn't launch a replacement browser ({e}); {len(self._all_drivers)} left in the pool", file=sys.stderr)
+            return None
+        self._all_drivers.append(new_driver)
+        return new_driver
+
+    def close(self):
+        """Quit every browser in the pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for driver in self._all_drivers:
+            driver.quit()
+        self._all_drivers = []
+        self._drivers = queue.Queue()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def scrape_job_descriptions(urls, fetch_mode='auto', browser_workers=3, api_base_url=None):
+    """
+    Scrape a list of posting URLs in a single call.
+
+    Postings are fetched over HTTP first (unless fetch_mode is 'browser'); any that fail are then
+    rendered concurrently by a pool of warm browsers. Returns descriptions in the order of `urls`.
+    Nothing is printed to stdout, so callers can write the descriptions there; failures are
+    reported on stderr.
+    """
+    descriptions = [None] * len(urls)
+    if fetch_mode in ('auto', 'http'):
+        def fetch(url):
+            if not re.search(WORKDAY_HOST_PATTERN, url):
+                print(f"Invalid Workday URL: {url}", file=sys.stderr)
+                return None
+            try:
+                return WorkdayScraper(url, fetch_mode='http', api_base_url=api_base_url).fetch_posting()
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"Could not fetch the job posting over HTTP: {url}: {e}", file=sys.stderr)
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(urls), 10))) as executor:
+            descriptions = list(executor.map(fetch, urls))
+
+    remaining = [index for index, description in enumerate(descriptions) if description is None]
+    if remaining and fetch_mode in ('auto', 'browser'):
+        with WorkdayBrowserPool(size=min(browser_workers, len(remaining))) as pool:
+            for index, description in zip(remaining, pool.scrape_many([urls[index] for index in remaining])):
+                descriptions[index] = description
+
+    return descriptions
+
 # Example usage:
 if __name__ == "__main__":
     url = "https://pixar.wd5.myworkdayjobs.com/en-US/Pixar_External_Career_Site/details/Software-Engineer--Tools-GPU--Core-_R-03785"